@@ -1,5 +1,13 @@
 from autogen import ConversableAgent
-from tools.product_api import search_products, get_all_products, get_product
+from tools.product_api import (
+    search_products,
+    search_products_multi,
+    search_matching_products,
+    get_all_products,
+    get_product,
+    DETAIL_FIELDS,
+)
+from tools.result_projection import ToolResultProjector
 
 SEARCH_PROMPT =  """
 You are a SEARCH ORCHESTRATOR for the DummyJSON product API.
@@ -7,30 +15,61 @@ You are a SEARCH ORCHESTRATOR for the DummyJSON product API.
 Your job:
 - Given a human shopping request, extract a single SHORT keyword query.
 - Use search_products(query, limit=20) to fetch candidates.
+- If the request could match several keywords (e.g. "phone" and "smartphone"),
+  call search_products_multi(queries=[...], limit=20) once instead of searching one by one.
+- If the request has limits (price, rating, brand, stock), call
+  search_matching_products(query, request="<the user's wording>", want=10) instead:
+  it pages through the results itself and returns only matching products, so you do
+  not need to call search_products again with another skip.
 - Optionally, you may call search_products again with a different skip or query.
 - Optionally, you may call get_product(id) for details.
-- You do NOT filter by price/rating. Just fetch relevant items by name.
+- Do not filter products yourself; limits are applied only through
+  search_matching_products' request argument.
 
 Final response format (MANDATORY):
 Reply EXACTLY ONCE with a JSON object in a ```json fenced block:
 
 ```json
 {
-  "products": [...],
-  "total": <int>,
-  "query": "<keyword>"
+  "query": "<keyword>",
+  "call_id": "<call_id of the tool result you used>",
+  "ids": [<product id>, ...]
 }
 Rules:
 
-"products" must be a list of product dicts from the tools.
+Do NOT copy product details into your answer. Every tool result has a "call_id"
+and the products are kept outside the chat; they are looked up by their IDs.
 
-"total" is the total number of matching products (from tool output).
+"ids" are the IDs of the relevant products from the tool results, most relevant first.
+A product the tools already returned earlier in this chat comes back as {"id": N, "seen": true}; its ID can be used as well.
+To keep every product of one tool result, you may leave out "ids" and give only its "call_id".
 
 "query" is the keyword you actually used.
 
 Do NOT add any text before or after the JSON block.
 """
 
+
+def _search_products_description() -> str:
+    """Tool description listing the product fields the chat actually receives (see TOOL_RESULTS)."""
+    fields = ToolResultProjector.from_config().fields
+    if fields is None:  # projection off: the cleaned products are sent whole
+        listed = "id, title, price, rating, description, category, brand, stock, discountPercentage and availabilityStatus"
+        return f"Search for products by keyword query. Returns a list of products with {listed}, plus the call_id of this result."
+    return (
+        "Search for products by keyword query. Returns a list of products with "
+        + ", ".join(fields)
+        + " (other fields are left out; use get_product for description and reviews), plus the call_id of this result."
+    )
+
+
+def _get_product_description() -> str:
+    """Tool description listing the detail fields the chat actually receives (see TOOL_RESULTS)."""
+    fields = ToolResultProjector.from_config().detail_fields
+    if fields is None:  # projection off: the API's product with the selected detail fields
+        fields = ("id",) + DETAIL_FIELDS
+    return "Get the details of one product by its ID. Returns " + ", ".join(fields) + "."
+
 def get_search_orchestrator_agent(custom_llm_config: dict) -> ConversableAgent:
     agent = ConversableAgent(
         name="SearchOrchestrator",
@@ -43,9 +82,19 @@ def get_search_orchestrator_agent(custom_llm_config: dict) -> ConversableAgent:
     # tool_executor will handle the actual execution
     agent.register_for_llm(
         name="search_products",
-        description="Search for products by keyword query. Returns a list of products with id, title, price, rating, description, discount, availability status, and reviews.",
+        description=_search_products_description(),
     )(search_products)
     
+    agent.register_for_llm(
+        name="search_products_multi",
+        description="Search several keyword queries at once (e.g. synonyms). Parameters: queries (list of strings), limit per query (default 20). Returns one merged product list without duplicates, the combined total and the total per query.",
+    )(search_products_multi)
+
+    agent.register_for_llm(
+        name="search_matching_products",
+        description="Search by keyword and return only products that satisfy the limits in `request` (the user's wording, e.g. 'under $200 rated 4.5+ in stock'). Fetches further result pages itself until `want` matches (default 10) are found, the results run out or `max_pages` (default 10) pages were read. Returns the matches, the keyword total, pages fetched, whether all results were checked (exhausted) and whether it stopped at the page cap with results left unchecked (truncated; then refine the keyword or the request).",
+    )(search_matching_products)
+
     agent.register_for_llm(
         name="get_all_products",
         description="Get all available products with pagination. Parameters: limit (default 30), skip (default 0). Returns list of products.",
@@ -53,7 +102,7 @@ def get_search_orchestrator_agent(custom_llm_config: dict) -> ConversableAgent:
     
     agent.register_for_llm(
         name="get_product",
-        description="Get complete details for a specific product by its ID. Returns full product information including all metadata.",
+        description=_get_product_description(),
     )(get_product)
     
     return agent
\ No newline at end of file
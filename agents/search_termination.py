@@ -0,0 +1,96 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from tools.analysis_tools import filter_by_constraints, parse_constraints
+from utils.output_formatter import parse_search_reply, parse_search_selection
+
+"""
+When to stop the SearchOrchestrator chat.
+
+SearchTermination replaces the tool executor's old `"```json" in content`
+check:
+
+- is_termination_msg validates the orchestrator's message: an ID-only
+  answer ({"query", "call_id", "ids"}, see parse_search_selection) or a
+  products list (parse_search_reply, for replies that still echo products)
+  ends the chat, while malformed JSON does not. IDs are looked up in the
+  projector's result store; the products are kept in `result`, so the
+  pipeline does not parse the message again.
+- early_reply is registered on the orchestrator. Once the keyword searches
+  of this chat (SEARCH_TOOLS results, tracked by the tool executor's
+  ToolResultProjector) returned `enough` products that satisfy the user's
+  constraints, the orchestrator answers with a short final message holding
+  only those products' IDs instead of another LLM turn, and `result` is set
+  to them. Products from get_all_products or get_product do not count: they
+  were not found by the request's keyword.
+
+Call start(user_request, projector) before every chat.
+"""
+
+# Tools whose results answer the request's keyword.
+SEARCH_TOOLS = ("search_products", "search_products_multi", "search_matching_products")
+
+
+class SearchTermination:
+    def __init__(self, enough: int = 10):
+        self.enough = enough
+        self.constraints: Dict[str, Any] = {}
+        self.projector = None
+        self.result: Optional[List[Any]] = None
+        self.query: Optional[str] = None
+        self.stopped_early = False
+
+    def start(self, user_request: str, projector=None) -> None:
+        """Reset for a new chat about user_request."""
+        self.constraints = parse_constraints(user_request)
+        self.constraints.pop("count", None)  # "top 3" limits the answer, not the search
+        self.projector = projector
+        self.result = None
+        self.query = None
+        self.stopped_early = False
+
+    def is_termination_msg(self, msg: Any) -> bool:
+        if self.stopped_early:
+            return True
+        if not isinstance(msg, dict):
+            return False
+        content = msg.get("content")
+        selection = parse_search_selection(content) if self.projector is not None else None
+        if selection is not None:
+            self.result = self.projector.select(selection["ids"], selection["call_id"])
+            self.query = selection["query"]
+            return True
+        products = parse_search_reply(content)
+        if products is None:
+            return False
+        self.result = products
+        return True
+
+    def collected(self) -> List[Dict[str, Any]]:
+        """Full products returned by the keyword searches in this chat so far."""
+        return self.projector.products_of(SEARCH_TOOLS) if self.projector is not None else []
+
+    def matching(self) -> List[Dict[str, Any]]:
+        """The collected products that satisfy the user's constraints."""
+        products = self.collected()
+        return filter_by_constraints(products, self.constraints) if self.constraints else products
+
+    def has_enough(self) -> bool:
+        return self.enough > 0 and len(self.matching()) >= self.enough
+
+    def early_reply(self, recipient, messages=None, sender=None, config=None):
+        """
+        AutoGen reply function for the orchestrator: after a tool result, stop
+        without calling the LLM when enough matching products are collected.
+        """
+        last = messages[-1] if messages else {}
+        from_tool = last.get("role") in ("tool", "function") or bool(last.get("tool_responses"))
+        if not from_tool or self.enough <= 0:
+            return False, None
+        products = self.matching()
+        if len(products) < self.enough:
+            return False, None
+        self.result = products
+        self.stopped_early = True
+        answer = {"ids": [p.get("id") for p in products]}
+        return True, "```json\n" + json.dumps(answer) + "\n```"
@@ -2,23 +2,31 @@ from autogen import UserProxyAgent
 
 from tools.product_api import (
     search_products,
+    search_products_multi,
+    search_matching_products,
     get_all_products,
     get_product,
 )
+from agents.search_termination import SearchTermination
+from config.app_config import SEARCH_ENOUGH_PRODUCTS
+from tools.result_projection import ToolResultProjector
 
 
-def get_tool_executor() -> UserProxyAgent:
+def get_tool_executor(projector: ToolResultProjector = None, termination: SearchTermination = None) -> UserProxyAgent:
+    # Tool results are trimmed before they enter the chat (see tools/result_projection.py).
+    # The projector is kept on the agent so the caller can reset/resolve per chat.
+    projector = projector or ToolResultProjector.from_config()
+    wrap = projector.wrap
+    # The chat ends on a valid products answer (parsed once, see agents/search_termination.py).
+    termination = termination or SearchTermination(enough=SEARCH_ENOUGH_PRODUCTS)
+
     tool_executor = UserProxyAgent(
         name="tool_executor",
         human_input_mode="NEVER",
         max_consecutive_auto_reply=1,
         llm_config=False,
         code_execution_config=False,
-        is_termination_msg=lambda msg: (
-            isinstance(msg, dict)
-            and isinstance(msg.get("content"), str)
-            and "```json" in msg["content"]
-        ),
+        is_termination_msg=termination.is_termination_msg,
         system_message="""
         You are a tool executor. Your job is to:
         1. Listen to agent requests
@@ -29,8 +37,12 @@ def get_tool_executor() -> UserProxyAgent:
     )
 
     # Register product tools
-    tool_executor.register_for_execution(name="search_products")(search_products)
-    tool_executor.register_for_execution(name="get_all_products")(get_all_products)
-    tool_executor.register_for_execution(name="get_product")(get_product)
+    tool_executor.register_for_execution(name="search_products")(wrap(search_products))
+    tool_executor.register_for_execution(name="search_products_multi")(wrap(search_products_multi))
+    tool_executor.register_for_execution(name="search_matching_products")(wrap(search_matching_products))
+    tool_executor.register_for_execution(name="get_all_products")(wrap(get_all_products))
+    tool_executor.register_for_execution(name="get_product")(wrap(get_product))
+    tool_executor.result_projector = projector
+    tool_executor.search_termination = termination
 
     return tool_executor
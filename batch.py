@@ -0,0 +1,113 @@
+import copy
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+
+from pipeline import build_agents, process_query
+from utils.llm_limiter import get_llm_limiter
+
+"""
+Batch mode: run many requests from a JSONL file through the full
+Search -> Analyze -> Critic flow with several workers, writing one JSON
+line per request.
+
+Input lines are objects with the request text under "query" (or "input",
+"prompt", "text") and an optional "id". Output lines look like:
+    {"id": ..., "query": ..., "products_found": 12, "recommendations": "...",
+     "critic": "...", "elapsed_s": 8.4, "error": null}
+
+AutoGen agents keep conversation state, so every worker thread gets its own
+set of agents. All workers share the process-wide LLM limiter
+(utils/llm_limiter.py); when it is disabled, the llm_config's api_rate_limit
+(requests per second) is split evenly between the workers instead, so the
+whole batch stays within it.
+"""
+
+logger = logging.getLogger(__name__)
+
+QUERY_KEYS = ("query", "input", "prompt", "text")
+
+
+def read_queries(path: str) -> Iterator[dict]:
+    """Yield {"id", "query"} for every usable line of a JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning("Skipping line %d: invalid JSON (%s)", line_no, e)
+                continue
+            query = next((record[k] for k in QUERY_KEYS if isinstance(record.get(k), str)), None)
+            if not query or not query.strip():
+                logger.warning("Skipping line %d: no query field (%s)", line_no, ", ".join(QUERY_KEYS))
+                continue
+            yield {"id": record.get("id", line_no), "query": query.strip()}
+
+
+def worker_llm_config(llm_config: dict, workers: int) -> dict:
+    """
+    Copy of llm_config whose api_rate_limit is this worker's share of the total.
+    Unchanged when the shared LLM limiter has a rate (it covers all workers).
+    """
+    limiter = get_llm_limiter()
+    if limiter is not None and limiter.base_rate:
+        return llm_config
+    config = copy.deepcopy(llm_config)
+    for entry in config.get("config_list", []):
+        if entry.get("api_rate_limit"):
+            entry["api_rate_limit"] = entry["api_rate_limit"] / workers
+    return config
+
+
+def run_batch(input_path: str, output_path: str, llm_config: dict, workers: int = 4) -> dict:
+    """
+    Process every request in input_path and write the results to output_path
+    (in completion order; each line carries its "id"). Returns a summary dict.
+    """
+    workers = max(1, workers)
+    config = worker_llm_config(llm_config, workers)
+    local = threading.local()
+
+    def handle(item: dict) -> dict:
+        # Agents are created lazily, once per worker thread.
+        if not hasattr(local, "agents"):
+            local.agents = build_agents(config)
+        started = time.perf_counter()
+        try:
+            result = process_query(local.agents, item["query"], silent=True)
+            result["error"] = None
+        except Exception as e:
+            logger.exception("Request %s failed", item["id"])
+            result = {"query": item["query"], "products_found": 0,
+                      "recommendations": "", "critic": "", "error": str(e)}
+        result["id"] = item["id"]
+        result["elapsed_s"] = round(time.perf_counter() - started, 3)
+        return result
+
+    summary = {"total": 0, "ok": 0, "failed": 0, "no_products": 0}
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool, \
+            open(output_path, "w", encoding="utf-8") as out:
+        futures = [pool.submit(handle, item) for item in read_queries(input_path)]
+        for future in as_completed(futures):
+            result = future.result()
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()  # partial results survive an interrupted overnight run
+            summary["total"] += 1
+            if result["error"]:
+                summary["failed"] += 1
+            elif not result["products_found"]:
+                summary["no_products"] += 1
+            else:
+                summary["ok"] += 1
+            logger.info("[%d/%d] %s done in %.1fs", summary["total"], len(futures),
+                        result["id"], result["elapsed_s"])
+
+    summary["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return summary
@@ -0,0 +1,82 @@
+import json
+import time
+
+import requests
+
+from tools import product_api
+from tools.response_cache import configure_response_cache
+from benchmarks.fake_product_api import FakeProductServer
+
+"""
+Bytes transferred and decode time per API page, full products vs `select`.
+
+Run from the project root:
+    python -m benchmarks.bench_api_payload
+
+For one search page (limit=30) it reports the response size, the decode time
+with res.json() (the old path), json.loads on the raw bytes and the decoder
+product_api uses (orjson when installed), then the end-to-end time of
+search_products and get_all_products with and without field selection.
+"""
+
+CATALOG_SIZE = 1000
+PAGE_LIMIT = 30
+ROUNDS = 200
+
+
+def _best_ms(fn, rounds: int = ROUNDS) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _page(server: FakeProductServer, select: bool) -> requests.Response:
+    params = {"q": "phone", "limit": PAGE_LIMIT}
+    if select:
+        params["select"] = ",".join(product_api.LIST_FIELDS)
+    res = requests.get(f"{server.base_url}/search", params=params)
+    res.raise_for_status()
+    return res
+
+
+def _decode(label: str, res: requests.Response) -> None:
+    body = res.content
+    print(
+        f"{label:<8} {len(body) / 1024:7.1f} KiB/page  "
+        f"res.json()={_best_ms(res.json):6.3f} ms  "
+        f"json.loads={_best_ms(lambda: json.loads(body)):6.3f} ms  "
+        f"{product_api._loads.__module__}.loads={_best_ms(lambda: product_api._loads(body)):6.3f} ms"
+    )
+
+
+def _tool(label: str, server: FakeProductServer, select: bool) -> None:
+    product_api.SELECT_FIELDS = select
+    server.reset_stats()
+    search = _best_ms(lambda: product_api.search_products("phone", limit=PAGE_LIMIT), rounds=50)
+    searched = server.stats["bytes_sent"]
+    server.reset_stats()
+    everything = _best_ms(lambda: product_api.get_all_products(limit=100), rounds=5)
+    print(
+        f"{label:<8} search_products={search:6.2f} ms ({searched / 50 / 1024:6.1f} KiB/call)  "
+        f"get_all_products={everything:7.2f} ms ({server.stats['bytes_sent'] / 5 / 1024:7.1f} KiB/call)"
+    )
+
+
+def main():
+    with FakeProductServer(num_products=CATALOG_SIZE) as server:
+        product_api.BASE_URL = server.base_url
+        configure_response_cache(enabled=False)  # measure the network path
+        print(f"Catalog of {CATALOG_SIZE} products, search pages of {PAGE_LIMIT}\n")
+        print("Decode one page (best of %d):" % ROUNDS)
+        _decode("full", _page(server, select=False))
+        _decode("select", _page(server, select=True))
+        print("\nTools end to end (best time, average bytes):")
+        _tool("full", server, select=False)
+        _tool("select", server, select=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import time
+
+from tools import product_api
+from tools.response_cache import configure_response_cache
+from benchmarks.fake_product_api import FakeProductServer
+
+"""
+search_products latency: API round trip vs local catalog snapshot.
+
+Run from the project root:
+    python -m benchmarks.bench_catalog_snapshot
+"""
+
+QUERIES = ["phone", "laptop", "samsung", "perfume", "apple coffee", "chair", "notebook", "earbuds"]
+ROUNDS = 200
+
+
+def _time_queries() -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for q in QUERIES:
+            product_api.search_products(q, limit=20)
+    return (time.perf_counter() - start) / (ROUNDS * len(QUERIES))
+
+
+def main():
+    with FakeProductServer(num_products=1000, request_latency=0.005) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        product_api.BASE_URL = server.base_url
+        configure_response_cache(enabled=False)  # measure the network path
+
+        api = _time_queries()
+        print(f"API (5 ms server latency)  {api * 1e6:10.1f} us/query")
+
+        path = os.path.join(tmp, "catalog.json.gz")
+        store = product_api.enable_catalog_snapshot(path, ttl=3600)
+        start = time.perf_counter()
+        store.refresh()
+        print(f"snapshot build             {(time.perf_counter() - start) * 1000:10.1f} ms "
+              f"({os.path.getsize(path) / 1024:.0f} KiB on disk)")
+
+        for q in QUERIES:
+            local = product_api.search_products(q, limit=20)
+            product_api.disable_catalog_snapshot()
+            remote = product_api.search_products(q, limit=20)
+            product_api.enable_catalog_snapshot(path, ttl=3600)
+            assert [p["id"] for p in local["products"]] == [p["id"] for p in remote["products"]], q
+        store = product_api._catalog
+
+        server.reset_stats()
+        local = _time_queries()
+        print(f"local snapshot             {local * 1e6:10.1f} us/query "
+              f"({api / local:.0f}x, hits={store.hits}, API requests={server.stats['requests']})")
+        product_api.disable_catalog_snapshot()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import re
+import time
+
+from benchmarks.fake_product_api import make_products
+from tools.constraint_parser import ConstraintParser
+
+"""
+Queries per second of parse_constraints: the previous implementation (several
+regexes per query and a substring scan over the brand list, with its 10
+brands and with the catalog's brands) vs the compiled parser
+(tools/constraint_parser.py) with the built-in and the catalog vocabulary.
+The parsed constraints of both are printed for comparison.
+
+Run from the project root:
+    python -m benchmarks.bench_constraint_parser [brands]   (default: 200 extra brands)
+"""
+
+QUERIES = [
+    "phones under $300 rating at least 4 in stock",
+    "find me a laptop",
+    "samsung phone rated 4.5+",
+    "top 3 perfumes between $50 and $120",
+    "I need a gift for my mother, something elegant, maybe a watch from a good brand",
+    "mens watches over 200 dollars",
+    "cheap groceries",
+    "5 phones below £300 out of stock",
+]
+ROUNDS = 2000
+
+
+LEGACY_BRANDS = ["apple", "samsung", "oppo", "realme", "vivo", "xiaomi", "oneplus", "google", "nokia", "motorola"]
+
+
+def legacy_parse_constraints(query: str, brands=LEGACY_BRANDS) -> dict:
+    """parse_constraints before the compiled parser (for comparison only); brands as lower-case names."""
+    q = query.lower()
+    constraints = {}
+    m_price = re.search(r"(under|less than|<=|<|around)\s*\$?\s*(\d+(\.\d+)?)", q)
+    if m_price:
+        constraints["price_max"] = float(m_price.group(2))
+    m_rating_ge = re.search(r"(?:>=|at least|no less than)\s*(\d+(\.\d+)?)", q)
+    if m_rating_ge:
+        constraints["rating_min"] = float(m_rating_ge.group(1))
+    else:
+        m_rating_plain = re.search(r"rat(?:ing|ed)\s*(?:>=|>|at least|no less than)?\s*(\d+(\.\d+)?)", q)
+        if m_rating_plain:
+            constraints["rating_min"] = float(m_rating_plain.group(1))
+    if any(w in q for w in ("smartphone", "smartphones", "phone", "phones")):
+        constraints["category_in"] = {"smartphones", "phones", "mobile"}
+    if "in stock" in q:
+        constraints["availability"] = "in stock"
+    elif "out of stock" in q:
+        constraints["availability"] = "out of stock"
+    elif "low stock" in q:
+        constraints["availability"] = "low stock"
+    for b in brands:
+        if b in q:
+            constraints.setdefault("brand_in", set()).add(b.capitalize())
+    m_count = re.search(r"(top\s*(\d+)|\b(\d+)\s*(items|products|phones))", q)
+    if m_count:
+        num = m_count.group(2) or m_count.group(3)
+        if num and num.isdigit():
+            constraints["count"] = int(num)
+    return constraints
+
+
+def _qps(parse) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for q in QUERIES:
+            parse(q)
+    return ROUNDS * len(QUERIES) / (time.perf_counter() - start)
+
+
+def main(extra_brands: int = 200):
+    catalog = make_products(1000)
+    # Real catalogs have far more brands than the fake server's ten.
+    catalog += [{"brand": f"Brand{i} Labs", "category": "furniture"} for i in range(extra_brands)]
+    builtin = ConstraintParser()
+    from_catalog = ConstraintParser.from_products(catalog)
+
+    print(f"{len(QUERIES)} queries x {ROUNDS} rounds\n")
+    catalog_brands = sorted({p["brand"].lower() for p in catalog} | set(LEGACY_BRANDS))
+    print(f"legacy regexes            {_qps(legacy_parse_constraints):10,.0f} queries/s  (10 brands)")
+    print(f"legacy, catalog brands    {_qps(lambda q: legacy_parse_constraints(q, catalog_brands)):10,.0f} queries/s"
+          f"  ({len(catalog_brands)} brands, substring scan)")
+    print(f"compiled, built-in vocab  {_qps(builtin.parse):10,.0f} queries/s  ({len(builtin.vocabulary)} terms)")
+    print(f"compiled, catalog vocab   {_qps(from_catalog.parse):10,.0f} queries/s  ({len(from_catalog.vocabulary)} terms)\n")
+
+    for q in QUERIES:
+        print(f"{q}\n  legacy:   {legacy_parse_constraints(q)}\n  compiled: {from_catalog.parse(q)}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
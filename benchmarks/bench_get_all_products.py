@@ -0,0 +1,45 @@
+import time
+
+from tools import product_api
+from tools.response_cache import configure_response_cache
+from benchmarks.fake_product_api import FakeProductServer
+
+"""
+Wall-clock time of get_all_products, sequential vs concurrent page fetching.
+
+Run from the project root:
+    python -m benchmarks.bench_get_all_products
+"""
+
+CATALOG_SIZE = 200
+PAGE_LIMIT = 30
+ROUNDS = 5
+
+
+def _run(workers: int) -> tuple:
+    product_api.PAGE_WORKERS = workers
+    best = float("inf")
+    result = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        result = product_api.get_all_products(limit=PAGE_LIMIT)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    with FakeProductServer(num_products=CATALOG_SIZE, request_latency=0.05) as server:
+        product_api.BASE_URL = server.base_url
+        configure_response_cache(enabled=False)  # measure the network path
+        print(f"{CATALOG_SIZE} products, limit={PAGE_LIMIT}, 50 ms per request (best of {ROUNDS})\n")
+
+        baseline, expected = _run(workers=1)
+        print(f"sequential       {baseline * 1000:8.1f} ms")
+        for workers in (2, 4, 8):
+            elapsed, result = _run(workers=workers)
+            assert result == expected, "concurrent fetch must return the same products in the same order"
+            print(f"{workers} workers        {elapsed * 1000:8.1f} ms  ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import statistics
+import time
+
+from tools import product_api
+from tools.response_cache import configure_response_cache
+from benchmarks.fake_product_api import FakeProductServer
+
+"""
+Per-call latency of the product tools with and without connection pooling.
+
+Run from the project root:
+    python -m benchmarks.bench_http_pooling
+
+The fake server charges connect_latency once per TCP connection, which stands in
+for the TCP+TLS handshake paid against dummyjson.com on every unpooled call.
+"""
+
+CALLS = 50
+
+
+def _measure(label: str, server: FakeProductServer, pooled: bool) -> None:
+    product_api.configure_http(pooled=pooled)
+    server.reset_stats()
+    timings = []
+    for i in range(CALLS):
+        start = time.perf_counter()
+        if i % 2:
+            product_api.get_product(i % 100 + 1)
+        else:
+            product_api.search_products("phone", limit=20)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(
+        f"{label:<10} p50={statistics.median(timings):7.2f} ms  "
+        f"p95={timings[int(len(timings) * 0.95) - 1]:7.2f} ms  "
+        f"connections={server.stats['connections']}"
+    )
+
+
+def main():
+    with FakeProductServer(num_products=200, connect_latency=0.03, request_latency=0.002) as server:
+        product_api.BASE_URL = server.base_url
+        configure_response_cache(enabled=False)  # measure the network path
+        print(f"{CALLS} calls against {server.base_url} (30 ms simulated handshake)\n")
+        _measure("unpooled", server, pooled=False)
+        _measure("pooled", server, pooled=True)
+
+
+if __name__ == "__main__":
+    main()
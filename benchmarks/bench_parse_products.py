@@ -0,0 +1,58 @@
+import json
+import re
+import sys
+import time
+import tracemalloc
+
+from benchmarks.fake_product_api import make_products
+from tools.product_record import FIELDS
+from utils.output_formatter import parse_products_from_search
+
+"""
+Parsing the orchestrator's final ```json message: the previous approach
+(regex over the whole message, json.loads of the full payload) vs the
+incremental parser in utils/output_formatter.py, on full DummyJSON-like
+records (reviews, meta, images).
+
+Run from the project root:
+    python -m benchmarks.bench_parse_products [sizes...]   (default: 20 200 2000)
+"""
+
+
+def regex_and_loads(text: str) -> list:
+    fence = re.search(r"```json\s*([\s\S]*?)```", text, re.IGNORECASE)
+    data = json.loads(fence.group(1).strip())
+    return data.get("products") or []
+
+
+def _measure(fn, text: str, rounds: int) -> tuple:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    result = fn(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+
+def run(n: int) -> None:
+    products = make_products(n)
+    message = "```json\n" + json.dumps({"products": products, "total": n, "query": "x"}, indent=2) + "\n```"
+    rounds = 5 if n >= 1000 else 20
+    print(f"\n{n} products, message {len(message) / 1024:.0f} KiB")
+    for name, fn in [
+        ("regex + json.loads", regex_and_loads),
+        ("incremental", parse_products_from_search),
+        ("incremental, record fields", lambda t: parse_products_from_search(t, FIELDS)),
+    ]:
+        seconds, peak = _measure(fn, message, rounds)
+        print(f"  {name:<30}{seconds * 1000:9.2f} ms   peak {peak / 1024 / 1024:7.2f} MiB")
+
+
+if __name__ == "__main__":
+    for size in [int(a) for a in sys.argv[1:]] or [20, 200, 2000]:
+        run(size)
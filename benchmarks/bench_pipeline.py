@@ -0,0 +1,113 @@
+import argparse
+import os
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+# The agents import config.llm_config, which requires a key; nothing is sent to Gemini here.
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+
+import pipeline  # noqa: E402
+from tools import product_api  # noqa: E402
+from tools.response_cache import configure_response_cache  # noqa: E402
+from utils.llm_cache import configure_llm_cache, get_llm_cache  # noqa: E402
+from utils.tracing import tracer  # noqa: E402
+from benchmarks.fake_llm import ScriptedLLMClient, scripted_llm_config  # noqa: E402
+from benchmarks.fake_product_api import FakeProductServer  # noqa: E402
+
+"""
+Offline end-to-end benchmark of the advisor pipeline.
+
+Runs the real per-query flow from pipeline.py (fast-path search or the
+orchestrator chat with tool calls and its early stop, reading the final
+answer with parse_search_selection and the result store, or
+parse_product_records when tool results are not projected, candidate
+ranking/formatting, analyzer, rule check and critic) against the local fake product server and the scripted LLM client,
+then reports queries/sec, per-stage latency (p50/p95) and peak Python memory.
+
+Run from the project root (needs the packages from requirements.txt):
+    python -m benchmarks.bench_pipeline --queries 40 --workers 4 --llm-latency 0.2
+    python -m benchmarks.bench_pipeline --no-fast-path   # always use the orchestrator chat
+"""
+
+QUERIES = [
+    "find me a phone",
+    "phones under $300",
+    "smartphone around 200, rating at least 4",
+    "find me a laptop",
+    "laptops under 1000",
+    "perfume",
+    "a comfortable chair for my home office that is not too expensive",
+    "top 3 earbuds in stock",
+    "samsung phone",
+    "something to drink in the morning, coffee maybe",
+]
+
+
+def build_offline_agents(llm_config: dict) -> dict:
+    agents = pipeline.build_agents(llm_config)
+    for name in ("search", "analyzer", "critic"):
+        agents[name].register_model_client(model_client_cls=ScriptedLLMClient)
+    return agents
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the advisor pipeline.")
+    parser.add_argument("--queries", type=int, default=30, help="number of requests to run")
+    parser.add_argument("--workers", type=int, default=1, help="requests processed in parallel")
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="seconds per fake LLM call")
+    parser.add_argument("--llm-token-latency", type=float, default=0.0, help="extra seconds per output token")
+    parser.add_argument("--api-latency", type=float, default=0.02, help="seconds per fake product API request")
+    parser.add_argument("--catalog", type=int, default=500, help="products in the fake catalog")
+    parser.add_argument("--no-fast-path", action="store_true", help="always use the orchestrator chat")
+    parser.add_argument("--no-cache", action="store_true", help="disable the product response cache")
+    parser.add_argument("--no-llm-cache", action="store_true", help="disable the analyzer/critic reply cache")
+    parser.add_argument("--no-critic-rules", action="store_true", help="always ask the critic LLM")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    pipeline.SEARCH_FAST_PATH = not args.no_fast_path
+    pipeline.CRITIC_RULES = not args.no_critic_rules
+    if args.no_cache:
+        configure_response_cache(enabled=False)
+    if args.no_llm_cache:
+        configure_llm_cache(enabled=False)
+    llm_config = scripted_llm_config(args.llm_latency, args.llm_token_latency)
+    local = threading.local()
+
+    def run_one(query: str) -> dict:
+        if not hasattr(local, "agents"):
+            local.agents = build_offline_agents(llm_config)
+        return pipeline.process_query(local.agents, query, silent=True)
+
+    with FakeProductServer(num_products=args.catalog, request_latency=args.api_latency) as server:
+        product_api.BASE_URL = server.base_url
+        queries = [QUERIES[i % len(QUERIES)] for i in range(args.queries)]
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(run_one, queries))
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        answered = sum(1 for r in results if r["recommendations"])
+        print(f"\n{len(queries)} queries, {args.workers} worker(s), "
+              f"fast path {'off' if args.no_fast_path else 'on'}, LLM {args.llm_latency * 1000:.0f} ms/call, "
+              f"API {args.api_latency * 1000:.0f} ms/request")
+        print(f"throughput   {len(queries) / elapsed:8.2f} queries/s  ({elapsed:.2f}s total, {answered} answered)")
+        print(f"API requests {server.stats['requests']:8d}  ({server.stats['bytes_sent'] / 1024:.0f} KiB sent)")
+        print(f"peak memory  {peak / 1024 / 1024:8.2f} MiB (tracemalloc)\n")
+        print(tracer.format_summary())
+        print(f"\nsearch paths: {pipeline.planner_stats.summary()}")
+        print(f"critic:       {pipeline.critic_stats.summary()}")
+        if get_llm_cache() is not None:
+            print(f"LLM cache:    {get_llm_cache().stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.fake_product_api import make_products
+from tools.product_api import _clean_product
+from tools.product_record import Product
+
+"""
+Memory held by a catalog as cleaned product dicts (what the tools return)
+vs compact Product records (tools/product_record.py).
+
+Both are decoded from the same JSON text, as they would be from the API or a
+catalog snapshot, and measured with tracemalloc once the temporary objects
+are gone.
+
+Run from the project root:
+    python -m benchmarks.bench_product_memory [sizes...]   (default: 100000 500000)
+"""
+
+
+def _retained(build) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def run(n: int) -> None:
+    template = [_clean_product(p) for p in make_products(1000)]
+    # Repeat the 1000 generated products with new ids instead of generating n.
+    catalog = [dict(template[i % 1000], id=i + 1, title=f"{template[i % 1000]['title']} #{i}") for i in range(n)]
+    text = json.dumps(catalog)
+    del catalog, template
+
+    dicts, dict_bytes, dict_s = _retained(lambda: json.loads(text))
+    del dicts
+    records, record_bytes, record_s = _retained(lambda: [Product.from_dict(d) for d in json.loads(text)])
+    del records
+
+    print(f"\n{n} products ({len(text) / 1024 / 1024:.0f} MiB of JSON)")
+    print(f"  dicts    {dict_bytes / 1024 / 1024:9.1f} MiB  {dict_bytes / n:7.0f} B/product  load {dict_s:6.2f}s")
+    print(f"  Product  {record_bytes / 1024 / 1024:9.1f} MiB  {record_bytes / n:7.0f} B/product  load {record_s:6.2f}s")
+    print(f"  saved    {(1 - record_bytes / dict_bytes) * 100:8.0f} %")
+
+
+if __name__ == "__main__":
+    for size in [int(a) for a in sys.argv[1:]] or [100_000, 500_000]:
+        run(size)
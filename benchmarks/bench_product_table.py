@@ -0,0 +1,80 @@
+import heapq
+import random
+import sys
+import time
+
+from tools import analysis_tools
+from tools.product_table import ProductTable
+
+"""
+List-of-dicts helpers (tools/analysis_tools.py) vs the columnar ProductTable
+(tools/product_table.py) on synthetic catalogs.
+
+Run from the project root:
+    python -m benchmarks.bench_product_table [sizes...]   (default: 1000 100000 1000000)
+"""
+
+QUERY = "phones under $300 rating at least 4 in stock"
+TOP_K = 15
+CATEGORIES = ["smartphones", "laptops", "fragrances", "groceries", "mobile-accessories", "furniture"]
+BRANDS = ["Apple", "Samsung", "Oppo", "Realme", "Vivo", "Xiaomi", "Nokia", "Dell", "Lenovo", None]
+STATUSES = ["In Stock", "Low Stock", "Out of Stock"]
+
+
+def synthetic_products(n: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "title": f"Product {i}",
+            "price": round(rng.uniform(5, 2000), 2),
+            "rating": round(rng.uniform(1, 5), 2),
+            "discountPercentage": round(rng.uniform(0, 20), 2),
+            "category": rng.choice(CATEGORIES),
+            "brand": rng.choice(BRANDS),
+            "availabilityStatus": rng.choice(STATUSES),
+        }
+        for i in range(n)
+    ]
+
+
+def _best_of(fn, rounds: int) -> tuple:
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(n: int) -> None:
+    products = synthetic_products(n)
+    constraints = analysis_tools.parse_constraints(QUERY)
+    rounds = 3 if n >= 1_000_000 else 5
+
+    def loops():
+        filtered = analysis_tools.filter_by_constraints(products, constraints)
+        return heapq.nlargest(TOP_K, filtered, key=analysis_tools.score_product)
+
+    build, table = _best_of(lambda: ProductTable(products), 1)
+
+    def vectorized():
+        return table.top_k(TOP_K, table.constraints_mask(constraints))
+
+    loop_time, expected = _best_of(loops, rounds)
+    vec_time, result = _best_of(vectorized, rounds)
+    assert result == expected, "vectorized top-k must match the list-based helpers"
+
+    print(f"{n:>9,}  loops {loop_time * 1000:9.2f} ms   table {vec_time * 1000:8.2f} ms "
+          f"({loop_time / vec_time:5.1f}x)   one-off build {build * 1000:9.2f} ms")
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [1_000, 100_000, 1_000_000]
+    print(f"filter + top-{TOP_K} for {QUERY!r}\n")
+    for n in sizes:
+        run(n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import ast
+import json
+import re
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from tools.search_planner import plan_search
+
+"""
+Scripted stand-in for the Gemini backend, plugged into AutoGen as a custom model client.
+
+It plays each agent's role deterministically so the real pipeline can run offline:
+- SearchOrchestrator: first turn calls search_products(<keyword>, limit=20),
+  next turn answers with the query, call_id and product IDs of the tool output.
+- ProductAnalyzerAgent: picks the first three candidates in the analyzer format.
+- ProductInternalCriticAgent: approves.
+
+Latency is simulated as `latency` seconds per call plus `latency_per_token`
+seconds per (estimated) output token.
+
+Usage:
+    config = scripted_llm_config(latency=0.3)
+    agent = get_product_analyzer_agent(custom_llm_config=config)
+    agent.register_model_client(model_client_cls=ScriptedLLMClient)
+"""
+
+
+def scripted_llm_config(latency: float = 0.2, latency_per_token: float = 0.0) -> dict:
+    """An llm_config that routes every call to ScriptedLLMClient."""
+    return {
+        "config_list": [
+            {
+                "model": "scripted",
+                "model_client_cls": "ScriptedLLMClient",
+                "latency": latency,
+                "latency_per_token": latency_per_token,
+            }
+        ],
+        "cache_seed": None,
+    }
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _parse_tool_output(content: str) -> Any:
+    try:
+        return json.loads(content)
+    except (TypeError, ValueError):
+        try:
+            return ast.literal_eval(content)
+        except (ValueError, SyntaxError):
+            return None
+
+
+class ScriptedLLMClient:
+    """AutoGen ModelClient implementation (create / message_retrieval / cost / get_usage)."""
+
+    def __init__(self, config: Dict[str, Any], **kwargs):
+        self.model = config.get("model", "scripted")
+        self.latency = float(config.get("latency", 0.2))
+        self.latency_per_token = float(config.get("latency_per_token", 0.0))
+
+    # --- ModelClient protocol -----------------------------------------------------------
+
+    def create(self, params: Dict[str, Any]) -> SimpleNamespace:
+        messages = params.get("messages", [])
+        system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+
+        if "SEARCH ORCHESTRATOR" in system:
+            message = self._orchestrator_turn(messages)
+        elif "PRODUCT ANALYZER" in system:
+            message = {"role": "assistant", "content": self._analyzer_reply(messages[-1].get("content") or "")}
+        else:
+            message = {"role": "assistant", "content": "APPROVED:\nThe recommendations match the stated request."}
+
+        output = json.dumps(message)
+        time.sleep(self.latency + self.latency_per_token * _estimate_tokens(output))
+        prompt_tokens = sum(_estimate_tokens(str(m.get("content") or "")) for m in messages)
+        return SimpleNamespace(
+            id=uuid.uuid4().hex,
+            model=self.model,
+            message=message,
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=_estimate_tokens(output)),
+        )
+
+    def message_retrieval(self, response) -> List[Dict[str, Any]]:
+        return [response.message]
+
+    def cost(self, response) -> float:
+        return 0.0
+
+    @staticmethod
+    def get_usage(response) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": response.usage.prompt_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.prompt_tokens + response.usage.completion_tokens,
+            "cost": 0.0,
+            "model": response.model,
+        }
+
+    # --- scripted roles ---------------------------------------------------------------
+
+    def _orchestrator_turn(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        last = messages[-1] if messages else {}
+        if last.get("role") == "tool":
+            data = _parse_tool_output(last.get("content") or "") or {}
+            final = {
+                "query": data.get("query", ""),
+                "call_id": data.get("call_id"),
+                "ids": [p.get("id") for p in data.get("products", []) if isinstance(p, dict)],
+            }
+            return {"role": "assistant", "content": "```json\n" + json.dumps(final, indent=2) + "\n```"}
+
+        request = next((m.get("content") or "" for m in messages if m.get("role") == "user"), "")
+        wanted = request.split("User wants:", 1)[-1].split("\n\n", 1)[0].strip()
+        plan = plan_search(wanted)
+        keyword = plan["query"] if plan else (re.findall(r"[a-z]{3,}", wanted.lower()) or ["phone"])[-1]
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:8]}",
+                    "type": "function",
+                    "function": {
+                        "name": "search_products",
+                        "arguments": json.dumps({"query": keyword, "limit": 20}),
+                    },
+                }
+            ],
+        }
+
+    def _analyzer_reply(self, prompt: str) -> str:
+        candidates = re.findall(
+            r"^\d+\) (.+?) \| Brand: (.+?) \| Price: (.+?) \| Rating: ([^|\n]+?)(?: \||$)", prompt, re.MULTILINE
+        )
+        if not candidates:
+            return "I could not find suitable products. Try relaxing the price or rating limits."
+        blocks = ["These options fit the request best based on price and rating."]
+        for i, (title, brand, price, rating) in enumerate(candidates[:3], start=1):
+            blocks.append(
+                f"PRODUCT #{i}\nName: {title}\nBrand: {brand}\nPrice: {price}\nRating: {rating}\n"
+                f"Why chosen: A good balance of price and rating.\n"
+                f"Strengths:\n- Well rated\n- Fair price\nLimitations:\n- Limited details available"
+            )
+        return "\n\n".join(blocks)
@@ -0,0 +1,216 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+"""
+Local stand-in for the DummyJSON /products API, used by the benchmarks.
+
+It serves the same routes the tools use:
+- GET /products?limit=&skip=
+- GET /products/search?q=&limit=&skip=
+- GET /products/<id>
+
+Responses have the same shape as DummyJSON (including the heavy fields
+like reviews, images, dimensions and meta); like DummyJSON, `select=a,b`
+limits each product to "id" plus the listed fields. Two latencies can be injected:
+- connect_latency: paid once per new TCP connection (simulates TCP+TLS handshake).
+- request_latency: paid on every request (simulates server/network time).
+
+Usage:
+    with FakeProductServer(num_products=200, connect_latency=0.05) as server:
+        product_api.BASE_URL = server.base_url
+        ...
+"""
+
+CATEGORIES = {
+    "smartphones": ["Phone", "Smartphone", "Mobile"],
+    "laptops": ["Laptop", "Notebook", "Ultrabook"],
+    "fragrances": ["Perfume", "Eau de Parfum", "Cologne"],
+    "groceries": ["Apple", "Rice", "Coffee"],
+    "mobile-accessories": ["Phone Case", "Charger", "Earbuds"],
+    "furniture": ["Chair", "Desk", "Sofa"],
+}
+BRANDS = ["Apple", "Samsung", "Oppo", "Realme", "Vivo", "Xiaomi", "Nokia", "Dell", "Lenovo", "Chanel"]
+STATUSES = ["In Stock", "Low Stock", "Out of Stock"]
+
+
+def make_products(n: int, seed: int = 7) -> list:
+    """Generate n DummyJSON-like product records (deterministic for a given seed)."""
+    rng = random.Random(seed)
+    categories = list(CATEGORIES)
+    products = []
+    for i in range(1, n + 1):
+        category = categories[i % len(categories)]
+        noun = rng.choice(CATEGORIES[category])
+        brand = rng.choice(BRANDS)
+        stock = rng.randint(0, 120)
+        product = {
+            "id": i,
+            "title": f"{brand} {noun} {i}",
+            "description": f"The {brand} {noun.lower()} {i} is a reliable choice with "
+                           f"a solid build and good value for everyday use.",
+            "category": category,
+            "price": round(rng.uniform(5, 2000), 2),
+            "discountPercentage": round(rng.uniform(0, 20), 2),
+            "rating": round(rng.uniform(1, 5), 2),
+            "stock": stock,
+            "tags": [category, noun.lower()],
+            "brand": brand,
+            "sku": f"SKU-{i:06d}",
+            "weight": rng.randint(1, 10),
+            "dimensions": {"width": 10.5, "height": 20.1, "depth": 3.2},
+            "warrantyInformation": "1 year warranty",
+            "shippingInformation": "Ships in 1-2 business days",
+            "availabilityStatus": STATUSES[0] if stock > 10 else STATUSES[1] if stock else STATUSES[2],
+            "reviews": [
+                {
+                    "rating": rng.randint(1, 5),
+                    "comment": "Very satisfied!",
+                    "date": "2024-05-23T08:56:21.618Z",
+                    "reviewerName": "Jane Doe",
+                    "reviewerEmail": "jane.doe@x.dummyjson.com",
+                }
+                for _ in range(3)
+            ],
+            "returnPolicy": "30 days return policy",
+            "minimumOrderQuantity": 1,
+            "meta": {
+                "createdAt": "2024-05-23T08:56:21.618Z",
+                "updatedAt": "2024-05-23T08:56:21.618Z",
+                "barcode": f"{rng.randint(10**12, 10**13 - 1)}",
+                "qrCode": "https://assets.dummyjson.com/public/qr-code.png",
+            },
+            "images": [f"https://cdn.dummyjson.com/products/images/{i}/{k}.png" for k in range(1, 4)],
+            "thumbnail": f"https://cdn.dummyjson.com/products/images/{i}/thumbnail.png",
+        }
+        products.append(product)
+    return products
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def setup(self):
+        # Called once per TCP connection.
+        self.server.connections += 1
+        if self.server.connect_latency:
+            time.sleep(self.server.connect_latency)
+        super().setup()
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.server.request_latency:
+            time.sleep(self.server.request_latency)
+
+        parsed = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        parts = [p for p in parsed.path.split("/") if p]
+        products = self.server.products
+
+        if parts == ["products", "search"]:
+            q = params.get("q", "").lower()
+            matches = [
+                p for p in products
+                if q in p["title"].lower() or q in p["description"].lower() or q in p["category"]
+            ]
+            self._send_page(matches, params)
+        elif parts == ["products"]:
+            self._send_page(products, params)
+        elif len(parts) == 2 and parts[0] == "products" and parts[1].isdigit():
+            idx = int(parts[1]) - 1
+            if 0 <= idx < len(products):
+                self._send_json(self._select(products[idx], params))
+            else:
+                self._send_json({"message": f"Product with id '{parts[1]}' not found"}, status=404)
+        else:
+            self._send_json({"message": "not found"}, status=404)
+
+    def _send_page(self, items: list, params: dict):
+        limit = int(params.get("limit", 30))
+        skip = int(params.get("skip", 0))
+        page = items[skip:skip + limit] if limit else items[skip:]
+        if params.get("select"):
+            page = [self._select(p, params) for p in page]
+        self._send_json({"products": page, "total": len(items), "skip": skip, "limit": len(page)})
+
+    @staticmethod
+    def _select(product: dict, params: dict) -> dict:
+        fields = [f for f in params.get("select", "").split(",") if f]
+        if not fields:
+            return product
+        return {k: product[k] for k in ["id"] + fields if k in product}
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.server.bytes_sent += len(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeProductServer:
+    """Threaded local HTTP server with DummyJSON-compatible product routes."""
+
+    def __init__(self, num_products: int = 200, connect_latency: float = 0.0,
+                 request_latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.products = make_products(num_products)
+        self.httpd.connect_latency = connect_latency
+        self.httpd.request_latency = request_latency
+        self.httpd.connections = 0
+        self.httpd.requests = 0
+        self.httpd.bytes_sent = 0
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/products"
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "connections": self.httpd.connections,
+            "requests": self.httpd.requests,
+            "bytes_sent": self.httpd.bytes_sent,
+        }
+
+    def reset_stats(self) -> None:
+        self.httpd.connections = 0
+        self.httpd.requests = 0
+        self.httpd.bytes_sent = 0
+
+    def start(self) -> "FakeProductServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    # Run standalone: python -m benchmarks.fake_product_api
+    server = FakeProductServer(port=8765)
+    print(f"Fake product API on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
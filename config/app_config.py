@@ -0,0 +1,105 @@
+import os
+from dotenv import load_dotenv
+load_dotenv()
+
+"""
+Runtime settings for the non-LLM parts of the advisor (HTTP client, caches, ...).
+
+Every value can be overridden from the environment or the .env file,
+so nothing here needs to be edited for normal use.
+"""
+
+# Base URL of the product API (DummyJSON by default, a local fake server in benchmarks).
+PRODUCT_API_URL = os.getenv("PRODUCT_API_URL", "https://dummyjson.com/products")
+
+# Request only the product fields the tools use (DummyJSON's `select` parameter,
+# see tools/product_api.py). Set to 0 for an API without field selection.
+PRODUCT_API_SELECT = os.getenv("PRODUCT_API_SELECT", "1") != "0"
+
+HTTP_CONFIG = {
+    "pool_size": int(os.getenv("HTTP_POOL_SIZE", "10")),  # keep-alive connections per host
+    "connect_timeout": float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05")),  # seconds
+    "read_timeout": float(os.getenv("HTTP_READ_TIMEOUT", "10")),  # seconds
+    "max_retries": int(os.getenv("HTTP_MAX_RETRIES", "2")),  # retries on connect errors / 429 / 5xx
+    "backoff_factor": float(os.getenv("HTTP_BACKOFF_FACTOR", "0.3")),  # 0.3s, 0.6s, 1.2s, ...
+    "pooled": os.getenv("HTTP_POOLED", "1") != "0",  # set to 0 to open a new connection per call
+}
+
+# get_all_products: number of pages fetched in parallel once the first page
+# has reported the catalog total. 1 keeps the original sequential walk.
+PAGE_FETCH_WORKERS = int(os.getenv("PAGE_FETCH_WORKERS", "4"))
+
+# Optional local catalog snapshot used to answer search_products without the API.
+CATALOG_SNAPSHOT = {
+    "enabled": os.getenv("CATALOG_SNAPSHOT", "0") == "1",
+    "path": os.getenv("CATALOG_SNAPSHOT_PATH", os.path.join(".cache", "catalog.json.gz")),
+    "ttl": float(os.getenv("CATALOG_SNAPSHOT_TTL", str(6 * 3600))),  # seconds
+}
+
+# TTL + LRU cache for product tool responses (tools/response_cache.py).
+# Set RESPONSE_CACHE_DB to a file path to keep entries across restarts.
+RESPONSE_CACHE = {
+    "enabled": os.getenv("RESPONSE_CACHE", "1") != "0",
+    "ttl": float(os.getenv("RESPONSE_CACHE_TTL", "600")),  # seconds
+    "max_entries": int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512")),
+    "max_bytes": int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    "db_path": os.getenv("RESPONSE_CACHE_DB") or None,
+}
+
+# Skip the SearchOrchestrator chat when tools/search_planner.py can pick the keyword itself.
+SEARCH_FAST_PATH = os.getenv("SEARCH_FAST_PATH", "1") != "0"
+
+# Build the brand/category vocabulary of parse_constraints from the catalog at startup
+# (tools/constraint_parser.py). 0 = only the built-in brand list and phone words.
+CATALOG_VOCABULARY = os.getenv("CATALOG_VOCABULARY", "1") != "0"
+
+# Let tools/critic_rules.py decide what its mechanical checks can (wrong price/rating and
+# broken limits are rejected, clean answers to simple requests approved); the rest goes to the critic LLM.
+CRITIC_RULES = os.getenv("CRITIC_RULES", "1") != "0"
+
+# Append one JSON line per request with per-stage timings (utils/tracing.py). Empty = in memory only.
+TRACE_FILE = os.getenv("TRACE_FILE") or None
+
+# Cache for analyzer/critic replies (utils/llm_cache.py), keyed on system prompt,
+# request and candidate list. LLM_CACHE_SIMILARITY is the word-overlap (Jaccard)
+# needed to reuse the reply of a paraphrased request; 1 (default) = exact matches only.
+LLM_CACHE = {
+    "enabled": os.getenv("LLM_CACHE", "1") != "0",
+    "ttl": float(os.getenv("LLM_CACHE_TTL", "3600")),  # seconds
+    "max_entries": int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256")),
+    "similarity": float(os.getenv("LLM_CACHE_SIMILARITY", "1")),
+    "db_path": os.getenv("LLM_CACHE_DB") or None,
+}
+
+# Warn when CLI/server startup (imports + agent construction) takes longer than this. 0 = never.
+STARTUP_BUDGET_S = float(os.getenv("STARTUP_BUDGET_S", "5"))
+
+# Token budget for the whole analyzer prompt (~4 characters per token). The candidate
+# list gets what the instructions leave and drops details, then candidates, to fit.
+ANALYZER_PROMPT_TOKENS = int(os.getenv("ANALYZER_PROMPT_TOKENS", "1200"))
+
+# Trimming of product tool results inside the orchestrator chat (tools/result_projection.py).
+# TOOL_RESULT_FIELDS: comma-separated product fields to keep (empty = the default set).
+TOOL_RESULTS = {
+    "enabled": os.getenv("TOOL_RESULTS_PROJECTION", "1") != "0",
+    "fields": [f.strip() for f in os.getenv("TOOL_RESULT_FIELDS", "").split(",") if f.strip()],
+    "max_products": int(os.getenv("TOOL_RESULT_MAX_PRODUCTS", "20")),
+    "max_chars": int(os.getenv("TOOL_RESULT_MAX_CHARS", "8000")),
+    "dedupe": os.getenv("TOOL_RESULT_DEDUPE", "1") != "0",  # send already-seen products as ID references
+}
+
+# One rate limiter for all LLM calls of the process (utils/llm_limiter.py). LLM_RATE_LIMIT is
+# the combined rate in requests per second and replaces AutoGen's per-client api_rate_limit;
+# empty = no shared rate (each client keeps its api_rate_limit), only backoff and coalescing.
+LLM_RATE_LIMIT = {
+    "enabled": os.getenv("LLM_SHARED_LIMITER", "1") != "0",
+    "rate": float(os.getenv("LLM_RATE_LIMIT") or 0) or None,
+    "burst": int(os.getenv("LLM_RATE_BURST", "3")),  # calls allowed back to back
+    "max_retries": int(os.getenv("LLM_RATE_MAX_RETRIES", "3")),  # retries after a 429
+    "backoff": float(os.getenv("LLM_RATE_BACKOFF", "2")),  # seconds, doubled per retry
+    "coalesce": os.getenv("LLM_COALESCE", "1") != "0",  # identical concurrent calls share one request
+}
+
+# Stop the SearchOrchestrator chat (without another LLM turn) once its tool results hold
+# this many products that satisfy the request's constraints. 0 = wait for its final answer.
+SEARCH_ENOUGH_PRODUCTS = int(os.getenv("SEARCH_ENOUGH_PRODUCTS", "10"))
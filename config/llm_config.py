@@ -17,7 +17,7 @@ LLM_CONFIG = {
             "model": "gemini-2.5-flash-lite",
             "api_type": "google",
             "api_key": GEMINI_API_KEY,
-            "api_rate_limit": 0.1,  # 10 requests per second
+            "api_rate_limit": 0.1,  # requests per second per client: one every 10 s
             "max_retries": 1,
             "num_predict": 1,
             "repeat_penalty": 1.0,
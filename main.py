@@ -1,15 +1,24 @@
+from utils import startup  # first, so startup timing covers the imports below
+
+import argparse
+import contextvars
 import logging
-import json
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 from config.llm_config import LLM_CONFIG
+from config.app_config import CATALOG_SNAPSHOT, STARTUP_BUDGET_S, TRACE_FILE
 
-from agents.product_search_orchestrator import get_search_orchestrator_agent
-from agents.product_analyzer_agent import get_product_analyzer_agent
-from agents.product_internal_critic_agent import get_product_internal_critic_agent
-from agents.tool_executor_agent import get_tool_executor
-
-from utils.output_formatter import extract_json_block, format_products_for_analyzer, parse_products_from_search
+from tools.product_api import enable_catalog_snapshot
+from tools.constraint_parser import load_catalog_vocabulary_in_background
+from tools.critic_rules import critic_stats
+from tools.search_planner import planner_stats
+from tools.response_cache import get_response_cache
+from utils.llm_cache import get_llm_cache
+from utils.llm_limiter import get_llm_limiter
+from utils.tracing import configure_tracing, start_trace, finish_trace, tracer
+from batch import run_batch
+from pipeline import build_agents, run_search, run_analyzer, run_critic, streaming_llm_config
 
 # Configure global logging levels for this script.
 logging.basicConfig(level=logging.INFO)
@@ -32,6 +41,58 @@ def print_banner():
     print("Type 'exit', 'quit', or 'q' to quit.\n")
 
 
+def print_section(title: str):
+    """
+    Section header used for the recommendations and the critic review.
+    """
+    print("\n" + "=" * 70)
+    print(title)
+    print("=" * 70 + "\n")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Product Advisor CLI")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream analyzer and critic tokens to the terminal as they are generated.",
+    )
+    parser.add_argument(
+        "--serial",
+        action="store_true",
+        help="Wait for the critic before showing the recommendations (original behaviour).",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="INPUT.jsonl",
+        help="Process the requests in a JSONL file instead of starting the interactive prompt.",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="OUTPUT.jsonl",
+        default="batch_results.jsonl",
+        help="Where batch mode writes its results (default: batch_results.jsonl).",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="TRACE.jsonl",
+        default=TRACE_FILE,
+        help="Append per-request stage timings as JSON lines to this file (default: $TRACE_FILE).",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="Run as a long-lived server on HOST:PORT, PORT or unix:/path (see server.py).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Requests processed in parallel in batch or server mode (default: 4).",
+    )
+    return parser.parse_args()
+
+
 def main():
     """
     Main entry point for the Product Advisor CLI application.
@@ -39,23 +100,63 @@ def main():
     High-level flow for each user query:
         1. Create the agents (search, analyzer, critic) and the tool executor.
         2. Read user input (e.g., "find me a phone under 200$").
-        3. Use the tool executor + search orchestrator agent to:
-            - Decide on search queries.
-            - Call product APIs via tools.
-            - Aggregate results into a JSON structure with "products".
+        3. Search for products:
+            - Simple requests: the rule-based planner picks the keyword and
+              search_products is called directly (no LLM).
+            - Otherwise the tool executor + search orchestrator agent
+              decide on search queries, call product APIs via tools and
+              aggregate results into a JSON structure with "products".
         4. Extract and parse the products from the search result.
-        5. Format those products into a compact text list for the analyzer.
+        5. Filter them against the user's constraints, keep the top candidates
+           and format them into a compact text list for the analyzer.
         6. Call the analyzer agent directly (single LLM call) to:
             - Rank, compare, and pick 2–3 recommendations.
         7. Call the critic agent directly (single LLM call) to:
             - Review and critique the analyzer's recommendations.
         8. Print both the recommendations and the critic review to the user.
+
+    By default the recommendations are printed as soon as the analyzer
+    returns while the critic runs in the background (--serial waits for
+    both first). With --stream both agents' tokens are printed as they arrive.
+    With --batch, requests are read from a JSONL file instead (see batch.py);
+    with --serve, they arrive over HTTP and the agents stay warm (see server.py).
     """
-    # Assign and create agents
-    search_agent = get_search_orchestrator_agent(custom_llm_config=LLM_CONFIG)
-    analyzer_agent = get_product_analyzer_agent(custom_llm_config=LLM_CONFIG)
-    critic_agent = get_product_internal_critic_agent(custom_llm_config=LLM_CONFIG)
-    tool_executor = get_tool_executor()
+    args = parse_args()
+    configure_tracing(args.trace)
+
+    # Optionally answer searches from a local catalog snapshot (see config/app_config.py).
+    if CATALOG_SNAPSHOT["enabled"]:
+        enable_catalog_snapshot(CATALOG_SNAPSHOT["path"], CATALOG_SNAPSHOT["ttl"])
+    # Brand and category words of parse_constraints come from the catalog (loaded in the background).
+    load_catalog_vocabulary_in_background()
+
+    if args.batch:
+        summary = run_batch(args.batch, args.output, LLM_CONFIG, workers=args.workers)
+        print(f"\nBatch finished: {summary}")
+        print(f"Results written to {args.output}\n")
+        print(tracer.format_summary())
+        return
+
+    if args.serve:
+        # Imported here: only server mode needs it.
+        from server import serve
+        serve(args.serve, LLM_CONFIG, workers=args.workers, startup_budget_s=STARTUP_BUDGET_S)
+        return
+
+    # Streaming needs stream=True in the analyzer/critic llm_config.
+    answer_config = streaming_llm_config(LLM_CONFIG) if args.stream else LLM_CONFIG
+
+    # Assign and create agents (this is where AutoGen and the Gemini SDKs get imported)
+    with startup.phase("agents"):
+        agents = build_agents(LLM_CONFIG, answer_config)
+    startup.report(STARTUP_BUDGET_S)
+    search_agent = agents["search"]
+    analyzer_agent = agents["analyzer"]
+    critic_agent = agents["critic"]
+    tool_executor = agents["executor"]
+
+    # One background worker for the critic, reused across queries.
+    critic_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="critic")
 
     print_banner()
 
@@ -64,136 +165,77 @@ def main():
         user_input = input("You: ").strip() # Read user input
         if user_input.lower() in ("exit", "quit", "q"): # Exit commands
             print("\nGoodbye!\n")
+            if get_response_cache() is not None:
+                logging.info("Product response cache: %s", get_response_cache().stats())
+            if get_llm_cache() is not None:
+                logging.info("LLM response cache: %s", get_llm_cache().stats())
+            if get_llm_limiter() is not None:
+                logging.info("LLM rate limiter: %s", get_llm_limiter().stats())
+            logging.info("Search paths: %s", planner_stats.summary())
+            logging.info("Critic: %s", critic_stats.summary())
+            if tracer.traces:
+                print("Latency per stage this session:\n")
+                print(tracer.format_summary() + "\n")
             break
-        
+
         # Skip empty inputs and ask again for a user input
         if not user_input:
             continue
 
+        start_trace(user_input)
         try:
-         
-            # Search phase, Multi-turn chat with tools.
-     
+
+            # Search phase, rule-based fast path or multi-turn chat with tools.
+
             print("\n" + "-" * 70)
             print("⏳ Processing your request...\n")
             print("[Searching] Finding products...\n")
 
-            # this prompt guides the orchestrator by telling it what to do.
-            search_prompt = (
-                "User wants:\n"
-                f"{user_input}\n\n"
-                "Use a good keyword, search for products, and return JSON as specified."
-            )
-
-            # tool_executor.initiate_chat handles the multi-turn chat with tool calls
-            # - the orchestrator agent decides when/how to call tools
-            # - the tool executor runs the tools and returns results
-            chat_search = tool_executor.initiate_chat(
-                search_agent,
-                message=search_prompt,
-                max_turns=8,  # give orchestrator enough room to call tools & finish
-            )
-
-            # After the multi-turn search conversation, we scan the chat history
-            # from the end to find the last message that looks like it contains
-            # a JSON object with a "products" field.
-            search_text = ""
-            for msg in reversed(chat_search.chat_history):
-                content = msg.get("content") or ""
-                if not content:
-                    continue
-                # Look for common patterns indicating a products JSON.
-                if '"products"' in content or '"products":' in content or '{\n  "products"' in content:
-                    search_text = content
-                    break
-            
-            # If we couldn't find any JSON results, inform the user.
-            # we cannot proceed further without products to analyze.
-            if not search_text:
-                print("⚠️ Could not find any JSON results from the search agent.\n")
-                continue
-
-            # Parse products from the extracted JSON text
-            products = parse_products_from_search(search_text)
+            products = run_search(search_agent, tool_executor, user_input)
 
-            # If no products were parsed or parsing failed, show debug info and restart.
+            # If no products were found or parsing failed, restart.
             if not products:
-                print("⚠️ Could not parse any products from the search response.\n")
-                print("Raw response:\n")
-                print(search_text)
-                print()
                 continue
 
             #Analyze contents, direct LLM call
             print("[Analyzing] Ranking products...\n")
 
-            # Turn the list of product dicts into a compact, numbered text list.
-            # This becomes the "candidate products" section for the analyzer.
-            products_text = format_products_for_analyzer(products)
-
-            # Build the full prompt for the analyzer agent:
-            # - Include the original user request.
-            # - Include the formatted candidate product list.
-            # - Instruct the analyzer to recommend 2–3 products and follow
-            #   its defined output format (described in its system prompt).
-            analyzer_prompt = (
-                "USER REQUEST:\n"
-                f"{user_input}\n\n"
-                "CANDIDATE PRODUCTS:\n"
-                f"{products_text}\n\n"
-                "Based on the above, recommend 2–3 products following your output format."
-            )
-
-            # Direct call to the analyzer agent (no tools here, pure LLM response).
-            analyzer_msg = analyzer_agent.generate_reply(
-                messages=[{"role": "user", "content": analyzer_prompt}]
-            )
-
-            # The return type can vary depending on the Autogen setup (dict/string),
-            # so we normalize it to a string for printing and further use.
-            analyzer_result = (
-                analyzer_msg.get("content", "")
-                if isinstance(analyzer_msg, dict)
-                else str(analyzer_msg)
-            )
+            if args.stream:
+                # Tokens are printed as they arrive, so the header goes first.
+                print_section("RECOMMENDED PRODUCTS")
+            analyzer_result = run_analyzer(analyzer_agent, user_input, products, stream=args.stream)
 
             if not analyzer_result.strip():
                 print("⚠️ Analyzer did not return any content.\n")
                 continue
 
             #Critic grades contents also direct LLM call
-            print("[Critic] Reviewing recommendations...\n")
-
-            # Build the critic prompt including:
-            # - The original user request.
-            # - The analyzer's recommendations.
-            critic_prompt = (
-                "User request:\n"
-                f"{user_input}\n\n"
-                "Analyzer recommendations:\n"
-                f"{analyzer_result}\n\n"
-                "Evaluate them according to your system message."
-            )
-
-            critic_msg = critic_agent.generate_reply(
-                messages=[{"role": "user", "content": critic_prompt}]
-            )
-            critic_result = (
-                critic_msg.get("content", "")
-                if isinstance(critic_msg, dict)
-                else str(critic_msg)
-            )
-
-            # Display final results to the user
-            print("\n" + "=" * 70)
-            print("RECOMMENDED PRODUCTS")
-            print("=" * 70 + "\n")
-            print(analyzer_result.strip())
-
-            print("\n" + "=" * 70)
-            print("CRITIC REVIEW")
-            print("=" * 70 + "\n")
-            print(critic_result.strip() or "(No critic feedback)")
+            if args.stream:
+                print_section("CRITIC REVIEW")
+                critic_result = run_critic(critic_agent, user_input, analyzer_result, products, stream=True)
+                if not critic_result.strip():
+                    print("(No critic feedback)")
+            else:
+                # Start the critic right away; unless --serial, the user reads
+                # the recommendations while it runs.
+                # (copy_context keeps the critic's timings in this request's trace)
+                critic_future = critic_pool.submit(
+                    contextvars.copy_context().run, run_critic, critic_agent, user_input, analyzer_result, products
+                )
+                if args.serial:
+                    print("[Critic] Reviewing recommendations...\n")
+                    critic_future.result()
+
+                # Display final results to the user
+                print_section("RECOMMENDED PRODUCTS")
+                print(analyzer_result.strip())
+
+                if not args.serial:
+                    print("\n[Critic] Reviewing recommendations...")
+
+                critic_result = critic_future.result()
+                print_section("CRITIC REVIEW")
+                print(critic_result.strip() or "(No critic feedback)")
 
             print("\n" + "-" * 70)
             print("Ready for your next query.\n")
@@ -208,6 +250,10 @@ def main():
             import traceback
             traceback.print_exc()
             print("Please try another query.\n")
+        finally:
+            finish_trace()
+
+    critic_pool.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == "__main__":
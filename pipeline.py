@@ -0,0 +1,379 @@
+import copy
+import logging
+import time
+
+from config.app_config import ANALYZER_PROMPT_TOKENS, CRITIC_RULES, SEARCH_FAST_PATH
+
+from tools.product_api import search_products
+from tools.critic_rules import critic_stats, review_recommendations
+from tools.search_planner import plan_search, planner_stats
+from tools.analysis_tools import rank_candidates
+from tools.product_record import ensure_products
+from utils.llm_cache import get_llm_cache
+from utils.llm_limiter import get_llm_limiter, without_client_rate_limit
+from utils.output_formatter import (
+    create_analyzer_prompt,
+    estimate_tokens,
+    format_products_within_budget,
+    parse_product_records,
+    parse_search_selection,
+)
+from utils.tracing import span, start_trace, finish_trace
+
+"""
+The per-query steps of the advisor (Search -> Analyze -> Critic) as plain functions.
+
+main.py drives them from the interactive loop; keeping them here means other
+entry points can run exactly the same flow.
+
+The agent modules (and with them AutoGen and the Gemini SDKs) are only
+imported when build_agents() is first called.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def build_agents(llm_config: dict, answer_config: dict = None) -> dict:
+    """
+    Create one full set of agents. answer_config (defaults to llm_config) is
+    used for the analyzer and critic, e.g. a streaming copy.
+    The LLM agents share the process-wide limiter from utils/llm_limiter.py
+    when it is enabled; with an LLM_RATE_LIMIT rate it replaces AutoGen's
+    per-client api_rate_limit.
+    """
+    from agents.product_search_orchestrator import get_search_orchestrator_agent
+    from agents.product_analyzer_agent import get_product_analyzer_agent
+    from agents.product_internal_critic_agent import get_product_internal_critic_agent
+    from agents.tool_executor_agent import get_tool_executor
+
+    answer_config = answer_config or llm_config
+    limiter = get_llm_limiter()
+    if limiter is not None and limiter.base_rate:
+        llm_config = without_client_rate_limit(llm_config)
+        answer_config = without_client_rate_limit(answer_config)
+    agents = {
+        "search": get_search_orchestrator_agent(custom_llm_config=llm_config),
+        "analyzer": get_product_analyzer_agent(custom_llm_config=answer_config),
+        "critic": get_product_internal_critic_agent(custom_llm_config=answer_config),
+        "executor": get_tool_executor(),
+    }
+    if limiter is not None:
+        for name in ("search", "analyzer", "critic"):
+            limiter.govern(agents[name])
+    # Lets the orchestrator stop as soon as the tools returned enough matching products.
+    termination = getattr(agents["executor"], "search_termination", None)
+    if termination is not None:
+        agents["search"].register_reply(agents["executor"], termination.early_reply, position=0)
+    return agents
+
+
+def reply_text(msg) -> str:
+    """
+    The return type of generate_reply can vary depending on the Autogen setup
+    (dict/string), so we normalize it to a string for printing and further use.
+    """
+    if isinstance(msg, dict):
+        return msg.get("content", "") or ""
+    return str(msg) if msg is not None else ""
+
+
+def streaming_llm_config(llm_config: dict) -> dict:
+    """Copy of an llm_config with token streaming switched on for every model."""
+    streamed = copy.deepcopy(llm_config)
+    for entry in streamed.get("config_list", []):
+        entry["stream"] = True
+    return streamed
+
+
+class _EchoConsole:
+    """
+    IOStream used while streaming: forwards printed chunks to the terminal and
+    remembers whether the client actually streamed anything (not every
+    backend supports it; then the caller prints the full reply instead).
+    """
+
+    def __init__(self):
+        self.streamed = False
+
+    def print(self, *objects, sep: str = " ", end: str = "\n", flush: bool = False) -> None:
+        self.streamed = True
+        print(*objects, sep=sep, end=end, flush=flush)
+
+    def input(self, prompt: str = "", *, password: bool = False) -> str:
+        return input(prompt)
+
+
+def generate_text(agent, prompt: str, stream: bool = False) -> str:
+    """
+    Single direct LLM call (no tools) returning the reply text.
+    With stream=True, tokens are printed as they arrive (the agent must have
+    been built with streaming_llm_config) and the reply is printed in one go
+    if the backend did not stream.
+    """
+    messages = [{"role": "user", "content": prompt}]
+    if not stream:
+        return reply_text(agent.generate_reply(messages=messages))
+
+    from autogen.io import IOStream
+
+    console = _EchoConsole()
+    with IOStream.set_default(console):
+        text = reply_text(agent.generate_reply(messages=messages))
+    if console.streamed:
+        print()
+    else:
+        print(text.strip())
+    return text
+
+
+def cached_generate_text(agent, prompt: str, user_input: str, context: str, stream: bool = False) -> tuple:
+    """
+    generate_text behind the shared LLM cache (utils/llm_cache.py), keyed on
+    the agent's system message, the user request and `context` (what the
+    reply depends on besides the request). Returns (text, cached).
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return generate_text(agent, prompt, stream=stream), False
+    text, hit = cache.get_or_call(
+        agent.system_message, user_input, context,
+        lambda: generate_text(agent, prompt, stream=stream),
+    )
+    if hit and stream:
+        print(text.strip())
+    return text, hit
+
+
+def _from_agent(msg: dict, agent) -> bool:
+    """
+    True for chat messages written by `agent` as seen by its chat partner:
+    text replies carry the agent's name, tool calls are "assistant" messages
+    without a name.
+    """
+    name = msg.get("name")
+    return name == agent.name or (name is None and msg.get("role") == "assistant")
+
+
+def run_agent_search(search_agent, tool_executor, user_input: str, silent: bool = False) -> list:
+    """
+    Slow path: multi-turn chat between the tool executor and the search
+    orchestrator. Returns the parsed products as Product records (empty on failure).
+    silent=True hides the chat transcript (used by batch mode) and sends
+    parse failures to the log instead of stdout.
+    """
+    # this prompt guides the orchestrator by telling it what to do.
+    search_prompt = (
+        "User wants:\n"
+        f"{user_input}\n\n"
+        "Use a good keyword, search for products, and return JSON as specified."
+    )
+
+    # tool_executor.initiate_chat handles the multi-turn chat with tool calls
+    # - the orchestrator agent decides when/how to call tools
+    # - the tool executor runs the tools and returns results
+    max_turns = 8  # give orchestrator enough room to call tools & finish
+    projector = getattr(tool_executor, "result_projector", None)
+    if projector is not None:
+        projector.reset()  # "seen" references only refer to products of this chat
+    termination = getattr(tool_executor, "search_termination", None)
+    if termination is not None:
+        termination.start(user_input, projector)
+    with span("search.agent_chat", max_turns=max_turns) as s:
+        raw_before, sent_before = (projector.raw_chars, projector.sent_chars) if projector else (0, 0)
+        chat_search = tool_executor.initiate_chat(
+            search_agent,
+            message=search_prompt,
+            max_turns=max_turns,
+            silent=silent,
+        )
+        history = chat_search.chat_history
+        # Orchestrator turns: its text replies and its tool calls ("assistant"
+        # messages, which carry no name).
+        s["turns_used"] = (
+            sum(1 for m in history if m.get("tool_calls") or _from_agent(m, search_agent))
+            or (len(history) + 1) // 2
+        )
+        s["history_chars"] = sum(len(str(m.get("content") or "")) for m in history)
+        if projector is not None:
+            s["tool_chars_raw"] = projector.raw_chars - raw_before
+            s["tool_chars_sent"] = projector.sent_chars - sent_before
+        if termination is not None:
+            s["stopped_early"] = termination.stopped_early
+            s["query"] = termination.query
+
+    if termination is not None and termination.result is not None:
+        # The termination check already validated the final answer and fetched
+        # its products from the result store (or stopped early with the
+        # products the tools returned).
+        search_text = ""
+        products = termination.result
+    else:
+        # After the multi-turn search conversation, we scan the chat history
+        # from the end to find the last message with the orchestrator's answer
+        # (product IDs, or a "products" list from older prompts).
+        # Only the orchestrator's own messages count: tool results and the
+        # prompt can contain "ids"/"products" too.
+        search_text = ""
+        for msg in reversed(chat_search.chat_history):
+            content = msg.get("content") or ""
+            if not _from_agent(msg, search_agent):
+                continue
+            if isinstance(content, str) and ('"ids"' in content or '"products"' in content):
+                search_text = content
+                break
+
+        # If we couldn't find any JSON results, inform the user.
+        # we cannot proceed further without products to analyze.
+        if not search_text:
+            if silent:
+                logger.warning("Could not find any JSON results from the search agent.")
+            else:
+                print("⚠️ Could not find any JSON results from the search agent.\n")
+            return []
+        selection = parse_search_selection(search_text) if projector is not None else None
+        if selection is not None:
+            products = projector.select(selection["ids"], selection["call_id"])
+        else:
+            products = parse_product_records(search_text)
+
+    # Tool results were trimmed for the chat, so products the tools returned
+    # are swapped back for their full versions.
+    if projector is not None:
+        products = projector.resolve(products)
+    products = ensure_products(products)
+
+    # If no products were parsed or parsing failed, show debug info.
+    if not products:
+        if silent:
+            logger.warning("Could not parse any products from the search response.")
+            if search_text:
+                logger.debug("Raw search response:\n%s", search_text)
+        else:
+            print("⚠️ Could not parse any products from the search response.\n")
+            if search_text:
+                print("Raw response:\n")
+                print(search_text)
+                print()
+    return products
+
+
+def run_search(search_agent, tool_executor, user_input: str, silent: bool = False) -> list:
+    """
+    Search phase. Simple requests ("phones under $300") are planned by the
+    rule-based planner and sent straight to search_products; everything
+    else, or a fast-path search with no results, goes through the
+    orchestrator chat. Path counts and timings are kept in planner_stats.
+    Returns Product records.
+    """
+    started = time.perf_counter()
+    with span("search") as s:
+        plan = plan_search(user_input) if SEARCH_FAST_PATH else None
+        if plan is None:
+            reason = "not confident" if SEARCH_FAST_PATH else "disabled"
+        else:
+            result = search_products(plan["query"], limit=20)
+            if result.get("products"):
+                planner_stats.record("fast", time.perf_counter() - started)
+                s.update(path="fast", query=plan["query"], products=len(result["products"]))
+                return ensure_products(result["products"])
+            reason = "no results"
+            started = time.perf_counter()  # only time the agent chat itself
+
+        products = run_agent_search(search_agent, tool_executor, user_input, silent=silent)
+        planner_stats.record("agent", time.perf_counter() - started, reason=reason)
+        s.update(path="agent", fallback_reason=reason, products=len(products))
+        return products
+
+
+def build_candidate_list(user_input: str, products: list, budget_tokens: int = ANALYZER_PROMPT_TOKENS) -> tuple:
+    """
+    Filter/rank the search results and format them as the analyzer's
+    numbered candidate list, sized so the whole analyzer prompt stays
+    within budget_tokens. Returns (products_text, info) where info has the
+    candidate count, the optional fields included and the estimated tokens.
+    """
+    # Drop candidates that break the user's price/rating/etc. limits and
+    # keep the best-scoring ones, so the analyzer prompt stays small.
+    candidates = rank_candidates(products, user_input, k=15)
+
+    # Turn the candidates into a compact, numbered text list. The request and
+    # instructions come out of the budget first; the list gets the rest.
+    overhead = estimate_tokens(create_analyzer_prompt(user_input, ""))
+    products_text, info = format_products_within_budget(candidates, max(budget_tokens - overhead, 0))
+    info["est_prompt_tokens"] = overhead + info["est_tokens"]
+    logger.info("Analyzer candidates: %d of %d search results, details %s, ~%d prompt tokens",
+                info["items"], len(products), info["details"] or "none", info["est_prompt_tokens"])
+    return products_text, info
+
+
+def build_critic_prompt(user_input: str, analyzer_result: str) -> str:
+    """
+    Build the critic prompt including:
+    - The original user request.
+    - The analyzer's recommendations.
+    """
+    return (
+        "User request:\n"
+        f"{user_input}\n\n"
+        "Analyzer recommendations:\n"
+        f"{analyzer_result}\n\n"
+        "Evaluate them according to your system message."
+    )
+
+
+def run_analyzer(analyzer_agent, user_input: str, products: list, stream: bool = False) -> str:
+    """Direct call to the analyzer agent (no tools here, pure LLM response)."""
+    with span("analyzer") as s:
+        products_text, info = build_candidate_list(user_input, products)
+        prompt = create_analyzer_prompt(user_input, products_text)
+        text, hit = cached_generate_text(analyzer_agent, prompt, user_input, products_text, stream=stream)
+        s.update(prompt_chars=len(prompt), response_chars=len(text), cache_hit=hit,
+                 candidates=info["items"], details=info["details"], est_prompt_tokens=info["est_prompt_tokens"])
+        return text
+
+
+def run_critic(critic_agent, user_input: str, analyzer_result: str, products: list = None,
+               stream: bool = False) -> str:
+    """
+    Critic grades the analyzer's recommendations. With the search results
+    (`products`), the rule-based check (tools/critic_rules.py) decides first;
+    the direct LLM call only runs when the rules cannot. Counts are kept in
+    critic_stats.
+    """
+    with span("critic") as s:
+        if CRITIC_RULES and products:
+            verdict, reason = review_recommendations(user_input, analyzer_result, products)
+            critic_stats.record(reason, by_rules=verdict is not None)
+            s["rules"] = reason
+            if verdict is not None:
+                if stream:
+                    print(verdict)
+                s.update(response_chars=len(verdict), cache_hit=False)
+                return verdict
+        else:
+            critic_stats.record("disabled" if products else "no products", by_rules=False)
+        prompt = build_critic_prompt(user_input, analyzer_result)
+        text, hit = cached_generate_text(critic_agent, prompt, user_input, analyzer_result, stream=stream)
+        s.update(prompt_chars=len(prompt), response_chars=len(text), cache_hit=hit)
+        return text
+
+
+def process_query(agents: dict, user_input: str, silent: bool = False) -> dict:
+    """
+    Run the whole flow for one request without printing the results.
+    Returns a dict with the number of products found, the analyzer's
+    recommendations, the critic review (empty strings if a step had no output)
+    and the id of the request's trace.
+    """
+    trace = start_trace(user_input)
+    try:
+        products = run_search(agents["search"], agents["executor"], user_input, silent=silent)
+        result = {"query": user_input, "products_found": len(products), "recommendations": "", "critic": ""}
+        if products:
+            result["recommendations"] = run_analyzer(agents["analyzer"], user_input, products)
+            if result["recommendations"].strip():
+                result["critic"] = run_critic(agents["critic"], user_input, result["recommendations"], products)
+    finally:
+        finish_trace()
+    result["trace_id"] = trace["trace_id"]
+    return result
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import stat
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from batch import worker_llm_config
+from pipeline import build_agents, process_query
+from tools.critic_rules import critic_stats
+from tools.response_cache import get_response_cache
+from tools.search_planner import planner_stats
+from utils import startup
+from utils.llm_cache import get_llm_cache
+from utils.llm_limiter import get_llm_limiter
+from utils.tracing import tracer
+
+"""
+Server mode: a long-running process that keeps the agents, their LLM clients
+and the HTTP/caches warm, so a request costs only the pipeline itself
+(no interpreter start, AutoGen import or agent construction).
+
+Listens on TCP ("127.0.0.1:8765", "8765") or a Unix socket ("unix:/tmp/advisor.sock"):
+
+    POST /query   {"query": "phones under $300"}  -> same fields as batch mode
+    GET  /health  {"status": "ok", "workers": 2}
+    GET  /stats   per-stage latency, cache and search path stats
+
+    curl -s localhost:8765/query -d '{"query": "phones under $300"}'
+    curl -s --unix-socket /tmp/advisor.sock http://advisor/query -d '{"query": "perfume"}'
+
+Each worker owns one set of agents (they keep conversation state). Requests
+beyond the number of workers wait for a free set; LLM calls of all workers
+go through the shared limiter (utils/llm_limiter.py).
+"""
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024
+
+
+class AgentPool:
+    """Fixed number of pre-built agent sets, borrowed one per request."""
+
+    def __init__(self, llm_config: dict, workers: int = 2):
+        self.size = max(1, workers)
+        config = worker_llm_config(llm_config, self.size)
+        self._free: "queue.Queue[dict]" = queue.Queue()
+        for _ in range(self.size):
+            self._free.put(build_agents(config))
+
+    @contextmanager
+    def agents(self):
+        agents = self._free.get()
+        try:
+            yield agents
+        finally:
+            self._free.put(agents)
+
+
+class AdvisorRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for clients that send several queries
+    pool: AgentPool = None
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address.
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "workers": self.pool.size})
+        elif self.path == "/stats":
+            response_cache, llm_cache, limiter = get_response_cache(), get_llm_cache(), get_llm_limiter()
+            self._send_json(200, {
+                "requests": tracer.traces,
+                "stages": tracer.summary(),
+                "search_paths": planner_stats.summary(),
+                "critic": critic_stats.summary(),
+                "response_cache": response_cache.stats() if response_cache else None,
+                "llm_cache": llm_cache.stats() if llm_cache else None,
+                "llm_limiter": limiter.stats() if limiter else None,
+                "startup": startup.phases,
+            })
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/query":
+            self.close_connection = True  # the unread body must not be parsed as the next request
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self._send_json(400, {"error": "invalid Content-Length"})
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {"error": "request body too large"})
+            return
+        try:
+            query = json.loads(self.rfile.read(length) or b"{}").get("query", "")
+        except (ValueError, AttributeError):
+            self._send_json(400, {"error": 'expected a JSON object like {"query": "..."}'})
+            return
+        if not isinstance(query, str) or not query.strip():
+            self._send_json(400, {"error": '"query" must be a non-empty string'})
+            return
+
+        started = time.perf_counter()
+        try:
+            with self.pool.agents() as agents:
+                result = process_query(agents, query.strip(), silent=True)
+            result["error"] = None
+            status = 200
+        except Exception as e:
+            logger.exception("Query failed: %s", query)
+            result = {"query": query, "products_found": 0, "recommendations": "", "critic": "", "error": str(e)}
+            status = 500
+        result["elapsed_s"] = round(time.perf_counter() - started, 3)
+        self._send_json(status, result)
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        super().server_bind()
+        self.socket_inode = os.lstat(self.server_address).st_ino
+
+    def remove_socket_file(self) -> None:
+        """Unlink the socket file, unless it was replaced by something else since bind."""
+        try:
+            st = os.lstat(self.server_address)
+        except FileNotFoundError:
+            return
+        if stat.S_ISSOCK(st.st_mode) and st.st_ino == getattr(self, "socket_inode", None):
+            os.remove(self.server_address)
+
+
+def _remove_stale_socket(path: str) -> None:
+    """
+    Remove a socket file left behind by a previous run. Anything that is not
+    a socket, or a socket another process still listens on, is left alone
+    and reported as an error.
+    """
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise FileExistsError(f"{path} exists and is not a socket; not removing it")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.remove(path)  # stale socket from a previous run
+        return
+    finally:
+        probe.close()
+    raise OSError(f"another server is already listening on {path}")
+
+
+def make_server(address: str, pool: AgentPool) -> socketserver.BaseServer:
+    """Bind "unix:/path", "host:port" or "port" to a handler serving from `pool`."""
+    handler = type("BoundAdvisorRequestHandler", (AdvisorRequestHandler,), {"pool": pool})
+    if address.startswith("unix:"):
+        path = address[len("unix:"):]
+        _remove_stale_socket(path)
+        return _UnixHTTPServer(path, handler)
+    host, _, port = address.rpartition(":")
+    return ThreadingHTTPServer((host or "127.0.0.1", int(port)), handler)
+
+
+def serve(address: str, llm_config: dict, workers: int = 2, startup_budget_s: float = None) -> None:
+    """Build the agent pool, then answer requests until interrupted."""
+    with startup.phase("agents"):
+        pool = AgentPool(llm_config, workers)
+    server = make_server(address, pool)
+    startup.report(startup_budget_s)
+    logger.info("Product advisor listening on %s with %d worker(s)", address, pool.size)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if isinstance(server, _UnixHTTPServer):
+            server.remove_socket_file()
+        logger.info("Served %d request(s)", tracer.traces)
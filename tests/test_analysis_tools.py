@@ -0,0 +1,37 @@
+from tools.analysis_tools import rank_candidates
+from tools.product_table import ProductTable
+
+"""
+Tests for candidate filtering and ranking (tools/analysis_tools.py).
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+
+def test_rank_candidates_drops_only_the_excluded_brand():
+    phones = [
+        {"id": i, "title": f"{brand} Phone", "brand": brand, "category": "smartphones",
+         "price": price, "rating": 4.0, "availabilityStatus": "In Stock"}
+        for i, (brand, price) in enumerate([("Samsung", 300), ("Oppo", 250), ("Apple", 900), ("Samsung", 450)])
+    ]
+    for request in ("any phone except samsung", "phone other than samsung", "phone under 500 but not samsung",
+                    "anything but samsung", "non-samsung phone"):
+        for products in (phones, ProductTable(phones)):
+            brands = {p["brand"] for p in rank_candidates(products, request)}
+            assert "Samsung" not in brands and "Oppo" in brands, request
+    brands = {p["brand"] for p in rank_candidates(phones, "phone without apple brand")}
+    assert brands == {"Samsung", "Oppo"}
+
+
+def test_rank_candidates_keeps_the_best_k_and_falls_back_to_all():
+    products = [
+        {"id": i, "title": f"Laptop {i}", "category": "laptops", "price": 100 * i,
+         "rating": 3.0 + i / 10, "availabilityStatus": "In Stock"}
+        for i in range(1, 21)
+    ]
+    for given in (products, ProductTable(products)):
+        top = rank_candidates(given, "laptop under $1500", k=5)
+        assert len(top) == 5 and all(p["price"] < 1500 for p in top)
+        assert len(rank_candidates(given, "laptop under $50", k=30)) == 20  # nothing fits: rank them all
+    assert len(rank_candidates(products, "top 3 laptops", k=20)) == 20  # "top 3" does not drop candidates
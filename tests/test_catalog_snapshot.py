@@ -0,0 +1,108 @@
+import gzip
+import time
+
+import pytest
+
+import tools.product_api as product_api
+import tools.response_cache as response_cache
+from benchmarks.fake_product_api import make_products
+from tools.catalog_snapshot import CatalogSnapshot, CatalogStore
+
+"""
+Tests for the local catalog snapshot (tools/catalog_snapshot.py), against a stubbed product API.
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+CATALOG = make_products(60)
+WORDS = ["phone", "smartphones", "laptop", "apple", "perfume", "chair", "coffee", "samsung", "mobile", "notebook"]
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Answer /products and /products/search from CATALOG like DummyJSON; count the requests."""
+    requests = []
+
+    def get_json(url, params=None):
+        params = params or {}
+        requests.append(url)
+        items = CATALOG
+        if url.endswith("/search"):
+            q = params["q"].lower()
+            items = [p for p in CATALOG
+                     if q in p["title"].lower() or q in p["description"].lower() or q in p["category"]]
+        skip, limit = int(params.get("skip", 0)), int(params.get("limit", 30))
+        return {"products": items[skip:skip + limit], "total": len(items), "skip": skip, "limit": limit}
+
+    monkeypatch.setattr(product_api, "_get_json", get_json)
+    monkeypatch.setattr(product_api, "_catalog", None)
+    monkeypatch.setattr(response_cache, "_cache", None)
+    return requests
+
+
+def _wait_for_refresh(store: CatalogStore) -> None:
+    assert store._refreshing.acquire(timeout=5)
+    store._refreshing.release()
+
+
+@pytest.mark.parametrize("word", WORDS)
+def test_snapshot_search_matches_the_api(api, word):
+    snapshot = CatalogSnapshot(CATALOG, built_at=time.time())
+    local, remote = snapshot.search(word, limit=100), product_api.search_products(word, limit=100)
+    assert local["total"] == remote["total"] > 0
+    assert [p["id"] for p in local["products"]] == [p["id"] for p in remote["products"]]
+    assert local["products"][0]["title"] == remote["products"][0]["title"]
+
+
+def test_snapshot_pages_like_the_api(api):
+    snapshot = CatalogSnapshot(CATALOG, built_at=time.time())
+    local = snapshot.search("phone", limit=3, skip=2)
+    remote = product_api.search_products("phone", limit=3, skip=2)
+    assert [p["id"] for p in local["products"]] == [p["id"] for p in remote["products"]]
+    assert snapshot.search("phone chair")["total"] == 0
+    assert snapshot.search("  ")["products"] == []
+
+
+def test_saved_snapshot_loads_with_the_same_index(tmp_path):
+    path = str(tmp_path / "snap" / "catalog.json.gz")
+    snapshot = CatalogSnapshot(CATALOG, built_at=123.0)
+    snapshot.save(path)
+    loaded = CatalogSnapshot.load(path)
+    assert loaded.built_at == 123.0 and len(loaded.products) == len(CATALOG)
+    assert loaded.index == snapshot.index
+    assert loaded.search("laptop") == snapshot.search("laptop")
+    assert CatalogSnapshot.load(str(tmp_path / "missing.json.gz")) is None
+    with gzip.open(path, "wt") as f:
+        f.write('{"version": 0}')
+    assert CatalogSnapshot.load(path) is None
+
+
+def test_store_builds_a_missing_snapshot_in_the_background(api, tmp_path):
+    store = CatalogStore(str(tmp_path / "catalog.json.gz"), ttl=60, page_limit=25)
+    assert store.search("phone") is None  # no snapshot yet: the caller uses the API
+    _wait_for_refresh(store)
+    assert len(store.snapshot.products) == len(CATALOG)
+    assert store.search("phone")["total"] > 0
+    assert store.search("zeppelin") is None  # no local match: the API may know better
+    assert (store.hits, store.misses) == (1, 2)
+
+
+def test_stale_snapshot_is_not_used_and_rebuilt(api, tmp_path):
+    path = str(tmp_path / "catalog.json.gz")
+    CatalogSnapshot(CATALOG[:5], built_at=time.time() - 3600).save(path)
+    store = CatalogStore(path, ttl=60)
+    assert not store.is_fresh()
+    assert store.search("phone") is None
+    _wait_for_refresh(store)
+    assert store.is_fresh() and len(store.snapshot.products) == len(CATALOG)
+    assert len(CatalogSnapshot.load(path).products) == len(CATALOG)  # persisted
+
+
+def test_search_products_answers_from_a_fresh_snapshot(api, tmp_path):
+    path = str(tmp_path / "catalog.json.gz")
+    CatalogSnapshot(CATALOG, built_at=time.time()).save(path)
+    product_api.enable_catalog_snapshot(path, ttl=60)
+    before = len(api)
+    result = product_api.search_products("phone", limit=5)
+    assert len(api) == before and len(result["products"]) == 5
@@ -0,0 +1,117 @@
+from tools.constraint_parser import ConstraintParser
+
+"""
+Regression tests for the compiled constraint parser (tools/constraint_parser.py).
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+CATALOG = [
+    {"brand": "Apple", "category": "smartphones"},
+    {"brand": "Apple", "category": "laptops"},
+    {"brand": "Samsung", "category": "smartphones"},
+    {"brand": "Essence", "category": "beauty"},
+    {"brand": "Beats", "category": "mobile-accessories"},
+    {"brand": "Attitude", "category": "skin-care"},
+    {"brand": "Chanel", "category": "fragrances"},
+]
+
+parser = ConstraintParser.from_products(CATALOG)
+
+
+def test_count_before_price():
+    constraints = parser.parse("at least 10 items under $50")
+    assert constraints["count"] == 10
+    assert constraints["price_max"] == 50
+    assert "price_min" not in constraints
+    assert parser.parse("at least 1,000 items")["count"] == 1000
+
+
+def test_from_without_currency_is_not_a_price():
+    assert "price_min" not in parser.parse("phones from 2020")
+    assert "price_min" not in parser.parse("phones from 2018 to 2020")
+    assert "price_min" not in parser.parse("at least 300")
+
+
+def test_from_and_at_least_with_currency_or_price_word():
+    assert parser.parse("phones from $200")["price_min"] == 200
+    assert parser.parse("laptops from 1.5k dollars")["price_min"] == 1500
+    assert parser.parse("at least 300 euros")["currency"] == "EUR"
+    assert parser.parse("priced from 200")["price_min"] == 200
+    assert parser.parse("phones with a price of at least 300")["price_min"] == 300
+    constraints = parser.parse("phones from $200 to $400")
+    assert (constraints["price_min"], constraints["price_max"]) == (200, 400)
+
+
+def test_small_at_least_is_still_a_rating():
+    assert parser.parse("at least 4")["rating_min"] == 4
+    assert parser.parse("rating at least 4.5")["rating_min"] == 4.5
+
+
+def test_common_word_brands_need_brand_position():
+    assert "brand_in" not in parser.parse("phones with attitude")
+    assert "brand_in" not in parser.parse("apple juice")
+    assert "brand_in" not in parser.parse("the essence of a good perfume")
+    assert parser.parse("mascara by essence")["brand_in"] == {"Essence"}
+    assert parser.parse("beats brand headphones")["brand_in"] == {"Beats"}
+    assert parser.parse("apple laptop under $1500")["brand_in"] == {"Apple"}
+    assert parser.parse("apple phone")["brand_in"] == {"Apple"}
+
+
+def test_other_brands_match_anywhere():
+    assert parser.parse("chanel perfume")["brand_in"] == {"Chanel"}
+    assert parser.parse("something from samsung")["brand_in"] == {"Samsung"}
+    assert "brand_in" not in parser.parse("googles")
+
+
+def test_negated_brands_are_excluded():
+    for query in ("any phone except samsung", "phone other than samsung", "phone under 500 but not samsung"):
+        constraints = parser.parse(query)
+        assert constraints["brand_not_in"] == {"Samsung"}, query
+        assert "brand_in" not in constraints, query
+    assert parser.parse("phone without apple brand")["brand_not_in"] == {"Apple"}
+    assert parser.parse("phones not from samsung or apple")["brand_not_in"] == {"Apple", "Samsung"}
+    constraints = parser.parse("samsung phone, not apple")
+    assert (constraints["brand_in"], constraints["brand_not_in"]) == ({"Samsung"}, {"Apple"})
+
+
+def test_hyphenated_and_but_negations_are_excluded():
+    for query, brand in (("non-apple phone", "Apple"), ("anything but samsung", "Samsung"),
+                         ("any phone but samsung", "Samsung"), ("non-samsung phones under $300", "Samsung")):
+        constraints = parser.parse(query)
+        assert constraints["brand_not_in"] == {brand}, query
+        assert "brand_in" not in constraints, query
+    assert parser.parse("cheap but good samsung phone")["brand_in"] == {"Samsung"}
+
+
+def test_limits_after_a_negation_keep_their_direction():
+    for query in ("phone but not more than 300", "phone but not over $300", "phone that isn't over $300"):
+        constraints = parser.parse(query)
+        assert constraints["price_max"] == 300, query
+        assert "price_min" not in constraints, query
+    constraints = parser.parse("phone but not under 100")
+    assert constraints["price_min"] == 100 and "price_max" not in constraints
+    constraints = parser.parse("phone, not samsung, not more than $400")
+    assert (constraints["brand_not_in"], constraints["price_max"]) == ({"Samsung"}, 400)
+
+
+def test_isnt_excludes_the_brand():
+    for query in ("a phone that isn't samsung", "a phone that is not samsung"):
+        constraints = parser.parse(query)
+        assert constraints["brand_not_in"] == {"Samsung"}, query
+        assert "brand_in" not in constraints, query
+
+
+def test_rating_ranges_are_not_prices():
+    constraints = parser.parse("phones rated between 4 and 5")
+    assert constraints["rating_min"] == 4
+    assert "price_min" not in constraints and "price_max" not in constraints
+    constraints = parser.parse("phone between 4 and 5 stars under $300")
+    assert (constraints["rating_min"], constraints["price_max"]) == (4, 300)
+
+
+def test_numbers_with_units_are_not_prices():
+    assert "price_max" not in parser.parse("phone under 2 years old")
+    assert parser.parse("up to 128 gb phone under $400")["price_max"] == 400
+    assert parser.parse("not more than $300")["price_max"] == 300
@@ -0,0 +1,68 @@
+from tools.critic_rules import review_recommendations
+
+"""
+Tests for the rule-based critic pre-check (tools/critic_rules.py).
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+PHONES = [
+    {"id": 1, "title": "Samsung Galaxy S10", "brand": "Samsung", "category": "smartphones",
+     "price": 299.99, "rating": 4.4, "availabilityStatus": "In Stock"},
+    {"id": 2, "title": "Oppo A57", "brand": "Oppo", "category": "smartphones",
+     "price": 249.99, "rating": 4.1, "availabilityStatus": "In Stock"},
+    {"id": 3, "title": "iPhone X", "brand": "Apple", "category": "smartphones",
+     "price": 899.99, "rating": 4.7, "availabilityStatus": "In Stock"},
+]
+
+
+def _answer(*products, price=None):
+    blocks = []
+    for n, p in enumerate(products, 1):
+        blocks.append(
+            f"PRODUCT #{n}\nName: {p['title']}\nBrand: {p['brand']}\nPrice: ${price or p['price']}\n"
+            f"Rating: {p['rating']}\nWhy chosen: Good value.\nStrengths:\n- Battery\n"
+        )
+    return "\n".join(blocks)
+
+
+def test_clean_answer_to_a_simple_request_is_approved():
+    verdict, reason = review_recommendations("phones under $500", _answer(PHONES[0], PHONES[1]), PHONES)
+    assert reason == "rules approved"
+    assert verdict.startswith("APPROVED:")
+
+
+def test_limits_phrased_with_a_negation_are_still_checked():
+    verdict, reason = review_recommendations("phones no more than $500", _answer(PHONES[0]), PHONES)
+    assert reason == "rules approved" and verdict.startswith("APPROVED:")
+    verdict, reason = review_recommendations("phones not over $500", _answer(PHONES[2]), PHONES)
+    assert reason == "rules rejected" and "above the 500 limit" in verdict
+
+
+def test_wrong_price_or_broken_limit_is_rejected():
+    verdict, reason = review_recommendations("phones under $500", _answer(PHONES[0], price="199.99"), PHONES)
+    assert reason == "rules rejected"
+    assert verdict.startswith("REJECTED:") and "states price" in verdict
+    verdict, _ = review_recommendations("phones under $500", _answer(PHONES[2]), PHONES)
+    assert verdict.startswith("REJECTED:") and "iPhone X" in verdict
+
+
+def test_undecidable_answers_go_to_the_llm():
+    cases = [
+        ("phones except samsung", _answer(PHONES[1]), "negation"),
+        ("a phone i don't want to break the bank for", _answer(PHONES[1]), "negation"),
+        ("phones under $500", "Nothing fits, try raising the budget.", "no product blocks"),
+        ("phones under $500", _answer({**PHONES[0], "title": "Pixel 9"}), "unknown product"),
+        ("phones under $100", _answer(PHONES[1]), "no candidate fits"),
+        ("a phone with a great camera for travel photos", _answer(PHONES[0]), "open request"),
+    ]
+    for request, answer, expected in cases:
+        assert review_recommendations(request, answer, PHONES) == (None, expected), request
+
+
+def test_requests_with_wishes_beyond_the_keyword_go_to_the_llm():
+    for request in ("a phone with a great camera", "a phone for gaming", "a phone for my grandmother",
+                    "samsung phone with wireless charging under $500"):
+        assert review_recommendations(request, _answer(PHONES[0]), PHONES) == (None, "open request"), request
+    assert review_recommendations("samsung phone under $500", _answer(PHONES[0]), PHONES)[1] == "rules approved"
@@ -0,0 +1,54 @@
+from utils.llm_cache import LLMResponseCache
+
+"""
+Tests for the analyzer/critic reply cache (utils/llm_cache.py).
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+SYSTEM, CONTEXT = "You are the analyzer.", "1. Phone A - $250\n2. Phone B - $280"
+
+
+def test_exact_tier_normalizes_case_punctuation_and_whitespace():
+    cache = LLMResponseCache()
+    cache.set(SYSTEM, "Phones under 300!", CONTEXT, "reply")
+    assert cache.get(SYSTEM, "  phones   UNDER 300 ", CONTEXT) == "reply"
+    assert cache.get(SYSTEM, "under 300 phones", CONTEXT) is None  # word order is kept
+    assert cache.get(SYSTEM, "phones under 300", CONTEXT + "\n3. Phone C - $290") is None
+    assert cache.get("You are the critic.", "phones under 300", CONTEXT) is None
+
+
+def test_similar_request_reuses_the_reply_above_the_threshold():
+    cache = LLMResponseCache(similarity=0.75)
+    cache.set(SYSTEM, "cheap phones under 300", CONTEXT, "reply")
+    assert cache.get(SYSTEM, "phones under 300, cheap please", CONTEXT) == "reply"  # Jaccard 4/5
+    assert cache.get(SYSTEM, "cheap phones under 300 with a good battery please", CONTEXT) is None
+
+
+def test_guard_refuses_different_numbers_or_negations():
+    cache = LLMResponseCache(similarity=0.5)
+    cache.set(SYSTEM, "cheap phones under 300 please", CONTEXT, "under 300")
+    cache.set(SYSTEM, "cheap phones not samsung please", CONTEXT, "not samsung")
+    assert cache.get(SYSTEM, "cheap phones under 200 please", CONTEXT) is None
+    assert cache.get(SYSTEM, "cheap phones over 300 please", CONTEXT) is None
+    assert cache.get(SYSTEM, "cheap phones samsung please", CONTEXT) is None
+    assert cache.get(SYSTEM, "cheap phones that are not samsung", CONTEXT) == "not samsung"
+
+
+def test_similarity_one_disables_the_tier():
+    cache = LLMResponseCache(similarity=1.0)
+    cache.set(SYSTEM, "cheap phones under 300", CONTEXT, "reply")
+    assert cache.get(SYSTEM, "phones under 300, cheap please", CONTEXT) is None
+
+
+def test_stats_count_hits_and_misses_and_skip_empty_replies():
+    cache = LLMResponseCache(similarity=0.75)
+    assert cache.get_or_call(SYSTEM, "cheap phones under 300", CONTEXT, lambda: "reply") == ("reply", False)
+    assert cache.get_or_call(SYSTEM, "Cheap phones under 300.", CONTEXT, lambda: "other") == ("reply", True)
+    assert cache.get_or_call(SYSTEM, "phones under 300, cheap please", CONTEXT, lambda: "other") == ("reply", True)
+    assert cache.get_or_call(SYSTEM, "laptops", CONTEXT, lambda: "  ") == ("  ", False)
+    assert cache.get(SYSTEM, "laptops", CONTEXT) is None
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["similar_hits"], stats["misses"]) == (1, 1, 3)
+    assert stats["hit_rate"] == 0.4 and stats["entries"] == 1
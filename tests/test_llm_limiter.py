@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+import utils.llm_limiter as llm_limiter
+from batch import worker_llm_config
+from utils.llm_limiter import SharedLLMLimiter, TokenBucket
+
+"""
+Tests for the shared LLM rate limiter (utils/llm_limiter.py).
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+LLM_CONFIG = {"config_list": [{"model": "test", "api_rate_limit": 0.1}]}
+
+
+@pytest.fixture
+def fresh_limiter(monkeypatch):
+    """Let get_llm_limiter build a new limiter from a patched LLM_RATE_LIMIT."""
+    settings = dict(llm_limiter.LLM_RATE_LIMIT, enabled=True)
+    monkeypatch.setattr(llm_limiter, "LLM_RATE_LIMIT", settings)
+    monkeypatch.setattr(llm_limiter, "_limiter", None)
+    monkeypatch.setattr(llm_limiter, "_configured", False)
+    return settings
+
+
+def test_configured_rate_is_applied(fresh_limiter):
+    fresh_limiter.update(rate=20.0, burst=1)
+    limiter = llm_limiter.get_llm_limiter()
+    assert limiter.base_rate == limiter.bucket.rate == 20.0
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.call(lambda: None)
+    assert time.monotonic() - started >= 3 / 20.0 * 0.9  # the burst token, then one every 50 ms
+    assert worker_llm_config(LLM_CONFIG, 4) is LLM_CONFIG  # the shared rate covers all workers
+
+
+def test_per_client_rate_is_not_used_as_the_shared_rate(fresh_limiter):
+    fresh_limiter.update(rate=None)
+    limiter = llm_limiter.get_llm_limiter()
+    assert limiter.bucket.rate is None
+    assert limiter.bucket.acquire() == 0.0
+    config = worker_llm_config(LLM_CONFIG, 4)  # the clients keep throttling, split across workers
+    assert config["config_list"][0]["api_rate_limit"] == pytest.approx(0.025)
+
+
+def test_token_bucket_allows_a_burst_then_waits():
+    bucket = TokenBucket(rate=10.0, burst=2)
+    assert bucket.acquire() == 0.0 and bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.1, abs=0.02)
+
+
+def test_rate_limit_errors_slow_down_and_retry():
+    limiter = SharedLLMLimiter(rate=100.0, backoff=0.0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("429 resource exhausted")
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert len(attempts) == 3 and limiter.rate_limited == 2
+    assert limiter.bucket.rate < 100.0
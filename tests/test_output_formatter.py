@@ -0,0 +1,78 @@
+from utils.output_formatter import (
+    find_json_block,
+    iter_products,
+    parse_product_records,
+    parse_products_from_search,
+    parse_search_reply,
+    parse_search_selection,
+)
+
+"""
+Tests for the incremental parsing of the orchestrator's replies (utils/output_formatter.py).
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+
+def test_json_block_is_preferred_over_plain_fences():
+    text = 'intro ```\n{"a": 1}\n``` then ```json\n{"b": 2}\n```'
+    start, end = find_json_block(text)
+    assert text[start:end].strip() == '{"b": 2}'
+    start, end = find_json_block('```json\n{"cut": ')
+    assert (start, end) == (7, len('```json\n{"cut": '))
+
+
+def test_products_are_parsed_in_place():
+    text = 'Here you go:\n```json\n{"products": [{"id": 1, "title": "A"}, {"id": 2, "title": "B", "price": 5}]}\n```'
+    assert [p["id"] for p in iter_products(text)] == [1, 2]
+    assert parse_products_from_search(text, fields=("title",)) == [{"title": "A"}, {"title": "B"}]
+    assert parse_products_from_search("no json here") == []
+
+
+def test_truncated_reply_keeps_the_complete_products():
+    text = '```json\n{"products": [{"id": 1, "title": "A"}, {"id": 2, "title": "B"}, {"id": 3, "tit'
+    assert [p["id"] for p in iter_products(text)] == [1, 2]
+
+
+def test_malformed_items_are_repaired_and_non_products_skipped():
+    text = """```json
+{"products": [
+  {'id': 1, 'title': 'Single quotes', 'inStock': True,},
+  {"id": 2, "title": "Fine"},
+  {"id": 3 "title": "Missing comma"},
+  ["not", "a", "product"],
+  {"id": 4, "title": "After the broken one"}
+]}
+```"""
+    products = list(iter_products(text))
+    assert [p["id"] for p in products] == [1, 2, 3, 4]
+    assert products[0] == {"id": 1, "title": "Single quotes", "inStock": True}
+    assert products[2]["title"] == "Missing comma"
+
+
+def test_items_past_the_closing_fence_are_ignored():
+    text = '```json\n{"products": [{"id": 1}, {"id": 2\n```\nsome text {"id": 3}]}'
+    assert [p["id"] for p in iter_products(text)] == [1]
+
+
+def test_product_records_keep_only_record_fields():
+    text = '```json\n{"products": [{"id": 7, "title": "Phone", "images": ["x"], "reviews": [{}, {}]}]}\n```'
+    (record,) = parse_product_records(text)
+    assert record["id"] == 7 and record["title"] == "Phone"
+    assert record.get("images") is None
+
+
+def test_search_reply_validation():
+    assert parse_search_reply('```json\n{"products": [{"id": 1, "title": "A"}]}\n```')[0]["id"] == 1
+    assert parse_search_reply('```json\n{"products": []}\n```') == []
+    assert parse_search_reply("I will search for products now.") is None
+    assert parse_search_reply('```json\n{"products": [oops\n```') is None
+    assert parse_search_reply(None) is None
+
+
+def test_search_selection_reads_only_its_keys():
+    text = '```json\n{"query": "laptop", "call_id": "c2", "ids": [3, 7, 12], "note": \'bad "quotes\'}\n```'
+    assert parse_search_selection(text) == {"query": "laptop", "call_id": "c2", "ids": [3, 7, 12]}
+    assert parse_search_selection('```json\n{"call_id": "c1"}\n```') == {"query": None, "call_id": "c1", "ids": None}
+    assert parse_search_selection('```json\n{"products": []}\n```') is None
@@ -0,0 +1,195 @@
+import json
+import time
+import types
+from itertools import islice
+
+import pytest
+
+import tools.product_api as product_api
+import tools.response_cache as response_cache
+from benchmarks.fake_product_api import make_products
+from tools.product_api import iter_search_products, search_matching_products, search_products_multi
+
+"""
+Tests for the product tools (tools/product_api.py), against stubbed pages, searches and sessions.
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    """Serve 25 products (every third one over $300) and record the skips requested."""
+    catalog = [{"id": i, "title": f"Phone {i}", "category": "smartphones", "price": 400 if i % 3 == 0 else 200,
+                "rating": 4.0, "availabilityStatus": "In Stock"} for i in range(1, 26)]
+    skips = []
+
+    def search_products(query, limit=20, skip=0):
+        skips.append(skip)
+        return {"products": catalog[skip:skip + limit], "total": len(catalog), "skip": skip, "limit": limit}
+
+    monkeypatch.setattr(product_api, "search_products", search_products)
+    return skips
+
+
+def test_pages_are_fetched_only_when_needed(pages):
+    progress = {}
+    first = list(islice(iter_search_products("phone", page_size=10, progress=progress), 5))
+    assert [p["id"] for p in first] == [1, 2, 3, 4, 5]
+    assert pages == [0]
+    assert progress == {"pages": 1, "scanned": 10, "total": 25, "exhausted": False}
+
+
+def test_reading_everything_marks_the_search_exhausted(pages):
+    progress = {}
+    assert len(list(iter_search_products("phone", page_size=10, progress=progress))) == 25
+    assert pages == [0, 10, 20]
+    assert progress["exhausted"] and progress["scanned"] == 25
+
+
+def test_predicate_filters_each_page(pages):
+    cheap = list(iter_search_products("phone", {"price_max": 300, "count": 1}, page_size=10))
+    assert len(cheap) == 17 and all(p["price"] == 200 for p in cheap)
+    assert [p["id"] for p in iter_search_products("phone", lambda p: p["id"] > 23, page_size=10)] == [24, 25]
+
+
+def test_max_pages_stops_paging_without_exhausting(pages):
+    progress = {}
+    assert len(list(iter_search_products("phone", page_size=10, max_pages=2, progress=progress))) == 20
+    assert progress["pages"] == 2 and not progress["exhausted"]
+
+
+def test_matching_search_reports_exhausted_and_truncated(pages):
+    result = search_matching_products("phone", request="under $300", want=5, page_size=10)
+    assert len(result["products"]) == 5 and result["pages"] == 1
+    assert not result["exhausted"] and not result["truncated"]
+
+    result = search_matching_products("phone", request="over $300", want=20, page_size=10)
+    assert len(result["products"]) == 8
+    assert result["exhausted"] and not result["truncated"] and result["scanned"] == 25
+
+    result = search_matching_products("phone", request="over $300", want=20, page_size=10, max_pages=2)
+    assert len(result["products"]) == 6
+    assert not result["exhausted"] and result["truncated"] and result["max_pages"] == 2
+
+
+CATALOG = make_products(25)
+
+
+@pytest.fixture
+def catalog_pages(monkeypatch):
+    """Serve CATALOG as /products pages; later pages answer first, and the skips are recorded."""
+    skips = []
+
+    def fetch_page(limit, skip):
+        skips.append(skip)
+        time.sleep(0.01 * (3 - min(3, skip // limit)))  # out-of-order completion
+        return {"products": CATALOG[skip:skip + limit], "total": len(CATALOG), "skip": skip, "limit": limit}
+
+    monkeypatch.setattr(product_api, "_fetch_page", fetch_page)
+    monkeypatch.setattr(response_cache, "_cache", None)
+    return skips
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_all_products_keep_page_order_with_a_short_last_page(catalog_pages, monkeypatch, workers):
+    monkeypatch.setattr(product_api, "PAGE_WORKERS", workers)
+    result = product_api.get_all_products(limit=10)
+    assert [p["id"] for p in result["products"]] == [p["id"] for p in CATALOG]
+    assert result["total"] == 25 and sorted(catalog_pages) == [0, 10, 20]
+    assert result["products"][0] == product_api._clean_product(CATALOG[0])
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_all_products_stop_at_an_empty_page(monkeypatch, workers):
+    def fetch_page(limit, skip):  # the API claims more products than it returns
+        return {"products": CATALOG[skip:skip + limit], "total": 100, "skip": skip, "limit": limit}
+
+    monkeypatch.setattr(product_api, "_fetch_page", fetch_page)
+    monkeypatch.setattr(product_api, "PAGE_WORKERS", workers)
+    assert [p["id"] for p in product_api._fetch_all_products(limit=10)["products"]] == [p["id"] for p in CATALOG]
+    assert product_api._fetch_all_products(limit=10, skip=40)["products"] == []
+
+
+@pytest.fixture
+def keyword_searches(monkeypatch):
+    """search_products over fixed results per keyword; "broken" raises."""
+    results = {
+        "phone": {"products": [{"id": 1}, {"id": 2}, {"id": 3}], "total": 3},
+        "smartphone": {"products": [{"id": 2}, {"id": 4}], "total": 2},
+    }
+
+    def search_products(query, limit=20, skip=0):
+        if query == "broken":
+            raise RuntimeError("HTTP 500")
+        return dict(results.get(query, {"products": [], "total": 0}), query=query)
+
+    monkeypatch.setattr(product_api, "search_products", search_products)
+
+
+def test_multi_search_merges_results_without_duplicates(keyword_searches):
+    result = search_products_multi(["phone", "smartphone", "phone"])
+    assert [p["id"] for p in result["products"]] == [1, 2, 3, 4]
+    assert result["totals"] == {"phone": 3, "smartphone": 2}
+    assert result["total"] == 4 and result["query"] == "phone, smartphone"
+    assert "errors" not in result
+    assert search_products_multi("phone, smartphone")["products"] == result["products"]
+    assert search_products_multi([" ", ""]) == {"products": [], "total": 0, "totals": {}, "query": ""}
+
+
+def test_multi_search_keeps_results_when_one_query_fails(keyword_searches):
+    result = search_products_multi(["broken", "smartphone"])
+    assert [p["id"] for p in result["products"]] == [2, 4]
+    assert result["errors"] == {"broken": "HTTP 500"}
+    with pytest.raises(RuntimeError, match="All searches failed"):
+        search_products_multi(["broken"])
+
+
+class _StubSession:
+    """Answers like DummyJSON, including `select`, and records the requested params."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        params = dict(params or {})
+        self.calls.append((url, params))
+        fields = [f for f in params.get("select", "").split(",") if f]
+        select = (lambda p: {k: p[k] for k in ["id"] + fields if k in p}) if fields else (lambda p: p)
+        if url.endswith("/search"):
+            items = [p for p in CATALOG if params["q"].lower() in p["title"].lower()]
+            body = {"products": [select(p) for p in items[:int(params["limit"])]], "total": len(items)}
+        else:
+            body = select(CATALOG[int(url.rsplit("/", 1)[1]) - 1])
+        return types.SimpleNamespace(content=json.dumps(body).encode("utf-8"), raise_for_status=lambda: None)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    stub = _StubSession()
+    monkeypatch.setattr(product_api, "get_session", lambda: stub)
+    monkeypatch.setitem(product_api.HTTP_CONFIG, "pooled", True)
+    monkeypatch.setattr(product_api, "_catalog", None)
+    monkeypatch.setattr(response_cache, "_cache", None)
+    return stub
+
+
+def test_field_selection_is_sent_and_records_are_unchanged(session, monkeypatch):
+    result = product_api.search_products("phone", limit=5)
+    url, params = session.calls[-1]
+    assert url.endswith("/search") and params["select"] == ",".join(product_api.LIST_FIELDS)
+    monkeypatch.setattr(product_api, "SELECT_FIELDS", False)
+    full = product_api.search_products("phone", limit=5)
+    assert "select" not in session.calls[-1][1]
+    # the full payload only adds the review count (reviews are not selected for lists)
+    assert result["products"] == [{k: v for k, v in p.items() if k != "reviews_count"} for p in full["products"]]
+    assert result["total"] == full["total"]
+
+
+def test_get_product_selects_the_detail_fields(session):
+    product = product_api.get_product(3)
+    url, params = session.calls[-1]
+    assert url.endswith("/3") and params["select"] == ",".join(product_api.DETAIL_FIELDS)
+    assert product == {k: CATALOG[2][k] for k in ("id",) + product_api.DETAIL_FIELDS if k in CATALOG[2]}
+    assert "images" not in product and product["reviews"] == CATALOG[2]["reviews"]
@@ -0,0 +1,99 @@
+import pytest
+
+import tools.response_cache as response_cache
+from tools.response_cache import ResponseCache, cached
+
+"""
+Tests for the TTL + LRU response cache of the product tools (tools/response_cache.py).
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    return clock
+
+
+def test_hits_return_fresh_copies():
+    cache = ResponseCache()
+    cache.set("k", {"products": [{"id": 1}]})
+    hit, value = cache.get("k")
+    assert hit and value == {"products": [{"id": 1}]}
+    value["products"].clear()
+    assert cache.get("k")[1] == {"products": [{"id": 1}]}
+    assert cache.get("other") == (False, None)
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (2, 1)
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = ResponseCache(ttl=60)
+    cache.set("k", 1)
+    clock.now += 59
+    assert cache.get("k") == (True, 1)
+    clock.now += 2
+    assert cache.get("k") == (False, None)
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the oldest
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1) and cache.get("c") == (True, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_limit_evicts_and_skips_oversized_values():
+    cache = ResponseCache(max_bytes=20)
+    cache.set("a", "x" * 8)
+    cache.set("b", "y" * 8)  # 10 + 10 bytes of JSON fit
+    cache.set("c", "z" * 8)
+    assert cache.get("a") == (False, None)
+    cache.set("huge", "w" * 100)
+    assert cache.get("huge") == (False, None)
+    assert cache.stats()["bytes"] <= 20
+
+
+def test_sqlite_tier_survives_a_restart(tmp_path, clock):
+    db_path = str(tmp_path / "cache" / "responses.db")
+    ResponseCache(ttl=60, db_path=db_path).set("k", {"total": 3})
+    restarted = ResponseCache(ttl=60, db_path=db_path)
+    assert restarted.get("k") == (True, {"total": 3})
+    assert restarted.stats()["disk_hits"] == 1
+    clock.now += 61
+    assert ResponseCache(ttl=60, db_path=db_path).get("k") == (False, None)
+
+
+def test_cached_calls_share_entries_for_equivalent_arguments(monkeypatch):
+    monkeypatch.setattr(response_cache, "_cache", None)
+    calls = []
+
+    @cached("search")
+    def search(query: str, limit: int = 20):
+        calls.append((query, limit))
+        return {"query": query, "limit": limit}
+
+    search("Phone")
+    search("Phone")
+    assert len(calls) == 2  # no cache configured: every call goes through
+
+    response_cache.configure_response_cache()
+    assert search("Phone") == {"query": "Phone", "limit": 20}
+    assert search("  phone ", limit=20.0) == {"query": "Phone", "limit": 20}
+    search("phone", 10)
+    assert calls[2:] == [("Phone", 20), ("phone", 10)]
@@ -0,0 +1,92 @@
+from tools.result_projection import LIST_FIELDS, ToolResultProjector
+
+"""
+Tests for the projection and result store of product tool results (tools/result_projection.py).
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+
+def _product(pid, **extra):
+    return {"id": pid, "title": f"Product {pid}", "brand": "Acme", "category": "laptops", "price": 100.0 + pid,
+            "rating": 4.0, "description": "A long description " * 10, "images": ["a.jpg"],
+            "reviews": [{"rating": 5}, {"rating": 4}], **extra}
+
+
+def _search(*ids):
+    return {"products": [_product(i) for i in ids], "total": 50, "skip": 0, "limit": 20}
+
+
+def test_list_results_keep_only_list_fields_and_get_a_call_id():
+    projector = ToolResultProjector()
+    result = projector.project(_search(1, 2), tool="search_products")
+    assert result["call_id"] == "c1" and result["total"] == 50
+    assert set(result["products"][0]) <= set(LIST_FIELDS)
+    assert projector.calls == {"c1": [1, 2]}
+    assert projector.stats()["saved"] > 0
+
+
+def test_detail_results_count_reviews():
+    projector = ToolResultProjector()
+    result = projector.project(_product(5), tool="get_product")
+    assert result["reviews_count"] == 2 and "reviews" not in result and "images" not in result
+    assert result["description"].startswith("A long description")
+    assert projector.select(call_id=result["call_id"])[0]["reviews"] == [{"rating": 5}, {"rating": 4}]
+
+
+def test_products_seen_earlier_are_sent_as_references():
+    projector = ToolResultProjector()
+    projector.project(_search(1, 2))
+    second = projector.project(_search(2, 3))
+    assert second["products"][0] == {"id": 2, "seen": True}
+    assert second["products"][1]["id"] == 3
+    assert ToolResultProjector(dedupe=False).project(_search(2, 2))["products"][1]["title"] == "Product 2"
+
+
+def test_lists_are_capped_by_count_and_size():
+    result = ToolResultProjector(max_products=3, max_chars=0).project(_search(*range(1, 11)))
+    assert len(result["products"]) == 3 and result["omitted"] == 7
+    result = ToolResultProjector(max_chars=600).project(_search(*range(1, 11)))
+    assert 1 <= len(result["products"]) < 10
+    assert result["omitted"] == 10 - len(result["products"])
+
+
+def test_only_products_sent_are_stored():
+    projector = ToolResultProjector(max_products=2)
+    projector.project(_search(1, 2, 3))
+    assert projector.calls["c1"] == [1, 2]
+    assert [p["id"] for p in projector.select([3, 2, 1])] == [2, 1]
+
+
+def test_select_and_resolve_return_full_products():
+    projector = ToolResultProjector()
+    projector.project(_search(1, 2, 3), tool="search_products")
+    projector.project(_product(9), tool="get_product")
+    assert [p["id"] for p in projector.select(call_id="c1")] == [1, 2, 3]
+    assert [p["id"] for p in projector.select([3, 3, 99, 1])] == [3, 1]
+    resolved = projector.resolve([{"id": 2, "seen": True}, {"id": 42, "title": "Not from the tools"}])
+    assert resolved[0]["images"] == ["a.jpg"] and resolved[1] == {"id": 42, "title": "Not from the tools"}
+    assert [p["id"] for p in projector.products_of(["search_products"])] == [1, 2, 3]
+    projector.reset()
+    assert projector.select(call_id="c1") == [] and projector.project(_search(1))["call_id"] == "c1"
+
+
+def test_projection_off_passes_whole_products_but_still_stores_them():
+    projector = ToolResultProjector(fields=None, detail_fields=None, max_products=0, max_chars=0, dedupe=False)
+    result = projector.project(_search(*range(1, 31)))
+    assert len(result["products"]) == 30 and result["products"][0]["images"] == ["a.jpg"]
+    assert len(projector.select(call_id=result["call_id"])) == 30
+
+
+def test_other_results_pass_through_and_wrap_keeps_the_tool_name():
+    projector = ToolResultProjector()
+    assert projector.project({"error": "timeout"}) == {"error": "timeout"}
+
+    def search_products(query: str, limit: int = 20):
+        return _search(1)
+
+    wrapped = projector.wrap(search_products)
+    assert wrapped.__name__ == "search_products"
+    assert wrapped("laptop")["call_id"] == "c1"
+    assert projector.call_tools == {"c1": "search_products"}
@@ -0,0 +1,80 @@
+import pytest
+
+from tools.search_planner import PlannerStats, _keyword, _singular, plan_search, unplanned_words
+
+"""
+Tests for the rule-based search planner (tools/search_planner.py).
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+
+@pytest.mark.parametrize("word, singular", [
+    ("laptops", "laptop"), ("watches", "watch"), ("brushes", "brush"), ("boxes", "box"),
+    ("sunglasses", "sunglasses"), ("glasses", "glasses"), ("glass", "glass"),
+    ("cactus", "cactus"), ("chassis", "chassis"), ("bag", "bag"),
+])
+def test_singular_rules(word, singular):
+    assert _singular(word) == singular
+
+
+@pytest.mark.parametrize("request_text, query", [
+    ("find me a laptop", "laptop"),
+    ("perfume", "perfume"),
+    ("sunglasses under $50", "sunglasses"),
+    ("running shoes", "running shoe"),
+    ("phones under $300", "phone"),
+    ("smartphone around 200, rating at least 4", "phone"),
+    ("samsung phone", "samsung"),
+    ("perfume for my wife", "perfume"),
+    ("a case with a kickstand", "case"),
+])
+def test_fast_path_keyword(request_text, query):
+    plan = plan_search(request_text)
+    assert plan is not None and plan["query"] == query, request_text
+
+
+def test_fast_path_keeps_the_parsed_constraints():
+    plan = plan_search("laptops under 1000 rating at least 4")
+    assert plan["constraints"] == {"price_max": 1000.0, "rating_min": 4.0}
+
+
+@pytest.mark.parametrize("request_text", [
+    "hi",
+    "under $300",
+    "iphone 13 pro",
+    "something to drink in the morning, coffee maybe",
+    "a comfortable chair for my home office that is not too expensive",
+    "wireless gaming headset",
+])
+def test_unclear_requests_fall_back_to_the_orchestrator(request_text):
+    assert plan_search(request_text) is None
+
+
+def test_keyword_from_two_words():
+    assert _keyword("running shoes for men", ["running", "shoes"]) == "running shoe"
+    assert _keyword("perfume for my wife", ["perfume", "wife"]) == "perfume"
+    assert _keyword("a mug with a lid", ["mug", "lid"]) == "mug"
+    assert _keyword("a lid and a mug", ["mug", "lid"]) is None  # not next to each other, no preposition
+
+
+def test_unplanned_words_name_the_dropped_modifiers():
+    assert unplanned_words("perfume for my wife", plan_search("perfume for my wife")) == ["wife"]
+    assert unplanned_words("samsung phone under $300", plan_search("samsung phone under $300")) == []
+    assert unplanned_words("running shoes", plan_search("running shoes")) == []
+
+
+def test_planner_stats_summary():
+    stats = PlannerStats(window=2)
+    assert stats.summary()["estimated_saved_s"] is None
+    stats.record("fast", 0.1)
+    stats.record("fast", 0.3)
+    stats.record("agent", 2.2, reason="not confident")
+    stats.record("agent", 9.9, reason="no results")
+    stats.record("agent", 1.8, reason="not confident")  # averages use the last two: 9.9 and 1.8
+    summary = stats.summary()
+    assert (summary["fast_path"], summary["agent_path"]) == (2, 3)
+    assert summary["fallback_reasons"] == {"not confident": 2, "no results": 1}
+    assert summary["avg_fast_s"] == 0.2 and summary["avg_agent_s"] == 5.85
+    assert summary["estimated_saved_s"] == round(2 * (5.85 - 0.2), 2)
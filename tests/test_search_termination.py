@@ -0,0 +1,80 @@
+from agents.search_termination import SearchTermination
+from tools.result_projection import ToolResultProjector
+from utils.output_formatter import parse_search_selection
+
+"""
+Tests for stopping the SearchOrchestrator chat (agents/search_termination.py).
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+
+def _phones(*prices, start=1):
+    return {"products": [{"id": start + i, "title": f"Phone {start + i}", "category": "smartphones",
+                          "price": price, "rating": 4.5, "availabilityStatus": "In Stock"}
+                         for i, price in enumerate(prices)]}
+
+
+def _started(request="phones under $300", enough=2):
+    termination, projector = SearchTermination(enough=enough), ToolResultProjector()
+    termination.start(request, projector)
+    return termination, projector
+
+
+TOOL_MESSAGE = {"role": "tool", "content": "..."}
+
+
+def test_id_only_answer_ends_the_chat_with_the_stored_products():
+    termination, projector = _started()
+    projector.project(_phones(100, 200, 400), tool="search_products")
+    answer = '```json\n{"query": "phone", "call_id": "c1", "ids": [3, 1]}\n```'
+    assert termination.is_termination_msg({"content": answer})
+    assert [p["id"] for p in termination.result] == [3, 1]
+    assert termination.query == "phone"
+
+
+def test_products_list_answer_ends_the_chat():
+    termination, _ = _started()
+    assert termination.is_termination_msg({"content": '```json\n{"products": [{"id": 5, "title": "X"}]}\n```'})
+    assert termination.result[0]["id"] == 5
+
+
+def test_malformed_or_plain_messages_do_not_end_the_chat():
+    termination, _ = _started()
+    for msg in ({"content": "Let me search for phones."}, {"content": '```json\n{"products": [oops\n```'},
+                {"content": None}, "not a dict"):
+        assert not termination.is_termination_msg(msg)
+    assert termination.result is None
+
+
+def test_early_reply_waits_for_enough_matching_products():
+    termination, projector = _started()
+    projector.project(_phones(100, 500), tool="search_products")
+    assert termination.early_reply(None, [TOOL_MESSAGE]) == (False, None)  # one match so far
+    projector.project(_phones(250, start=10), tool="search_matching_products")
+    stop, reply = termination.early_reply(None, [TOOL_MESSAGE])
+    assert stop
+    assert parse_search_selection(reply)["ids"] == [1, 10]
+    assert [p["id"] for p in termination.result] == [1, 10]
+    assert termination.is_termination_msg({"content": "anything"})  # the chat ends after the short answer
+
+
+def test_early_reply_ignores_non_search_tools_and_non_tool_messages():
+    termination, projector = _started()
+    projector.project(_phones(100, 200), tool="get_all_products")
+    assert termination.early_reply(None, [TOOL_MESSAGE]) == (False, None)
+    projector.project(_phones(100, 200, start=20), tool="search_products")
+    assert termination.early_reply(None, [{"role": "user", "content": "phones"}]) == (False, None)
+    assert termination.early_reply(None, [TOOL_MESSAGE])[0]
+
+
+def test_start_resets_the_previous_chat_and_count_is_not_a_constraint():
+    termination, projector = _started("top 5 phones under $300")
+    assert "count" not in termination.constraints
+    projector.project(_phones(100, 200), tool="search_products")
+    assert termination.early_reply(None, [TOOL_MESSAGE])[0]
+    termination.start("laptops", ToolResultProjector())
+    assert (termination.result, termination.stopped_early) == (None, False)
+    assert not termination.is_termination_msg({"content": "Searching laptops."})
+    assert SearchTermination(enough=0).early_reply(None, [TOOL_MESSAGE]) == (False, None)
@@ -0,0 +1,71 @@
+import json
+import socket
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from server import MAX_BODY_BYTES, make_server
+
+"""
+Tests for the request handling of server mode (server.py), with a stub agent pool.
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+
+class _NoAgentsPool:
+    size = 1
+
+    @contextmanager
+    def agents(self):
+        raise AssertionError("rejected requests must not borrow agents")
+        yield
+
+
+@pytest.fixture
+def address():
+    server = make_server("127.0.0.1:0", _NoAgentsPool())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+def _exchange(address, raw: bytes) -> bytes:
+    """Send raw bytes and read until the server closes the connection."""
+    with socket.create_connection(address, timeout=5) as sock:
+        sock.sendall(raw)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+
+def _post(path: str, body: bytes, length: str) -> bytes:
+    return (f"POST {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {length}\r\n\r\n").encode() + body
+
+
+def test_unknown_path_closes_instead_of_parsing_the_body_as_a_request(address):
+    smuggled = b"GET /health HTTP/1.1\r\nHost: test\r\n\r\n"
+    reply = _exchange(address, _post("/nope", smuggled, str(len(smuggled))))
+    assert reply.startswith(b"HTTP/1.1 404")
+    assert reply.count(b"HTTP/1.1 ") == 1
+    assert b"Connection: close" in reply
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1e3"])
+def test_invalid_content_length_is_a_400(address, length):
+    reply = _exchange(address, _post("/query", b'{"query": "phones"}', length))
+    assert reply.startswith(b"HTTP/1.1 400")
+    assert json.loads(reply.split(b"\r\n\r\n", 1)[1]) == {"error": "invalid Content-Length"}
+
+
+def test_oversized_body_is_a_413(address):
+    reply = _exchange(address, _post("/query", b"{}", str(MAX_BODY_BYTES + 1)))
+    assert reply.startswith(b"HTTP/1.1 413")
+    assert b"Connection: close" in reply
@@ -1,9 +1,11 @@
 from typing import List, Dict, Any
+import heapq
 import statistics
-import re
+
+from tools.constraint_parser import get_constraint_parser
 
 """
-NOTE: The functions in this file are no longer used by the analyzer
+NOTE: The functions in this file are no longer registered as tools for the analyzer
 in the current implementation. The file is kept for reference and
 for context as they are mentioned in the project report.
 
@@ -11,8 +13,12 @@ originally, this file contained helper functions for filtering, scoring, and com
 These functions were registered as tools for the ProductAnalyzerAgent to help the agent if it chose to use them.
 
 In the final version of the system, we simplified the analyzer flow
-and removed this tool integration, but we kept the module to document
-the earlier design.
+and removed this tool integration. Some helpers are still used directly:
+rank_candidates pre-filters the analyzer's candidate list (pipeline.py),
+and parse_constraints / filter_by_constraints serve the search fast path
+(tools/search_planner.py), the rule-based critic (tools/critic_rules.py),
+search_matching_products (tools/product_api.py) and the early stop of the
+search chat (agents/search_termination.py).
 """
 
 def score_product(product: Dict[str, Any]) -> float:
@@ -97,56 +103,19 @@ def parse_constraints(query: str) -> Dict[str, Any]:
     """
     Parse user query into constraints.
     Supports:
-    - price_max: under/less than/<=/</around $X
-    - rating_min: >= / at least / no less than X
-    - category_in: smartphones/phones/mobile if mentioned
+    - price_max / price_min: under/below/at most $X, over/above/from $X,
+      ranges like "between $100 and $300" or "$100-$300"
+    - currency: USD/EUR/GBP when the amount names one
+    - rating_min: >= / at least / no less than / rating / rated X, X stars, X+
+    - category_in: catalog categories (and phone words) mentioned
     - availability: in stock / out of stock / low stock
-    - brand_in: simple list of known brands found in query
+    - brand_in: catalog brands found in query (whole words)
+    - brand_not_in: brands the user excludes ("except samsung", "not apple")
     - count: top N or 'N items/products/phones'
-    """
-    q = query.lower()
-    constraints: Dict[str, Any] = {}
-
-    # price_max
-    m_price = re.search(r"(under|less than|<=|<|around)\s*\$?\s*(\d+(\.\d+)?)", q)
-    if m_price:
-        constraints["price_max"] = float(m_price.group(2))
-
-    # rating_min
-    m_rating_ge = re.search(r"(?:>=|at least|no less than)\s*(\d+(\.\d+)?)", q)
-    if m_rating_ge:
-        constraints["rating_min"] = float(m_rating_ge.group(1))
-    else:
-        m_rating_plain = re.search(r"rating\s*(?:>=|>|at least|no less than)?\s*(\d+(\.\d+)?)", q)
-        if m_rating_plain:
-            constraints["rating_min"] = float(m_rating_plain.group(1))
-
-    # category_in
-    if any(w in q for w in ("smartphone", "smartphones", "phone", "phones")):
-        constraints["category_in"] = {"smartphones", "phones", "mobile"}
-
-    # availability
-    if "in stock" in q:
-        constraints["availability"] = "in stock"
-    elif "out of stock" in q:
-        constraints["availability"] = "out of stock"
-    elif "low stock" in q:
-        constraints["availability"] = "low stock"
-
-    # brand_in
-    brands = ["apple", "samsung", "oppo", "realme", "vivo", "xiaomi", "oneplus", "google", "nokia", "motorola"]
-    for b in brands:
-        if b in q:
-            constraints.setdefault("brand_in", set()).add(b.capitalize())
 
-    # count
-    m_count = re.search(r"(top\s*(\d+)|\b(\d+)\s*(items|products|phones))", q)
-    if m_count:
-        num = m_count.group(2) or m_count.group(3)
-        if num and num.isdigit():
-            constraints["count"] = int(num)
-
-    return constraints
+    The work is done by the compiled parser in tools/constraint_parser.py.
+    """
+    return get_constraint_parser().parse(query)
 
 
 def filter_by_constraints(products: List[Dict[str, Any]], constraints: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -160,6 +129,14 @@ def filter_by_constraints(products: List[Dict[str, Any]], constraints: Dict[str,
             except Exception:
                 return False
 
+        # price_min (a missing price never passes)
+        if "price_min" in constraints:
+            try:
+                if float(p.get("price", float("-inf"))) < float(constraints["price_min"]):
+                    return False
+            except Exception:
+                return False
+
         # rating_min
         if "rating_min" in constraints:
             try:
@@ -187,6 +164,12 @@ def filter_by_constraints(products: List[Dict[str, Any]], constraints: Dict[str,
             if brand.capitalize() not in constraints["brand_in"]:
                 return False
 
+        # brand_not_in
+        if "brand_not_in" in constraints:
+            brand = (p.get("brand") or "")
+            if brand.capitalize() in constraints["brand_not_in"]:
+                return False
+
         return True
 
     filtered = [p for p in products if ok(p)]
@@ -197,3 +180,40 @@ def filter_by_constraints(products: List[Dict[str, Any]], constraints: Dict[str,
         filtered = filtered[:count]
 
     return filtered
+
+
+def rank_candidates(products, user_request: str, k: int = 15) -> List[Dict[str, Any]]:
+    """
+    Shrink the search results to at most k candidates for the analyzer.
+
+    1. Parse the user's constraints and drop products that violate them
+       (price, rating, category, availability, brand, excluded brands).
+    2. If more than k remain, keep the k best by score_product, using a heap
+       (O(n log k)) instead of sorting the whole list.
+
+    `products` may also be a prebuilt ProductTable (tools/product_table.py),
+    e.g. for the full catalog; the ranking is then vectorized with the same result.
+
+    If nothing satisfies the constraints, the unfiltered list is ranked instead,
+    so the analyzer can still explain why and suggest relaxing them.
+    """
+    constraints = parse_constraints(user_request)
+    # "top N" is about how many to recommend, not a reason to drop candidates.
+    constraints.pop("count", None)
+
+    if hasattr(products, "constraints_mask"):  # ProductTable
+        table = products
+        mask = table.constraints_mask(constraints)
+        if not mask.any():
+            mask[:] = True
+        if mask.sum() <= k:
+            return table.take(mask)
+        return table.top_k(k, mask)
+
+    candidates = filter_by_constraints(products, constraints) if constraints else list(products)
+    if not candidates:
+        candidates = list(products)
+
+    if len(candidates) <= k:
+        return candidates  # keep the search's own relevance order
+    return heapq.nlargest(k, candidates, key=score_product)
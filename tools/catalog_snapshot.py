@@ -0,0 +1,184 @@
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from tools.product_record import FIELDS, Product, ensure_products
+
+"""
+Local catalog snapshot with an in-memory inverted index.
+
+The whole catalog is fetched once with get_all_products, written to disk as
+gzip-compressed JSON (column names stored once, one value array per product),
+kept in memory as compact Product records (tools/product_record.py) and indexed by the words in title, brand, category and description.
+search_products can then be answered locally with the same
+{'products', 'total', 'query'} shape as the API.
+
+A snapshot older than its TTL is never used: the caller falls back to the API
+while a fresh snapshot is built in the background.
+"""
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+INDEXED_FIELDS = ("title", "brand", "category", "description")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Query words whose expansion is memoized per snapshot (least recently used are dropped).
+EXPANSION_CACHE_SIZE = 4096
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class CatalogSnapshot:
+    """An immutable product list plus an inverted index over its text fields."""
+
+    def __init__(self, products: Iterable[Any], built_at: float):
+        self.products: List[Product] = ensure_products(products)
+        self.built_at = built_at
+        # word -> sorted positions of the products containing it
+        index: Dict[str, set] = {}
+        for pos, product in enumerate(self.products):  # `products` may be a one-shot iterator
+            for field in INDEXED_FIELDS:
+                for token in _tokenize(str(product.get(field) or "")):
+                    index.setdefault(token, set()).add(pos)
+        self.index = {token: sorted(positions) for token, positions in index.items()}
+        # query word -> positions of products with an indexed word containing it (bounded memo)
+        self._positions_for = lru_cache(maxsize=EXPANSION_CACHE_SIZE)(self._expand)
+
+    def age(self) -> float:
+        return time.time() - self.built_at
+
+    def _expand(self, word: str) -> frozenset:
+        """
+        Positions matching one query word. Like the API's substring search,
+        "phone" also matches "smartphones", so the word is looked up against
+        every indexed word once (memoized in _positions_for).
+        """
+        positions = set(self.index.get(word, ()))
+        for token, token_positions in self.index.items():
+            if word in token and token != word:
+                positions.update(token_positions)
+        return frozenset(positions)
+
+    def search(self, query: str, limit: int = 30, skip: int = 0) -> Dict[str, Any]:
+        """
+        Return products matching every word of the query, in catalog order.
+        Each word may match a different field (AND of words); the API matches
+        the query as one substring, so multi-word queries can differ.
+        """
+        words = _tokenize(query)
+        if not words:
+            return {"products": [], "total": 0, "query": query}
+        matches = None
+        for word in words:
+            positions = self._positions_for(word)
+            matches = positions if matches is None else matches & positions
+            if not matches:
+                break
+        ordered = sorted(matches)
+        page = ordered[skip:skip + limit] if limit else ordered[skip:]
+        return {
+            "products": [self.products[pos].to_dict() for pos in page],
+            "total": len(ordered),
+            "query": query,
+        }
+
+    def save(self, path: str) -> None:
+        """Write the snapshot as gzip JSON with one shared column list."""
+        payload = {
+            "version": SNAPSHOT_VERSION,
+            "built_at": self.built_at,
+            "columns": list(FIELDS),
+            "rows": [[getattr(product, col) for col in FIELDS] for product in self.products],
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, path)  # atomic, readers never see a half-written file
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CatalogSnapshot"]:
+        """Read a snapshot written by save(); returns None if missing or unreadable."""
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if payload.get("version") != SNAPSHOT_VERSION:
+            return None
+        columns = payload["columns"]
+        products = [Product.from_dict(dict(zip(columns, row))) for row in payload["rows"]]
+        return cls(products, payload["built_at"])
+
+
+class CatalogStore:
+    """
+    Owns the current snapshot: loads it from disk, decides whether it is fresh
+    enough to answer a search and rebuilds it in the background when it is not.
+    """
+
+    def __init__(self, path: str, ttl: float, page_limit: int = 100):
+        self.path = path
+        self.ttl = ttl
+        self.page_limit = page_limit
+        self.snapshot = CatalogSnapshot.load(path)
+        self.hits = 0
+        self.misses = 0
+        self._refreshing = threading.Lock()
+
+    def is_fresh(self) -> bool:
+        return self.snapshot is not None and self.snapshot.age() < self.ttl
+
+    def refresh(self) -> CatalogSnapshot:
+        """Fetch the full catalog, rebuild the index and persist it."""
+        from tools.product_api import _fetch_all_products
+
+        started = time.time()
+        # not get_all_products: a rebuild must see the live catalog, never a cached page
+        data = _fetch_all_products(limit=self.page_limit)
+        snapshot = CatalogSnapshot(data["products"], built_at=started)
+        snapshot.save(self.path)
+        self.snapshot = snapshot
+        logger.info("Catalog snapshot rebuilt: %d products in %.2fs",
+                    len(snapshot.products), time.time() - started)
+        return snapshot
+
+    def refresh_in_background(self) -> None:
+        """Start a rebuild unless one is already running."""
+        if not self._refreshing.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Catalog snapshot refresh failed: %s", e)
+            finally:
+                self._refreshing.release()
+
+        threading.Thread(target=run, name="catalog-refresh", daemon=True).start()
+
+    def search(self, query: str, limit: int = 30, skip: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Answer a search locally, or return None so the caller uses the API:
+        - no snapshot yet, or older than the TTL (a rebuild is started);
+        - no local match (the API may know better, e.g. fuzzy matches).
+        """
+        if not self.is_fresh():
+            self.refresh_in_background()
+            self.misses += 1
+            return None
+        result = self.snapshot.search(query, limit=limit, skip=skip)
+        if not result["total"]:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
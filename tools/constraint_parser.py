@@ -0,0 +1,353 @@
+import logging
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config.app_config import CATALOG_VOCABULARY
+
+"""
+Compiled constraint parser behind analysis_tools.parse_constraints.
+
+One regex is compiled per vocabulary and scans a request in a single pass:
+price limits and ranges, ratings, availability, counts, and the brand and
+category vocabulary. The vocabulary terms are merged into a character trie,
+so the regex engine walks one automaton for all of them instead of trying
+every brand in turn. Terms only match whole words ("google" no longer
+matches inside "googles"), and the longest term wins ("mobile accessories"
+beats "mobile").
+
+Understood phrases (lower-cased):
+- price_max:  under / below / less than / cheaper than / at most / up to /
+              max / within / around / < / <=  + amount
+- price_min:  over / above / more than / at least / from / min / > / >=
+              + amount (a bare number of 5 or less after "at least" etc.
+              is a rating, as before). "from" and "at least" are only a
+              price with a currency or a price word ("priced from 100"), so
+              "phones from 2020" has no price.
+- both:       between $100 and $300, from $100 to 300, $100-$300 (a range
+              after rating/rated or before "stars" is a rating: "rated
+              between 4 and 5" sets rating_min 4)
+- amounts:    $300, 300 usd, 1,299.99, 1.5k; €/eur/euros and £/gbp/pounds
+              set "currency" (prices are compared as given, not converted)
+- rating_min: rating/rated (at least) 4, 4.5 stars, 4+ stars, 4.5+
+- availability, count (top 3, 5 phones, "at least 10 items"), brand_in, category_in
+- brand_not_in: brands after a negation ("except samsung", "other than
+  apple or oppo", "but not samsung", "anything but samsung", "non-apple",
+  "isn't samsung", "without apple brand"; a negation
+  puts a common-word brand in brand position); categories right after a
+  negation ("no cases") are ignored
+
+A number followed by a unit ("under 2 years old", "up to 128 gb") is never
+a price unless it names a currency.
+
+Brand names that are ordinary English words (COMMON_WORDS: "apple",
+"beats", "essence", ...) only count in brand position: "by essence",
+"apple phone", "beats brand". "apple juice" or "phones with attitude" set
+no brand.
+
+The default vocabulary is the built-in brand list plus the phone words. With
+CATALOG_VOCABULARY on, load_catalog_vocabulary_in_background() replaces it
+with the brands and categories of the catalog (get_all_products).
+"""
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BRANDS = ("apple", "samsung", "oppo", "realme", "vivo", "xiaomi", "oneplus", "google", "nokia", "motorola")
+
+# Category names the original parser used for phone requests (kept for compatibility).
+PHONE_CATEGORIES = frozenset({"smartphones", "phones", "mobile"})
+# Request words that map to fixed categories, whatever the catalog calls them.
+CATEGORY_SYNONYMS = {
+    **{w: PHONE_CATEGORIES for w in ("phone", "phones", "smartphone", "smartphones",
+                                       "iphone", "iphones", "cell phone", "cellphone", "mobile", "mobiles")},
+    **{w: frozenset({"mobile-accessories"}) for w in ("phone case", "phone cases", "phone accessories")},
+}
+# Last words of category names too generic to mean the category on their own.
+_GENERIC_HEADS = {"accessories", "care", "decoration", "beauty"}
+
+_NUM = r"\d+(?:,\d{3})*(?:\.\d+)?(?:\s*k\b)?"
+# A number followed by one of these is a count ("at least 10 items"), never an amount.
+_COUNT_NOUNS = r"(?:items|products|phones|options|pieces|results)"
+_CUR_PRE = r"(?:[$€£]|usd|eur|gbp)\s*"
+_CUR_POST = r"(?:\s*(?:[$€£]|(?:usd|eur|gbp|dollars?|euros?|pounds?|bucks)\b))"
+_AMOUNT = rf"(?:{_CUR_PRE})?(?<![\w.]){_NUM}(?!\d|[.,]\d)(?!\s*{_COUNT_NOUNS}\b){_CUR_POST}?"
+_RATING_NUM = r"(?<![\w.])\d(?:\.\d+)?(?![\d.,])"
+_LIMIT_WORDS = r"(?:more|less|over|above|under|below|cheaper|higher|lower|greater)\b"
+
+# Alternatives tried at each position, first match wins (order matters).
+_PATTERNS = (
+    ("range", rf"(?:between|from)\s*{_AMOUNT}\s*(?:-|–|to|and)\s*{_AMOUNT}|{_AMOUNT}\s*(?:-|–|to)\s*{_AMOUNT}"),
+    ("rating", rf"(?:rating|rated)\s*(?:of\s*)?(?:>=|>|at least|no less than|above|over)?\s*{_RATING_NUM}\s*\+?(?:\s*stars?\b)?"),
+    ("max", rf"(?:under|below|less than|lower than|cheaper than|at most|no more than|up to|max(?:imum)?|within"
+            rf"|around|(?:not|isn't) (?:more than|over|above)|<=|<)\s*{_AMOUNT}"),
+    ("min", rf"(?:over|above|more than|greater than|at least|no less than|min(?:imum)?|starting at|from"
+            rf"|(?:not|isn't) (?:less than|under|below)|>=|>)\s*{_AMOUNT}(?:\s*\+)?(?:\s*stars?\b)?"),
+    ("stars", rf"{_RATING_NUM}\s*(?:\+\s*)?stars?\b|{_RATING_NUM}\s*\+"),
+    ("availability", r"\b(?:in|out of|low)\s+stock\b"),
+    ("count", rf"\btop\s*\d+|(?<![\w.,])\d+(?:,\d{{3}})*(?=\s*{_COUNT_NOUNS}\b)"),
+    # "not"/"isn't" before a limit word is part of the limit ("but not more than 300"), not a negation.
+    ("negation", rf"(?:(?:but not|not|isn't)\b(?!\s+{_LIMIT_WORDS})|other than|no|non|nor|except|excluding|without"
+                 r"|besides|but)\b"),
+)
+# A range right after one of these, or followed by "stars", is a rating range.
+_RATING_BEFORE_RE = re.compile(r"\b(?:rating|rated|rate)\s*(?:of\s*)?$")
+_STARS_AFTER_RE = re.compile(r"\s*stars?\b")
+# A number followed by a unit is not an amount of money ("under 2 years old", "up to 128 gb").
+_UNIT_AFTER_RE = re.compile(
+    r"\s*(?:years?|yrs?|months?|weeks?|days?|hours?|hundred|thousand|gb|tb|mb|inch(?:es)?|cm|mm|kg|lbs?|mp|mah|hz)\b"
+)
+# Words that may stand between a negation and the brands it excludes ("not from samsung or apple").
+_NEGATION_GAP = {"a", "an", "the", "any", "by", "from", "made", "brand", "brands", "and", "or", ","}
+# "from"/"at least" + a plain number is only a price after one of these words.
+_PRICE_WORD_RE = re.compile(r"\b(?:price[sd]?|pricing|costs?|costing|budget|spend(?:ing)?|paying)\W+(?:\w+\W+)?$")
+_NEEDS_PRICE_MARKER = ("from", "at least")
+# Words before or after a brand name that put it in brand position ("by essence", "beats brand").
+_BRAND_BEFORE = {"by", "from", "brand"}
+_BRAND_AFTER = {"brand", "brands", "products", "product", "items", "store", "collection"}
+# Common English words used as brand names; such brands need brand position.
+COMMON_WORDS = frozenset("""
+    apple apples beats beat essence attitude chic touch velvet trend trends fashion urban casual comfort
+    generic motor motors off white black red blue green pink gold golden silver bath glamour beauty
+    couture nail nails shade shades timepiece timepieces gear master vision snap tech pro home house life
+    nature natural pure simple basic classic modern fresh smart sport sports active care health kitchen
+    living outdoor power energy style luxury royal elegant crystal diamond star sun moon ocean river
+    garden family kids baby glow bloom grace charm bliss joy dream spirit soul harmony balance zen
+    original premium select choice prime vital daily fit mode bold brave true wild free
+""".split())
+
+_NUMBER_RE = re.compile(_NUM)
+_CURRENCIES = (("€", "EUR"), ("eur", "EUR"), ("£", "GBP"), ("gbp", "GBP"), ("pound", "GBP"),
+               ("$", "USD"), ("usd", "USD"), ("dollar", "USD"), ("buck", "USD"))
+
+
+def _amounts(text: str) -> List[float]:
+    values = []
+    for match in _NUMBER_RE.finditer(text):
+        number = match.group()
+        scale = 1000.0 if number.endswith("k") else 1.0
+        values.append(float(number.rstrip("k ").replace(",", "")) * scale)
+    return values
+
+
+def _currency(text: str) -> Optional[str]:
+    return next((code for marker, code in _CURRENCIES if marker in text), None)
+
+
+def _follows(q: str, end: Optional[int], start: int) -> bool:
+    """True if only _NEGATION_GAP words stand between q[end] and q[start] (a hyphen joins: "non-apple")."""
+    if end is None:
+        return False
+    return all(word in _NEGATION_GAP for word in q[end:start].replace(",", " , ").replace("-", " ").split())
+
+
+def _trie_regex(terms: Iterable[str]) -> str:
+    """One regex for all terms, with shared prefixes merged (a trie)."""
+    trie: Dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body  # greedy: longer terms are tried first
+
+    return build(trie)
+
+
+def _plural_variants(word: str) -> Tuple[str, ...]:
+    """The word and its singular: laptops -> laptop, groceries -> grocery, watches -> watch."""
+    if word.endswith("ies") and len(word) > 4:
+        return word, word[:-3] + "y"
+    if word.endswith(("sses", "ches", "shes", "xes")):
+        return word, word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")) and len(word) > 4:
+        return word, word[:-1]
+    return (word,)
+
+
+def category_terms(category: str) -> List[str]:
+    """Request phrases for a catalog category: "mens-watches" -> mens watches, men's watches, watches, watch."""
+    words = category.lower().replace("_", "-").split("-")
+    terms = [" ".join(words), category.lower()]
+    if len(words) > 1 and words[0] in ("mens", "womens"):
+        rest = " ".join(words[1:])
+        terms += [f"{words[0][:-1]}'s {rest}", f"{words[0][:-1]} {rest}"]
+    head = words[-1]
+    if head not in _GENERIC_HEADS:
+        terms += [t for t in _plural_variants(head) if len(t) > 3]
+    return terms
+
+
+class ConstraintParser:
+    """Compiled single-pass parser for one brand/category vocabulary."""
+
+    def __init__(self, brands: Iterable[str] = DEFAULT_BRANDS,
+                 categories: Optional[Dict[str, Iterable[str]]] = None):
+        """brands: brand names; categories: request phrase -> catalog category names."""
+        self.vocabulary: Dict[str, Tuple[str, Any]] = {}
+        self._ordinary_brands = set()  # brand phrases made of common words (need brand position)
+        for phrase, names in (categories or {}).items():
+            self._add(phrase, "category", frozenset(names))
+        for phrase, names in CATEGORY_SYNONYMS.items():
+            self.vocabulary[phrase] = ("category", names)
+        for brand in brands:
+            if brand and brand.strip():
+                self._add(brand, "brand", brand.strip().capitalize())
+                phrase = " ".join(brand.lower().split())
+                if all(word in COMMON_WORDS for word in phrase.split()):
+                    self._ordinary_brands.add(phrase)
+
+        alternatives = [f"(?P<{name}>{pattern})" for name, pattern in _PATTERNS]
+        if self.vocabulary:
+            # longest-first alternation is built into the trie; \b keeps whole words
+            alternatives.append(rf"(?P<term>(?<!\w){_trie_regex(self.vocabulary)}(?!\w))")
+        # Every alternative starts a word (or a symbol), so positions inside a word are skipped
+        # with one lookbehind instead of trying each alternative there.
+        self._regex = re.compile("(?<![a-z0-9])(?=[a-z0-9$€£<>])(?:" + "|".join(alternatives) + ")")
+
+    def _add(self, phrase: str, kind: str, value: Any) -> None:
+        phrase = " ".join(phrase.lower().split())
+        if not phrase:
+            return
+        known = self.vocabulary.get(phrase)
+        if known and known[0] == "category" and kind == "category":
+            value = known[1] | value  # "watches" -> mens-watches and womens-watches
+        elif known and known[0] == "category":
+            return  # a category phrase beats a brand of the same name
+        self.vocabulary[phrase] = (kind, value)
+
+    def _in_brand_position(self, q: str, match: "re.Match") -> bool:
+        """True if the brand name at `match` is preceded by "by"/"from"/"brand" or followed by a product word."""
+        before = q[:match.start()].split()
+        if before and before[-1] in _BRAND_BEFORE:
+            return True
+        after = q[match.end():].split()
+        if after and after[0] in _BRAND_AFTER:
+            return True
+        following = self._regex.match(q, match.end() + 1) if q[match.end():match.end() + 1] == " " else None
+        return (
+            following is not None and following.lastgroup == "term"
+            and self.vocabulary[following.group()][0] == "category"
+        )
+
+    @classmethod
+    def from_products(cls, products: Iterable[Any]) -> "ConstraintParser":
+        """Vocabulary from a catalog: every brand, and request phrases for every category."""
+        brands, categories = set(DEFAULT_BRANDS), {}
+        for p in products:
+            if p.get("brand"):
+                brands.add(str(p.get("brand")))
+            category = p.get("category")
+            if category:
+                for term in category_terms(str(category)):
+                    categories.setdefault(term, set()).add(str(category).lower())
+        return cls(sorted(brands), categories)
+
+    def parse(self, query: str) -> Dict[str, Any]:
+        """Constraints in the format of analysis_tools.parse_constraints."""
+        q = " ".join(query.lower().split())
+        constraints: Dict[str, Any] = {}
+        negation_end = excluded_end = None  # end of the last negation / of the last brand it excluded
+        for match in self._regex.finditer(q):
+            kind, text = match.lastgroup, match.group()
+            if kind == "negation":
+                negation_end = excluded_end = match.end()
+                continue
+            if kind == "term":
+                what, value = self.vocabulary[text]
+                if what == "brand":
+                    excluded = _follows(q, excluded_end, match.start())
+                    if text in self._ordinary_brands and not excluded and not self._in_brand_position(q, match):
+                        continue  # "apple juice", "phones with attitude"
+                    if excluded:
+                        constraints.setdefault("brand_not_in", set()).add(value)
+                        excluded_end = match.end()  # "except samsung or apple"
+                    else:
+                        constraints.setdefault("brand_in", set()).add(value)
+                elif not (_follows(q, negation_end, match.start()) and excluded_end == negation_end):
+                    constraints.setdefault("category_in", set()).update(value)  # not "no cases"
+                continue
+            if kind == "availability":
+                constraints.setdefault("availability", text)
+                continue
+            if kind == "count":
+                constraints.setdefault("count", int(_amounts(text)[0]))
+                continue
+
+            values, currency = _amounts(text), _currency(text)
+            if currency is None and _UNIT_AFTER_RE.match(q, match.end()):
+                continue  # "under 2 years old"
+            if kind == "range" and (_RATING_BEFORE_RE.search(q, 0, match.start()) or _STARS_AFTER_RE.match(q, match.end())):
+                if min(values) <= 5:
+                    constraints.setdefault("rating_min", min(values))  # "rated between 4 and 5"
+                continue
+            if (kind in ("min", "range") and text.startswith(_NEEDS_PRICE_MARKER) and currency is None
+                    and not _PRICE_WORD_RE.search(q[:match.start()])):
+                if kind == "min" and text.startswith("at least") and values[0] <= 5:
+                    constraints.setdefault("rating_min", values[0])  # "at least 4", as before
+                continue  # "phones from 2020" is not a price
+            if kind in ("rating", "stars") or "star" in text or (kind == "min" and currency is None and values[0] <= 5):
+                if min(values) <= 5:
+                    constraints.setdefault("rating_min", min(values))
+                continue
+            if kind == "range":
+                if currency is None and not text.startswith(("between", "from")):
+                    continue  # "13-14" is not a price range; "from" ranges were checked above
+                low, high = sorted(values[:2])
+                constraints.setdefault("price_min", low)
+                constraints.setdefault("price_max", high)
+            elif kind == "max":
+                constraints.setdefault("price_max", values[0])
+            else:
+                constraints.setdefault("price_min", values[0])
+            if currency:
+                constraints.setdefault("currency", currency)
+        return constraints
+
+
+_parser: ConstraintParser = ConstraintParser()
+_loading = threading.Lock()
+
+
+def get_constraint_parser() -> ConstraintParser:
+    return _parser
+
+
+def set_constraint_parser(parser: ConstraintParser) -> None:
+    global _parser
+    _parser = parser
+
+
+def load_catalog_vocabulary(products: Optional[Iterable[Any]] = None) -> ConstraintParser:
+    """Build the parser from the catalog's brands and categories (get_all_products if not given) and use it."""
+    if products is None:
+        from tools.product_api import get_all_products
+
+        products = get_all_products(limit=100)["products"]
+    parser = ConstraintParser.from_products(products)
+    set_constraint_parser(parser)
+    logger.info("Constraint vocabulary: %d terms from the catalog", len(parser.vocabulary))
+    return parser
+
+
+def load_catalog_vocabulary_in_background() -> Optional[threading.Thread]:
+    """Load the catalog vocabulary without blocking startup (no-op when CATALOG_VOCABULARY is off)."""
+    if not CATALOG_VOCABULARY or not _loading.acquire(blocking=False):
+        return None
+
+    def load():
+        try:
+            load_catalog_vocabulary()
+        except Exception as e:
+            logger.warning("Could not load the catalog vocabulary, using the built-in one: %s", e)
+        finally:
+            _loading.release()
+
+    thread = threading.Thread(target=load, name="constraint-vocabulary", daemon=True)
+    thread.start()
+    return thread
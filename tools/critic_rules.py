@@ -0,0 +1,196 @@
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from tools.analysis_tools import filter_by_constraints, parse_constraints
+from tools.search_planner import plan_search, unplanned_words
+
+"""
+Deterministic pre-check of the analyzer's recommendations (before the critic LLM).
+
+Most of the critic's rules are mechanical: the recommended products must be
+real candidates, their stated price/rating must match the data, and they must
+respect the user's explicit limits (price, rating, category, availability,
+brand). review_recommendations parses the analyzer's PRODUCT #n blocks,
+matches them to the search results by name and checks exactly that:
+
+- a stated price/rating that differs from the data, or a product that breaks
+  a constraint from parse_constraints -> REJECTED;
+- every block names a candidate, every check passes and the search
+  planner's keyword and the parsed constraints cover every word of the
+  request (plan_search, unplanned_words) -> APPROVED, without the critic LLM;
+- anything else (no PRODUCT blocks, a name that is not among the results,
+  an open-ended request such as "a phone for gaming" or "a phone with a
+  great camera", whose wishes go beyond the parsed constraints, no
+  candidate fits at all) -> None, and the critic LLM decides.
+
+An approval vouches for the facts and limits only; the analyzer's reasons
+and strengths are not read. Requests that exclude something ("except
+samsung", "no cases", "don't want apple") are always left to the LLM: what
+the user excludes may be more than the parser understands. Limits phrased
+with a negation ("no more than $500", "not over 300") are not exclusions.
+
+The verdicts use the critic's output format. critic_stats counts rule
+verdicts and LLM calls.
+"""
+
+_BLOCK_RE = re.compile(r"^\s*PRODUCT\s*#\s*(\d+)\s*$", re.IGNORECASE | re.MULTILINE)
+_FIELD_RE = re.compile(r"^\s*(Name|Brand|Price|Rating)\s*:\s*(.+?)\s*$", re.IGNORECASE | re.MULTILINE)
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+_THOUSANDS_RE = re.compile(r"^\d{1,3}(?:([.,])\d{3})(?:\1\d{3})*$")
+_LIMIT_WORDS = r"(?:more|less|over|under|above|below|higher|lower|cheaper|greater)\b"
+# Exclusions; "no more than"/"not over" and the like are price or rating limits.
+_NEGATION_RE = re.compile(
+    r"\b(?:except|excluding|without|besides|other than|anything but|but not|nor|non)\b"
+    rf"|(?:\b(?:not|no|never)|n't)\b(?!\s+{_LIMIT_WORDS})"
+)
+# The "no"/"not" of a limit, dropped before asking the search planner ("no more than $500").
+_LIMIT_NEGATION_RE = re.compile(rf"\b(?:not|no)\s+(?={_LIMIT_WORDS})")
+
+# Reason for a failed constraint, by parse_constraints key.
+_CONSTRAINT_PROBLEMS = {
+    "price_max": "costs {price}, above the {value:g} limit",
+    "price_min": "costs {price}, below the requested minimum of {value:g}",
+    "rating_min": "is rated {rating}, below the requested {value:g}",
+    "category_in": "is in category '{category}', not the requested product type",
+    "availability": "is '{availabilityStatus}', but the user asked for {value}",
+    "brand_in": "is made by {brand}, not one of the requested brands",
+}
+
+
+def _normalize(text: Any) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+def _number(text: str) -> Optional[float]:
+    """
+    First number in text: "1,299.99" and "1.299,99" are 1299.99 (the last
+    separator is the decimal point), "4,5" is 4.5, "1,299" and "1.299.000"
+    are thousands; a single "." is a decimal point.
+    """
+    match = _NUMBER_RE.search(text or "")
+    if not match:
+        return None
+    number = match.group()
+    commas, dots = number.count(","), number.count(".")
+    if commas and dots:
+        decimal = "," if number.rfind(",") > number.rfind(".") else "."
+        thousands = "." if decimal == "," else ","
+        if number.count(decimal) > 1:
+            return None
+        number = number.replace(thousands, "").replace(decimal, ".")
+    elif commas or dots > 1:
+        separator = "," if commas else "."
+        if _THOUSANDS_RE.match(number):
+            number = number.replace(separator, "")
+        elif commas == 1:
+            number = number.replace(",", ".")  # decimal comma
+        else:
+            return None
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+
+def parse_recommendations(text: str) -> List[Dict[str, Any]]:
+    """The analyzer's PRODUCT #n blocks as [{"n", "name", "brand", "price", "rating"}] (values as written)."""
+    if not text:
+        return []
+    heads = list(_BLOCK_RE.finditer(text))
+    blocks = []
+    for i, head in enumerate(heads):
+        end = heads[i + 1].start() if i + 1 < len(heads) else len(text)
+        fields = {key.lower(): value for key, value in _FIELD_RE.findall(text[head.end():end])}
+        blocks.append({"n": int(head.group(1)), **fields})
+    return blocks
+
+
+def _fact_problems(block: Dict[str, Any], product: Any) -> List[str]:
+    problems = []
+    price, actual_price = _number(block.get("price")), product.get("price")
+    if price is not None and actual_price is not None and abs(price - float(actual_price)) > 0.01 * max(1.0, float(actual_price)):
+        problems.append(f"states price {block['price']}, but the data says {actual_price}")
+    rating, actual_rating = _number(block.get("rating")), product.get("rating")
+    if rating is not None and actual_rating is not None and abs(rating - float(actual_rating)) > 0.05:
+        problems.append(f"states rating {block['rating']}, but the data says {actual_rating}")
+    return problems
+
+
+def _constraint_problems(product: Any, constraints: Dict[str, Any]) -> List[str]:
+    problems = []
+    for key, value in constraints.items():
+        if key in _CONSTRAINT_PROBLEMS and not filter_by_constraints([product], {key: value}):
+            fields = {f: product.get(f) for f in ("price", "rating", "category", "availabilityStatus", "brand")}
+            problems.append(_CONSTRAINT_PROBLEMS[key].format(value=value, **fields))
+    return problems
+
+
+def review_recommendations(user_request: str, recommendations: str, products: List[Any]) -> tuple:
+    """
+    Rule-based critic verdict for the analyzer's recommendations.
+
+    Returns (verdict, reason): verdict is the critic-style "APPROVED:..." or
+    "REJECTED:..." text, or None when the rules cannot decide; reason names the check that
+    decided (or why the LLM is needed).
+    """
+    blocks = parse_recommendations(recommendations)
+    if not blocks:
+        return None, "no product blocks"
+    if _NEGATION_RE.search(user_request.lower()):
+        return None, "negation"  # exclusions may go beyond the parsed constraints
+
+    constraints = parse_constraints(user_request)
+    constraints.pop("count", None)  # "top 3" is about the answer's length
+    if constraints and not filter_by_constraints(products, constraints):
+        return None, "no candidate fits"  # the analyzer can only explain and suggest relaxing
+
+    by_name = {_normalize(p.get("title")): p for p in products}
+    problems = []
+    for block in blocks:
+        product = by_name.get(_normalize(block.get("name")))
+        if product is None:
+            return None, "unknown product"
+        for problem in _fact_problems(block, product) + _constraint_problems(product, constraints):
+            problems.append(f"PRODUCT #{block['n']} ({product.get('title')}) {problem}.")
+
+    if problems:
+        fixes = "Recommend only candidates that meet the stated limits and quote their price and rating from the data."
+        return "REJECTED:\n" + " ".join(problems[:3]) + "\n" + fixes, "rules rejected"
+    request = _LIMIT_NEGATION_RE.sub("", user_request.lower())
+    plan = plan_search(request)
+    if plan is None or unplanned_words(request, plan):
+        return None, "open request"  # wishes beyond the keyword and parsed constraints need reading
+    limits = ", ".join(sorted(constraints)) or "none stated"
+    return (
+        f"APPROVED:\nAll {len(blocks)} recommended products are search results with the stated price and rating, "
+        f"and each meets the request's explicit limits ({limits})."
+    ), "rules approved"
+
+
+class CriticStats:
+    """Counts critic verdicts made by the rules and calls that still went to the LLM."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rule_verdicts: Dict[str, int] = {}
+        self.llm_reasons: Dict[str, int] = {}
+
+    def record(self, reason: str, by_rules: bool) -> None:
+        with self._lock:
+            counts = self.rule_verdicts if by_rules else self.llm_reasons
+            counts[reason] = counts.get(reason, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            avoided, llm = sum(self.rule_verdicts.values()), sum(self.llm_reasons.values())
+            return {
+                "llm_calls_avoided": avoided,
+                "llm_calls": llm,
+                "rule_verdicts": dict(self.rule_verdicts),
+                "llm_reasons": dict(self.llm_reasons),
+                "avoided_ratio": round(avoided / (avoided + llm), 3) if avoided + llm else 0.0,
+            }
+
+
+critic_stats = CriticStats()
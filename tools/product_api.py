@@ -1,47 +1,212 @@
+import contextvars
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.app_config import PRODUCT_API_URL, PRODUCT_API_SELECT, HTTP_CONFIG, PAGE_FETCH_WORKERS
+from tools.analysis_tools import filter_by_constraints, parse_constraints
+from tools.response_cache import cached
+from utils.tracing import traced
+
+try:
+    import orjson  # optional: decodes API pages several times faster than json
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = PRODUCT_API_URL
+
+# Max pages fetched in parallel by get_all_products (1 = sequential).
+PAGE_WORKERS = PAGE_FETCH_WORKERS
+
+# Product fields requested from the API (`select`; "id" is always returned).
+# LIST_FIELDS is what _clean_product keeps for search_products and
+# get_all_products; get_product also returns the DETAIL_FIELDS. Images,
+# dimensions, meta, sku, ... are never downloaded, and reviews only for
+# get_product (list results would only count them).
+LIST_FIELDS = (
+    "title", "price", "rating", "description", "category", "brand",
+    "stock", "discountPercentage", "availabilityStatus",
+)
+DETAIL_FIELDS = LIST_FIELDS + ("reviews", "tags", "warrantyInformation", "shippingInformation", "returnPolicy")
+
+# Set to False (PRODUCT_API_SELECT=0) for an API without field selection.
+SELECT_FIELDS = PRODUCT_API_SELECT
+
+# Shared HTTP session (created lazily, see get_session).
+_session = None
+_session_lock = threading.Lock()
+
+# Optional local catalog (see enable_catalog_snapshot).
+_catalog = None
+
+
+def _build_session() -> requests.Session:
+    """
+    Build a requests.Session with a keep-alive connection pool and bounded retries.
+    Retries only cover connection errors and retryable status codes (429/5xx),
+    waiting backoff_factor * 2^n seconds between attempts.
+    """
+    retry = Retry(
+        total=HTTP_CONFIG["max_retries"],
+        connect=HTTP_CONFIG["max_retries"],
+        read=HTTP_CONFIG["max_retries"],
+        status=HTTP_CONFIG["max_retries"],
+        backoff_factor=HTTP_CONFIG["backoff_factor"],
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_CONFIG["pool_size"],
+        pool_maxsize=HTTP_CONFIG["pool_size"],
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the shared pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def configure_http(**settings) -> None:
+    """
+    Update HTTP_CONFIG (pool_size, connect_timeout, read_timeout, max_retries,
+    backoff_factor, pooled) and drop the current session so the next call
+    picks up the new settings.
+    """
+    global _session
+    unknown = set(settings) - set(HTTP_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown HTTP settings: {sorted(unknown)}")
+    with _session_lock:
+        HTTP_CONFIG.update(settings)
+        if _session is not None:
+            _session.close()
+        _session = None
+
 
-BASE_URL = "https://dummyjson.com/products"
+def enable_catalog_snapshot(path: str, ttl: float):
+    """
+    Answer search_products from a local catalog snapshot when it is fresh.
+    The snapshot is loaded from `path` (or built in the background if missing
+    or older than `ttl` seconds); searches fall back to the API until then.
+    Returns the CatalogStore so callers can inspect hits/misses.
+
+    Matching is not identical to the API: the snapshot returns products that
+    contain every query word (each as a substring of some indexed word, in
+    any field and order), while the API matches the query as a whole. Single
+    words agree; "wireless mouse" can also match a product whose title says
+    "mouse" and whose description says "wireless".
+    """
+    global _catalog
+    from tools.catalog_snapshot import CatalogStore
+
+    _catalog = CatalogStore(path, ttl)
+    if not _catalog.is_fresh():
+        _catalog.refresh_in_background()
+    return _catalog
+
+
+def disable_catalog_snapshot() -> None:
+    global _catalog
+    _catalog = None
 
 
+def _select(params: dict = None, fields: tuple = LIST_FIELDS) -> dict:
+    """Query parameters with the API's field selection added (when enabled)."""
+    params = dict(params or {})
+    if SELECT_FIELDS:
+        params["select"] = ",".join(fields)
+    return params
+
+
+def _get_json(url: str, params: dict = None) -> dict:
+    """
+    GET a URL and decode the JSON body.
+    Uses the shared pooled session, or a throwaway session per call when
+    pooling is disabled (same retries/timeouts, but a new connection each time).
+    The body is decoded from bytes with _loads, skipping requests' charset
+    detection (the API always sends UTF-8 JSON).
+    """
+    timeout = (HTTP_CONFIG["connect_timeout"], HTTP_CONFIG["read_timeout"])
+    if HTTP_CONFIG["pooled"]:
+        res = get_session().get(url, params=params, timeout=timeout)
+    else:
+        with _build_session() as session:
+            res = session.get(url, params=params, timeout=timeout)
+    res.raise_for_status()
+    return _loads(res.content)
+
+
+def _clean_product(product: dict) -> dict:
+    """Keep only the fields needed for analysis (LIST_FIELDS, with reviews counted if the API sent them)."""
+    cleaned = {
+        'id': product['id'],
+        'title': product['title'],
+        'price': product['price'],
+        'rating': product['rating'],
+        'description': product['description'],
+        'category': product['category'],
+        'brand': product.get('brand', 'Unknown'),
+        'stock': product['stock'],
+        'discountPercentage': product.get('discountPercentage', 0),
+        'availabilityStatus': product['availabilityStatus'],
+    }
+    if 'reviews' in product:  # not requested with field selection
+        cleaned['reviews_count'] = len(product['reviews'])
+    return cleaned
+
+
+@traced("tool.get_product")
+@cached("get_product")
 def get_product(product_id: int) -> dict:
     """
     Fetch a single product by ID.
     Returns a dict or raises an exception on failure.
     """
-    url = f"{BASE_URL}/{product_id}"
-    res = requests.get(url)
-    res.raise_for_status()
-    return res.json()
+    return _get_json(f"{BASE_URL}/{int(product_id)}", params=_select(fields=DETAIL_FIELDS))
 
 
+@traced("tool.search_products")
+@cached("search_products")
 def search_products(query: str, limit: int = 30, skip: int = 0) -> dict:
     """
     Search for products based on a query string.
     Supports pagination via limit + skip.
     Returns a dict with 'products' list and 'total'.
     """
-    url = f"{BASE_URL}/search?q={query}&limit={limit}&skip={skip}"
-    res = requests.get(url)
-    res.raise_for_status()
-    data = res.json()
-    
+    if _catalog is not None:
+        local = _catalog.search(query, limit=int(limit), skip=int(skip))
+        if local is not None:
+            return local
+
+    data = _get_json(
+        f"{BASE_URL}/search",
+        params=_select({"q": query, "limit": int(limit), "skip": int(skip)}),
+    )
+
     # Clean up the response - remove unnecessary fields for analysis
-    cleaned_products = []
-    for product in data.get('products', []):
-        cleaned_products.append({
-            'id': product['id'],
-            'title': product['title'],
-            'price': product['price'],
-            'rating': product['rating'],
-            'description': product['description'],
-            'category': product['category'],
-            'brand': product['brand'],
-            'stock': product['stock'],
-            'discountPercentage': product.get('discountPercentage', 0),
-            'availabilityStatus': product['availabilityStatus'],
-            'reviews_count': len(product.get('reviews', []))
-        })
-    
+    cleaned_products = [_clean_product(p) for p in data.get('products', [])]
+
     return {
         'products': cleaned_products,
         'total': data['total'],
@@ -49,45 +214,193 @@ def search_products(query: str, limit: int = 30, skip: int = 0) -> dict:
     }
 
 
+@traced("tool.search_products_multi")
+def search_products_multi(queries: List[str], limit: int = 20) -> dict:
+    """
+    Run several keyword searches at once (e.g. ["phone", "smartphone"]).
+    Returns one result: products from all searches with duplicates (same id)
+    removed, first query first; 'total' is the sum of the per-query totals
+    minus the duplicates seen; 'totals' has the total per query.
+    """
+    if isinstance(queries, str):
+        queries = queries.split(",")  # "phone, smartphone" from a sloppy tool call
+    queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+    if not queries:
+        return {'products': [], 'total': 0, 'totals': {}, 'query': ''}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(PAGE_WORKERS, len(queries)))) as pool:
+        # each search runs in a copy of this context so its span joins the current trace
+        futures = [
+            pool.submit(contextvars.copy_context().run, search_products, q, limit=limit)
+            for q in queries
+        ]
+        results, errors = [], {}
+        for q, future in zip(queries, futures):
+            try:
+                results.append((q, future.result()))
+            except Exception as e:
+                logger.warning("search_products(%r) failed: %s", q, e)
+                errors[q] = str(e)
+    if not results:
+        raise RuntimeError(f"All searches failed: {errors}")
+
+    merged, seen, duplicates = [], set(), 0
+    for _, result in results:
+        for product in result.get('products', []):
+            if product.get('id') in seen:
+                duplicates += 1
+                continue
+            seen.add(product.get('id'))
+            merged.append(product)
+
+    totals = {q: result.get('total', 0) for q, result in results}
+    merged_result = {
+        'products': merged,
+        'total': sum(totals.values()) - duplicates,
+        'totals': totals,
+        'query': ", ".join(queries),
+    }
+    if errors:
+        merged_result['errors'] = errors
+    return merged_result
+
+
+def iter_search_products(query: str,
+                         predicate: Union[Dict[str, Any], Callable[[dict], bool], None] = None,
+                         page_size: int = 30, max_pages: int = 10,
+                         progress: Optional[dict] = None) -> Iterator[dict]:
+    """
+    Yield the products of a keyword search lazily: the next page
+    (search_products with limit=page_size and the next skip) is fetched only
+    when the caller asks for more, so islice(iter_search_products(...), 10)
+    stops paging as soon as 10 products were yielded.
+
+    predicate filters each page as it arrives: a constraints dict
+    (parse_constraints; applied with filter_by_constraints, "count" ignored)
+    or a callable(product) -> bool. None yields every product.
+    progress, if given, is updated with the pages fetched, the products
+    scanned, the search total and whether every result was read
+    ("exhausted"; False when paging stopped at max_pages or the caller
+    stopped early).
+    """
+    if isinstance(predicate, dict):
+        constraints = {k: v for k, v in predicate.items() if k != "count"}
+        keep = (lambda page: filter_by_constraints(page, constraints)) if constraints else None
+    elif predicate is not None:
+        keep = lambda page: [p for p in page if predicate(p)]
+    else:
+        keep = None
+
+    progress = progress if progress is not None else {}
+    progress.update(pages=0, scanned=0, total=0, exhausted=False)
+    skip = 0
+    for _ in range(max(1, int(max_pages))):
+        data = search_products(query, limit=page_size, skip=skip)
+        products = data.get('products', [])
+        progress["pages"] += 1
+        progress["scanned"] += len(products)
+        progress["total"] = data.get('total', 0)
+        yield from (keep(products) if keep else products)
+        skip += page_size
+        if not products or skip >= progress["total"]:
+            progress["exhausted"] = True
+            return
+
+
+@traced("tool.search_matching_products")
+def search_matching_products(query: str, request: str = "", want: int = 10, page_size: int = 30,
+                             max_pages: int = 10) -> dict:
+    """
+    One keyword search that pages through the results until `want` products
+    satisfy the constraints in `request` (the user's wording, e.g.
+    "under $200 rated 4.5+"), fetching no more pages than needed (at most
+    max_pages).
+    Returns 'products' (the matches, in search order), 'total' (all results
+    for the keyword), 'query', 'pages', 'scanned' and 'max_pages';
+    'exhausted' is True when every result was checked, 'truncated' when
+    paging stopped at max_pages with fewer than `want` matches and results
+    left unchecked.
+    """
+    constraints = parse_constraints(request) if request else {}
+    want = max(1, int(want))
+    progress: Dict[str, Any] = {}
+    matches = list(islice(iter_search_products(query, constraints, page_size, max_pages, progress=progress), want))
+    exhausted = bool(progress.get('exhausted'))
+    return {
+        'products': matches,
+        'total': progress.get('total', 0),
+        'query': query,
+        'pages': progress.get('pages', 0),
+        'scanned': progress.get('scanned', 0),
+        'max_pages': max_pages,
+        'exhausted': exhausted,
+        'truncated': not exhausted and len(matches) < want,
+    }
+
+
+def _fetch_page(limit: int, skip: int) -> dict:
+    return _get_json(BASE_URL, params=_select({"limit": int(limit), "skip": int(skip)}))
+
+
+@traced("tool.get_all_products")
+@cached("get_all_products")
 def get_all_products(limit: int = 30, skip: int = 0) -> dict:
     """
     Fetch all products using pagination.
     Returns a dict with products list and total count.
+
+    The first page tells us the catalog total, so when PAGE_WORKERS > 1 the
+    remaining pages are fetched in parallel and reassembled in order.
     """
+    return _fetch_all_products(limit, skip)
+
+
+def _fetch_all_products(limit: int = 30, skip: int = 0) -> dict:
+    """get_all_products straight from the API, bypassing the response cache (catalog snapshot rebuilds)."""
+    if PAGE_WORKERS > 1 and limit > 0:
+        return _get_all_products_concurrent(limit, skip, PAGE_WORKERS)
+
     all_products = []
     current_skip = skip
-    
+
     while True:
-        url = f"{BASE_URL}?limit={limit}&skip={current_skip}"
-        res = requests.get(url)
-        res.raise_for_status()
-        data = res.json()
-        
+        data = _fetch_page(limit, current_skip)
+
         products = data.get('products', [])
         if not products:
             break
-        
-        for product in products:
-            all_products.append({
-                'id': product['id'],
-                'title': product['title'],
-                'price': product['price'],
-                'rating': product['rating'],
-                'description': product['description'],
-                'category': product['category'],
-                'brand': product['brand'],
-                'stock': product['stock'],
-                'discountPercentage': product.get('discountPercentage', 0),
-                'availabilityStatus': product['availabilityStatus'],
-                'reviews_count': len(product.get('reviews', []))
-            })
-        
+
+        all_products.extend(_clean_product(p) for p in products)
+
         current_skip += limit
-        
+
         if current_skip >= data.get('total', 0):
             break
-    
+
+    return {
+        'products': all_products,
+        'total': len(all_products)
+    }
+
+
+def _get_all_products_concurrent(limit: int, skip: int, workers: int) -> dict:
+    """Same result as the sequential walk in get_all_products, with pages 2..n fetched in parallel."""
+    first = _fetch_page(limit, skip)
+    pages = [first.get('products', [])]
+
+    if pages[0]:
+        remaining = range(skip + limit, first.get('total', 0), limit)
+        if remaining:
+            with ThreadPoolExecutor(max_workers=min(workers, len(remaining))) as pool:
+                # map() yields results in submission order, so pages stay in catalog order
+                for data in pool.map(lambda s: _fetch_page(limit, s), remaining):
+                    page = data.get('products', [])
+                    if not page:
+                        break  # same early stop as the sequential walk
+                    pages.append(page)
+
+    all_products = [_clean_product(p) for page in pages for p in page]
     return {
         'products': all_products,
         'total': len(all_products)
-    }
\ No newline at end of file
+    }
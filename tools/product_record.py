@@ -0,0 +1,115 @@
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+"""
+Compact in-memory product record.
+
+Product keeps the fields the advisor works with in __slots__ (no per-object
+__dict__), interns the low-cardinality strings (brand, category,
+availabilityStatus, tags) so a large catalog holds one copy of each, and
+stores the review count instead of the reviews.
+
+It reads like the product dicts it replaces: p.get("price"), "price" in p,
+so analysis_tools, ProductTable and format_products_for_analyzer accept both.
+Missing fields are None, and get() then returns the default.
+
+Tools still exchange plain dicts with the LLM; use Product.from_dict /
+to_dict at that boundary.
+"""
+
+FIELDS = (
+    "id", "title", "price", "rating", "description", "category", "brand", "stock",
+    "discountPercentage", "availabilityStatus", "reviews_count", "tags",
+)
+
+_intern = sys.intern
+
+
+def _interned(value: Any) -> Any:
+    return _intern(value) if isinstance(value, str) else value
+
+
+class Product:
+    """One product; see FIELDS for the attributes."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, id=None, title=None, price=None, rating=None, description=None,
+                 category=None, brand=None, stock=None, discountPercentage=None,
+                 availabilityStatus=None, reviews_count=None, tags=None):
+        self.id = id
+        self.title = title
+        self.price = price
+        self.rating = rating
+        self.description = description
+        self.category = _interned(category)
+        self.brand = _interned(brand)
+        self.stock = stock
+        self.discountPercentage = discountPercentage
+        self.availabilityStatus = _interned(availabilityStatus)
+        self.reviews_count = reviews_count
+        self.tags = tuple(_interned(t) for t in tags) if tags is not None else None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Product":
+        """
+        Build a record from an API product, a cleaned tool result or a parsed
+        orchestrator item. Unknown keys (images, meta, ...) are dropped and
+        "reviews" is reduced to reviews_count.
+        """
+        reviews_count = data.get("reviews_count")
+        if reviews_count is None and isinstance(data.get("reviews"), list):
+            reviews_count = len(data["reviews"])
+        tags = data.get("tags")
+        return cls(
+            id=data.get("id"),
+            title=data.get("title"),
+            price=data.get("price"),
+            rating=data.get("rating"),
+            description=data.get("description"),
+            category=data.get("category"),
+            brand=data.get("brand"),
+            stock=data.get("stock"),
+            discountPercentage=data.get("discountPercentage"),
+            availabilityStatus=data.get("availabilityStatus"),
+            reviews_count=reviews_count,
+            tags=tags if isinstance(tags, (list, tuple)) else None,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict for tools / JSON; fields that are None are left out."""
+        data = {}
+        for field in FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = list(value) if field == "tags" else value
+        return data
+
+    # --- dict-style access, so code written for product dicts keeps working --------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in FIELDS else None
+        return default if value is None else value
+
+    def __contains__(self, key: str) -> bool:
+        return key in FIELDS and getattr(self, key) is not None
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Product):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in FIELDS)
+
+    __hash__ = None  # mutable
+
+    def __repr__(self) -> str:
+        return f"Product(id={self.id!r}, title={self.title!r}, price={self.price!r}, rating={self.rating!r})"
+
+
+def ensure_products(items: Optional[Iterable[Any]]) -> List[Product]:
+    """Records as-is, dicts converted; None -> []."""
+    return [p if isinstance(p, Product) else Product.from_dict(p) for p in items or ()]
@@ -0,0 +1,218 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+"""
+Columnar, vectorized version of the helpers in tools/analysis_tools.py.
+
+The per-dict helpers re-lowercase strings and re-parse floats for every product
+on every call. ProductTable does that once: numbers become float arrays and
+strings become integer codes into a small vocabulary, so each constraint is one
+NumPy comparison over the whole catalog.
+
+The module-level functions mirror analysis_tools (same names, same
+arguments, same results) but take a ProductTable instead of a list:
+
+    table = ProductTable(get_all_products()["products"])
+    cheap = filter_by_constraints(table, parse_constraints("phones under $300"))
+"""
+
+
+def _to_float(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _round3(values: np.ndarray) -> np.ndarray:
+    """
+    Vectorized round(x, 3) with the same result as Python's round().
+
+    np.rint(x * 1000) only disagrees with round() when x * 1000 lands exactly
+    on a half: the product was rounded, so the true value may lie on either
+    side. Its exact rounding error (Dekker's two-product, 1000 needs no split)
+    tells which side; an error of 0 is a real tie and rint's half-to-even
+    matches round().
+    """
+    scaled = values * 1000
+    rounded = np.rint(scaled)
+    floor = np.floor(scaled)
+    ties = np.flatnonzero(scaled - floor == 0.5)
+    if len(ties):
+        x = values[ties]
+        split = 134217729.0 * x  # 2**27 + 1
+        hi = split - (split - x)
+        lo = x - hi
+        error = (hi * 1000 - scaled[ties]) + lo * 1000
+        rounded[ties] = np.where(error > 0, floor[ties] + 1, np.where(error < 0, floor[ties], rounded[ties]))
+    return rounded / 1000
+
+
+class _Codes:
+    """A string column stored as integer codes into a small vocabulary."""
+
+    def __init__(self, values: List[str]):
+        # dict-based encoding: one hash lookup per value, no object-array sort
+        self._lookup: Dict[str, int] = {}
+        self.codes = np.fromiter(
+            (self._lookup.setdefault(v, len(self._lookup)) for v in values),
+            dtype=np.int32,
+            count=len(values),
+        )
+        self.vocab = list(self._lookup)
+
+    def isin(self, wanted) -> np.ndarray:
+        # Boolean lookup table over the vocabulary, then one gather over the codes.
+        table = np.zeros(len(self.vocab), dtype=bool)
+        table[[self._lookup[v] for v in wanted if v in self._lookup]] = True
+        return table[self.codes]
+
+    def eq(self, value: str) -> np.ndarray:
+        return self.isin([value])
+
+
+class ProductTable:
+    """
+    Column arrays for a list of product dicts. The original dicts are kept
+    and returned by the filter functions, so results are the same objects
+    the list-based helpers would return.
+    """
+
+    def __init__(self, products: List[Dict[str, Any]]):
+        self.products = list(products)
+        prices, ratings, score_prices, score_ratings, discounts = [], [], [], [], []
+        categories, statuses, brands = [], [], []
+        self._tags: Optional[List[set]] = None
+        self._scores: Optional[np.ndarray] = None
+
+        for p in self.products:
+            price = p.get("price", float("inf"))
+            rating = p.get("rating", 0)
+            # Filtering semantics (see filter_by_constraints): a missing price never
+            # passes a price limit and a missing rating is 0; unparsable values fail both.
+            prices.append(_to_float(price, np.nan))
+            ratings.append(_to_float(rating, np.nan))
+            # Scoring semantics (see score_product): missing/None/0 price counts as 1,
+            # missing/None rating or discount as 0.
+            score_prices.append(_to_float(price or 1, 1.0) if "price" in p else 1.0)
+            score_ratings.append(_to_float(rating or 0, 0.0))
+            discounts.append(_to_float(p.get("discountPercentage", 0) or 0, 0.0))
+            categories.append((p.get("category") or "").lower())
+            statuses.append((p.get("availabilityStatus") or "").lower())
+            brands.append((p.get("brand") or "").capitalize())
+
+        self.price = np.array(prices, dtype=float)
+        self.rating = np.array(ratings, dtype=float)
+        self.score_price = np.array(score_prices, dtype=float)
+        self.score_rating = np.array(score_ratings, dtype=float)
+        self.discount = np.array(discounts, dtype=float)
+        self.category = _Codes(categories)
+        self.availability = _Codes(statuses)
+        self.brand = _Codes(brands)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def take(self, mask_or_idx) -> List[Dict[str, Any]]:
+        """Products selected by a boolean mask or an index array, in that order."""
+        idx = np.flatnonzero(mask_or_idx) if getattr(mask_or_idx, "dtype", None) == bool else mask_or_idx
+        return [self.products[i] for i in idx]
+
+    # --- vectorized building blocks -------------------------------------------------
+
+    def scores(self) -> np.ndarray:
+        """score_product for every row: (rating * 2) + (discount / 5) - (price / 20)."""
+        if self._scores is None:
+            raw = (self.score_rating * 2) + (self.discount / 5) - (self.score_price / 20)
+            self._scores = _round3(raw)
+        return self._scores
+
+    def price_mask(self, max_price: float) -> np.ndarray:
+        return self.price <= float(max_price)  # NaN compares False
+
+    def rating_mask(self, min_rating: float) -> np.ndarray:
+        return self.rating >= float(min_rating)
+
+    def tag_mask(self, tag: str) -> np.ndarray:
+        if self._tags is None:  # rarely used, so built on first use
+            self._tags = [{t.lower() for t in p.get("tags", [])} for p in self.products]
+        tag = tag.lower()
+        return np.fromiter((tag in tags for tags in self._tags), dtype=bool, count=len(self._tags))
+
+    def constraints_mask(self, constraints: Dict[str, Any]) -> np.ndarray:
+        """One boolean mask for all constraints except 'count'."""
+        mask = np.ones(len(self.products), dtype=bool)
+        if "price_max" in constraints:
+            mask &= self.price_mask(constraints["price_max"])
+        if "price_min" in constraints:
+            mask &= self.price >= float(constraints["price_min"])  # NaN compares False
+        if "rating_min" in constraints:
+            mask &= self.rating_mask(constraints["rating_min"])
+        if "category_in" in constraints:
+            mask &= self.category.isin(constraints["category_in"])
+        if "availability" in constraints:
+            mask &= self.availability.eq(constraints["availability"].lower())
+        if "brand_in" in constraints:
+            mask &= self.brand.isin(constraints["brand_in"])
+        if "brand_not_in" in constraints:
+            mask &= ~self.brand.isin(constraints["brand_not_in"])
+        return mask
+
+    def top_k(self, k: int, mask: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        The k best-scoring products (optionally among mask), best first.
+        Selection is O(n) with np.partition; only the k winners are sorted.
+        Ties keep catalog order, exactly like heapq.nlargest.
+        """
+        scores = self.scores()
+        idx = np.flatnonzero(mask) if mask is not None else np.arange(len(scores))
+        if len(idx) > k:
+            s = scores[idx]
+            threshold = np.partition(s, len(s) - k)[len(s) - k]  # k-th largest score
+            above = np.flatnonzero(s > threshold)
+            at_threshold = np.flatnonzero(s == threshold)[:k - len(above)]
+            idx = idx[np.sort(np.concatenate([above, at_threshold]))]
+        order = np.argsort(-scores[idx], kind="stable")
+        return self.take(idx[order])
+
+
+# --- drop-in equivalents of tools/analysis_tools.py -----------------------------------
+
+def score_products(table: ProductTable) -> np.ndarray:
+    """score_product for every product in the table."""
+    return table.scores()
+
+
+def filter_by_price(table: ProductTable, max_price: float) -> List[Dict]:
+    """Return products priced below or equal to max_price."""
+    return table.take(table.price_mask(max_price))
+
+
+def filter_by_rating(table: ProductTable, min_rating: float) -> List[Dict]:
+    """Return products rated above or equal to min_rating."""
+    return table.take(table.rating_mask(min_rating))
+
+
+def filter_by_category(table: ProductTable, category: str) -> List[Dict]:
+    """Return products matching a specific category."""
+    return table.take(table.category.eq(category.lower()))
+
+
+def filter_by_availability(table: ProductTable, status: str = "In Stock") -> List[Dict]:
+    """Return products matching the availability status."""
+    return table.take(table.availability.eq(status.lower()))
+
+
+def filter_by_tags(table: ProductTable, tag: str) -> List[Dict]:
+    """Return products containing a specific tag."""
+    return table.take(table.tag_mask(tag))
+
+
+def filter_by_constraints(table: ProductTable, constraints: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Filter products using parsed constraints."""
+    idx = np.flatnonzero(table.constraints_mask(constraints))
+    count = constraints.get("count")
+    if isinstance(count, int) and count > 0:
+        idx = idx[:count]
+    return table.take(idx)
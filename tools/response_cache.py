@@ -0,0 +1,192 @@
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from config.app_config import RESPONSE_CACHE
+
+"""
+Bounded TTL + LRU cache for product tool responses.
+
+The orchestrator repeats the same search_products(query, limit=20) and
+get_product(id) calls across turns and across queries; the @cached decorator
+answers those from memory instead of the network.
+
+- Keys are the tool name plus its normalized arguments (defaults filled in,
+  strings stripped/lower-cased, 20.0 -> 20), so equivalent calls share an entry.
+- Values are stored as JSON text: every hit returns a fresh copy and the entry
+  size is known for the max_bytes limit.
+- Optional sqlite tier (db_path) keeps entries across CLI restarts.
+"""
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with a TTL, entry/byte limits and an optional sqlite tier."""
+
+    def __init__(self, ttl: float = 600, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024,
+                 db_path: Optional[str] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (expires_at, json)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (hit, value). Expired entries count as misses."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, json.loads(entry[1])
+                self._remove(key)
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires_at, value FROM responses WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+                if row is not None:
+                    self._store(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return True, json.loads(row[1])
+            self.misses += 1
+            return False, None
+
+    def set(self, key: str, value: Any) -> None:
+        encoded = json.dumps(value, separators=(",", ":"))
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, expires_at, encoded)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, expires_at, value) VALUES (?, ?, ?)",
+                    (key, expires_at, encoded),
+                )
+                self._db.commit()
+
+    def _store(self, key: str, expires_at: float, encoded: str) -> None:
+        # Caller holds the lock.
+        if len(encoded) > self.max_bytes:
+            return  # would evict everything else; not worth caching
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, encoded)
+        self._bytes += len(encoded)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, encoded = self._entries.pop(key)
+        self._bytes -= len(encoded)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def configure_response_cache(enabled: bool = True, **settings) -> Optional[ResponseCache]:
+    """
+    Replace the shared cache used by @cached functions.
+    settings: ttl, max_entries, max_bytes, db_path. enabled=False turns caching off.
+    """
+    global _cache
+    _cache = ResponseCache(**settings) if enabled else None
+    return _cache
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    return _cache
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)  # LLM tool calls often send 20.0 for 20
+    return value
+
+
+def cached(namespace: str) -> Callable:
+    """
+    Decorator: serve calls from the shared ResponseCache when one is configured.
+    The wrapper keeps the original signature, so it can still be registered
+    as an AutoGen tool.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = _cache
+            if cache is None:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = namespace + ":" + json.dumps(
+                {name: _normalize(value) for name, value in bound.arguments.items()},
+                sort_keys=True,
+                default=str,
+            )
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = func(*args, **kwargs)
+            cache.set(key, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+if RESPONSE_CACHE["enabled"]:
+    configure_response_cache(
+        ttl=RESPONSE_CACHE["ttl"],
+        max_entries=RESPONSE_CACHE["max_entries"],
+        max_bytes=RESPONSE_CACHE["max_bytes"],
+        db_path=RESPONSE_CACHE["db_path"],
+    )
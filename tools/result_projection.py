@@ -0,0 +1,188 @@
+import functools
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config.app_config import TOOL_RESULTS
+
+"""
+Projection of product tool results before they enter the orchestrator chat.
+
+Every turn of the SearchOrchestrator chat resends the whole history to the
+LLM, so tool output is kept small:
+
+- list results (search_products, get_all_products) keep only LIST_FIELDS per
+  product; get_product keeps DETAIL_FIELDS (raw reviews become reviews_count,
+  images/meta/dimensions are dropped);
+- a product already returned earlier in the same chat is sent as
+  {"id": N, "seen": true} instead of again in full;
+- list results are capped at max_products items and max_chars of JSON
+  ("omitted" says how many were left out).
+
+The projector is also the chat's result store: every product result gets a
+"call_id" ("c1", "c2", ...) and the full products are kept by ID and per
+call. The orchestrator answers with just the query and the chosen IDs
+({"query": "...", "call_id": "c1", "ids": [...]}), and the pipeline fetches
+the products with select() instead of having the LLM echo them. resolve()
+does the same for answers that still list products ("seen" references and
+projected items).
+
+With projection off (TOOL_RESULTS_PROJECTION=0) results are passed on in
+full, but they are still stored and tagged with their call ID.
+
+One projector belongs to one tool executor; call reset() before each chat.
+"""
+
+LIST_FIELDS = (
+    "id", "title", "brand", "category", "price", "rating",
+    "discountPercentage", "availabilityStatus", "stock",
+)
+DETAIL_FIELDS = LIST_FIELDS + (
+    "description", "reviews_count", "warrantyInformation", "shippingInformation", "returnPolicy",
+)
+
+
+def _json_len(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, default=str))
+
+
+class ToolResultProjector:
+    """Shrinks tool results for one conversation and remembers what it sent."""
+
+    def __init__(self, fields: Optional[Iterable[str]] = LIST_FIELDS,
+                 detail_fields: Optional[Iterable[str]] = DETAIL_FIELDS,
+                 max_products: int = 20, max_chars: int = 8000, dedupe: bool = True):
+        # fields/detail_fields None keep whole products; max_products/max_chars 0 disable the caps.
+        self.fields = tuple(fields) if fields is not None else None
+        self.detail_fields = tuple(detail_fields) if detail_fields is not None else None
+        self.max_products = max_products
+        self.max_chars = max_chars
+        self.dedupe = dedupe
+        self.products: Dict[Any, Dict[str, Any]] = {}  # id -> full product sent in this chat
+        self.calls: Dict[str, List[Any]] = {}  # call ID -> product IDs it returned
+        self.call_tools: Dict[str, Optional[str]] = {}  # call ID -> name of the tool that returned it
+        self.raw_chars = 0
+        self.sent_chars = 0
+
+    @classmethod
+    def from_config(cls) -> "ToolResultProjector":
+        """Projector configured by TOOL_RESULTS (a store-only one when projection is off)."""
+        if not TOOL_RESULTS["enabled"]:
+            return cls(fields=None, detail_fields=None, max_products=0, max_chars=0, dedupe=False)
+        return cls(
+            fields=TOOL_RESULTS["fields"] or LIST_FIELDS,
+            max_products=TOOL_RESULTS["max_products"],
+            max_chars=TOOL_RESULTS["max_chars"],
+            dedupe=TOOL_RESULTS["dedupe"],
+        )
+
+    def reset(self) -> None:
+        """Forget the products of the previous chat (sizes are kept as session totals)."""
+        self.products = {}
+        self.calls = {}
+        self.call_tools = {}
+
+    @staticmethod
+    def _pick(product: Dict[str, Any], fields: Optional[tuple]) -> Dict[str, Any]:
+        if fields is None:
+            return dict(product)
+        picked = {k: product[k] for k in fields if k in product}
+        if "reviews_count" in fields and "reviews_count" not in picked and isinstance(product.get("reviews"), list):
+            picked["reviews_count"] = len(product["reviews"])
+        return picked
+
+    def _project_list(self, result: Dict[str, Any], tool: Optional[str]) -> Dict[str, Any]:
+        out = {k: v for k, v in result.items() if k != "products"}
+        items, sources = [], []
+        for product in result["products"]:
+            if not isinstance(product, dict):
+                continue
+            pid = product.get("id")
+            if self.dedupe and pid is not None and pid in self.products:
+                items.append({"id": pid, "seen": True})
+            else:
+                items.append(self._pick(product, self.fields))
+            sources.append(product)
+
+        # Cap the item count, then the JSON size (dropping from the end).
+        keep = min(len(items), self.max_products or len(items))
+        if self.max_chars:
+            size = _json_len(out) + 16  # + the "products" key and brackets
+            for i in range(keep):
+                size += _json_len(items[i]) + 2
+                if size > self.max_chars:
+                    keep = max(i, 1)
+                    break
+        out["products"] = items[:keep]
+        if keep < len(items):
+            out["omitted"] = len(items) - keep
+        ids = []
+        for product in sources[:keep]:
+            if product.get("id") is not None:
+                self.products.setdefault(product["id"], product)
+                ids.append(product["id"])
+        out["call_id"] = self._new_call(ids, tool)
+        return out
+
+    def _new_call(self, ids: List[Any], tool: Optional[str] = None) -> str:
+        call_id = f"c{len(self.calls) + 1}"
+        self.calls[call_id] = ids
+        self.call_tools[call_id] = tool
+        return call_id
+
+    def project(self, result: Any, tool: Optional[str] = None) -> Any:
+        """Projected copy of a tool result (of the tool named `tool`); anything that is not a product result passes through."""
+        if isinstance(result, dict) and isinstance(result.get("products"), list):
+            projected = self._project_list(result, tool)
+        elif isinstance(result, dict) and "id" in result and "title" in result:
+            projected = self._pick(result, self.detail_fields)
+            self.products[result["id"]] = result
+            projected["call_id"] = self._new_call([result["id"]], tool)
+        else:
+            return result
+        self.raw_chars += _json_len(result)
+        self.sent_chars += _json_len(projected)
+        return projected
+
+    def wrap(self, func: Callable) -> Callable:
+        """Tool function whose results are projected; keeps the signature for AutoGen."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.project(func(*args, **kwargs), tool=func.__name__)
+        return wrapper
+
+    def resolve(self, products: Iterable[Any]) -> List[Any]:
+        """Replace products (or "seen" references) whose ID was sent in this chat by the full product."""
+        resolved = []
+        for product in products:
+            pid = product.get("id")
+            resolved.append(self.products.get(pid, product) if pid is not None else product)
+        return resolved
+
+    def select(self, ids: Optional[Iterable[Any]] = None, call_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Full products for the orchestrator's answer: the given IDs (in order),
+        or every product of call_id when no IDs are given. IDs the tools never
+        returned in this chat are dropped.
+        """
+        if ids is None:
+            ids = self.calls.get(call_id, [])
+        selected, picked = [], set()
+        for pid in ids:
+            product = self.products.get(pid)
+            if product is not None and id(product) not in picked:
+                picked.add(id(product))
+                selected.append(product)
+        return selected
+
+    def products_of(self, tools: Iterable[str]) -> List[Dict[str, Any]]:
+        """Full products returned in this chat by the given tools, in the order they were first returned."""
+        tools = set(tools)
+        ids = [pid for call_id, call_ids in self.calls.items() if self.call_tools.get(call_id) in tools for pid in call_ids]
+        return self.select(ids)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "raw_chars": self.raw_chars,
+            "sent_chars": self.sent_chars,
+            "saved": round(1 - self.sent_chars / self.raw_chars, 3) if self.raw_chars else 0.0,
+        }
@@ -0,0 +1,172 @@
+import re
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from tools.analysis_tools import parse_constraints
+
+"""
+Deterministic search planner (fast path for the search phase).
+
+Most requests boil down to one or two product words plus constraints
+("phones under $300, rating at least 4"). For those, the keyword can be
+derived without the SearchOrchestrator chat: strip the constraint phrases
+and filler words that parse_constraints already understands, and if one
+plain word remains, or two that stand next to each other in the request
+("running shoes"), search for them directly. For "perfume for my wife" the
+head noun before the preposition is searched; word pairs the request does
+not contain as a phrase ("iphone 13 pro") are never glued together.
+
+plan_search returns None whenever the rules are not confident, and the
+caller falls back to the LLM orchestrator.
+"""
+
+# Phrases consumed by parse_constraints (price, rating, availability, count).
+_CONSTRAINT_PATTERNS = [
+    re.compile(r"(under|less than|below|<=|<|around|about|max|up to|over|above|more than|between|from)"
+               r"\s*[$€£]?\s*\d+(\.\d+)?\s*k?\s*(dollars?|euros?|pounds?|usd|eur|gbp|[$€£])?"),
+    re.compile(r"[$€£]\s*\d+(\.\d+)?k?|\d+(\.\d+)?k?\s*(dollars?|euros?|pounds?|usd|eur|gbp|[$€£])"),
+    re.compile(r"(rating|rated)?\s*(>=|>|at least|no less than)?\s*\d+(\.\d+)?\s*(\+|stars?)?"),
+    re.compile(r"(in|out of|low)\s+stock"),
+    re.compile(r"top\s*\d+"),
+]
+
+_FILLER_WORDS = {
+    "a", "an", "the", "me", "i", "im", "my", "we", "you", "can", "could", "please", "want", "need",
+    "looking", "look", "for", "find", "show", "get", "give", "buy", "search", "recommend",
+    "suggest", "some", "any", "something", "good", "great", "best", "cheap", "cheapest",
+    "affordable", "budget", "new", "nice", "decent", "with", "and", "or", "that", "which",
+    "is", "are", "of", "to", "in", "on", "price", "priced", "rating", "rated", "ratings",
+    "stars", "star", "items", "products", "product", "options", "one", "ones", "under",
+    "around", "about", "below", "less", "than", "least", "at", "max", "up", "usd", "dollars",
+    "stock", "available", "top", "like", "would", "help", "over", "above", "more", "between",
+    "from", "to", "eur", "euros", "gbp", "pounds", "k",
+}
+
+# Words that all mean "phone" for the category parse_constraints recognizes.
+_PHONE_WORDS = {"phone", "phones", "smartphone", "smartphones", "mobile", "mobiles"}
+
+_WORD_RE = re.compile(r"[a-z]+")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# A word followed by one of these starts a modifier ("perfume for my wife"), so the word is the head noun.
+_PREPOSITIONS = {"for", "with", "by"}
+# Timings kept per search path for the averages in PlannerStats.summary().
+STATS_WINDOW = 1000
+
+
+def _singular(word: str) -> str:
+    """Very small plural stripper: laptops -> laptop, watches -> watch (not glass -> glas, sunglasses -> sunglasse)."""
+    if word.endswith("sses"):
+        return word  # "sunglasses", "glasses": product titles use the plural
+    if len(word) > 4 and word.endswith(("ches", "shes", "xes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def _keyword(q: str, words: List[str]) -> Optional[str]:
+    """The search keyword for two content words: their phrase if contiguous, the head noun before a preposition, else None."""
+    tokens = _TOKEN_RE.findall(q)
+    first, second = words
+    for i, token in enumerate(tokens[:-1]):
+        if token != first:
+            continue
+        if tokens[i + 1] == second:
+            return f"{first} {_singular(second)}"
+        if tokens[i + 1] in _PREPOSITIONS and second in tokens[i + 2:]:
+            return _singular(first)
+    return None
+
+
+def _content_words(q: str) -> List[str]:
+    """Words of the lower-cased request left after removing constraint phrases and filler words."""
+    stripped = q
+    for pattern in _CONSTRAINT_PATTERNS:
+        stripped = pattern.sub(" ", stripped)
+    return [w for w in _WORD_RE.findall(stripped) if w not in _FILLER_WORDS]
+
+
+def plan_search(user_input: str) -> Optional[Dict[str, Any]]:
+    """
+    Derive a search keyword from the request without calling the LLM.
+
+    Returns {"query": <keyword>, "constraints": <parse_constraints result>}
+    when confident, otherwise None.
+    """
+    q = user_input.lower()
+    constraints = parse_constraints(q)
+    words = _content_words(q)
+
+    if not words:
+        return None
+    # "phone"/"smartphone" requests: a single stable keyword for the category,
+    # or the brand itself for "samsung phone" (titles rarely contain both words).
+    if "category_in" in constraints:
+        others = [w for w in words if w not in _PHONE_WORDS]
+        if not others:
+            return {"query": "phone", "constraints": constraints}
+        if len(others) == 1 and others[0].capitalize() in constraints.get("brand_in", ()):
+            return {"query": others[0], "constraints": constraints}
+    # Anything longer than two words is a real sentence: let the LLM read it.
+    if len(words) > 2 or any(len(w) < 3 for w in words):
+        return None
+    keyword = _singular(words[0]) if len(words) == 1 else _keyword(q, words)
+    if keyword is None:
+        return None
+    return {"query": keyword, "constraints": constraints}
+
+
+def unplanned_words(user_input: str, plan: Dict[str, Any]) -> List[str]:
+    """
+    Words of the request that neither the plan's keyword nor its constraints
+    cover, e.g. the modifier the search drops ("camera" in "a phone with a
+    great camera", "wife" in "perfume for my wife"). [] means the plan
+    captures the whole request.
+    """
+    covered = set(plan["query"].split())
+    constraints = plan["constraints"]
+    if "category_in" in constraints:
+        covered |= _PHONE_WORDS
+    covered |= {brand.lower() for brand in constraints.get("brand_in", ())}
+    return [w for w in _content_words(user_input.lower()) if w not in covered and _singular(w) not in covered]
+
+
+class PlannerStats:
+    """Counts how often each search path was taken and how long each took (over the last `window` searches)."""
+
+    def __init__(self, window: int = STATS_WINDOW):
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {"fast": 0, "agent": 0}
+        self.durations: Dict[str, deque] = {"fast": deque(maxlen=window), "agent": deque(maxlen=window)}
+        self.fallback_reasons: Dict[str, int] = {}
+
+    def record(self, path: str, seconds: float, reason: Optional[str] = None) -> None:
+        with self._lock:
+            self.counts[path] += 1
+            self.durations[path].append(seconds)
+            if reason:
+                self.fallback_reasons[reason] = self.fallback_reasons.get(reason, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            fast, agent = self.durations["fast"], self.durations["agent"]
+            avg_fast = sum(fast) / len(fast) if fast else None
+            avg_agent = sum(agent) / len(agent) if agent else None
+            # Saved time is only known once both paths have been observed.
+            saved = (
+                round(self.counts["fast"] * (avg_agent - avg_fast), 2)
+                if avg_fast is not None and avg_agent is not None
+                else None
+            )
+            return {
+                "fast_path": self.counts["fast"],
+                "agent_path": self.counts["agent"],
+                "fallback_reasons": dict(self.fallback_reasons),
+                "avg_fast_s": round(avg_fast, 3) if avg_fast is not None else None,
+                "avg_agent_s": round(avg_agent, 3) if avg_agent is not None else None,
+                "estimated_saved_s": saved,
+            }
+
+
+planner_stats = PlannerStats()
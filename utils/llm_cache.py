@@ -0,0 +1,167 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from config.app_config import LLM_CACHE
+from tools.response_cache import ResponseCache
+
+"""
+Response cache for the analyzer and critic LLM calls.
+
+Entries are keyed on (system prompt, user request, context), where context is
+the candidate list for the analyzer and the recommendations for the critic.
+
+- Exact tier: the request is normalized (case, punctuation, whitespace; the
+  word order is kept, so "apple not samsung" and "samsung not apple" differ)
+  and the key is a sha256 of the three parts. Storage, TTL, LRU eviction and the
+  optional sqlite file come from tools/response_cache.ResponseCache.
+- Similarity tier: a paraphrased request over the same system prompt and
+  context ("cheap phones under 300" / "phones under 300, cheap please") can
+  reuse the reply when the word sets are similar enough (Jaccard). Numbers
+  and negations must agree with the words they attach to ("under 300",
+  "not samsung"), so "under 300" never answers "under 200" and "not samsung"
+  never answers "samsung". Off by default (similarity 1 = exact matches only).
+"""
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_NUMBER_RE = re.compile(r"^\d+(?:\.\d+)?$")
+# Tokens that flip the meaning of the next word ("n't" is tokenized as "t").
+_NEGATIONS = frozenset({"no", "not", "non", "nor", "never", "none", "without", "except", "excluding",
+                        "t", "dont", "doesnt", "isnt", "arent", "cant", "wont"})
+
+
+def _request_tokens(text: str) -> list:
+    return _WORD_RE.findall(text.lower())
+
+
+def _guard(tokens: list) -> tuple:
+    """Numbers with the word before them and negations with the word after them, in order."""
+    guard = []
+    for i, token in enumerate(tokens):
+        if _NUMBER_RE.match(token):
+            guard.append((tokens[i - 1] if i else "", token))
+        elif token in _NEGATIONS:
+            guard.append((token, tokens[i + 1] if i + 1 < len(tokens) else ""))
+    return tuple(guard)
+
+
+def _digest(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class LLMResponseCache:
+    """Exact + similarity cache for single-turn LLM replies."""
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 256, similarity: float = 1.0,
+                 db_path: Optional[str] = None, max_variants: int = 32):
+        self.store = ResponseCache(ttl=ttl, max_entries=max_entries, db_path=db_path)
+        self.similarity = similarity
+        self.max_variants = max_variants
+        # context digest -> {request words: (guard, exact key)}, most recent last
+        self._variants: "OrderedDict[str, OrderedDict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _keys(self, system: str, request: str, context: str) -> Tuple[str, str, list]:
+        tokens = _request_tokens(request)
+        context_key = _digest(system, context)
+        return context_key, _digest(context_key, " ".join(tokens)), tokens
+
+    def _similar_key(self, context_key: str, tokens: list) -> Optional[str]:
+        words, guard = frozenset(tokens), _guard(tokens)
+        best, best_score = None, self.similarity
+        for other, (other_guard, key) in self._variants.get(context_key, {}).items():
+            if other_guard != guard:
+                continue
+            union = len(words | other)
+            score = len(words & other) / union if union else 0.0
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    def get(self, system: str, request: str, context: str) -> Optional[str]:
+        context_key, key, tokens = self._keys(system, request, context)
+        hit, value = self.store.get(key)
+        if hit:
+            with self._lock:
+                self.exact_hits += 1
+            return value
+        if self.similarity < 1:
+            with self._lock:
+                similar = self._similar_key(context_key, tokens)
+            if similar is not None:
+                hit, value = self.store.get(similar)
+                if hit:
+                    with self._lock:
+                        self.similar_hits += 1
+                    return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, system: str, request: str, context: str, reply: str) -> None:
+        context_key, key, tokens = self._keys(system, request, context)
+        self.store.set(key, reply)
+        words = frozenset(tokens)
+        with self._lock:
+            variants = self._variants.setdefault(context_key, OrderedDict())
+            variants[words] = (_guard(tokens), key)
+            variants.move_to_end(words)
+            while len(variants) > self.max_variants:
+                variants.popitem(last=False)
+            self._variants.move_to_end(context_key)
+            while len(self._variants) > self.store.max_entries:
+                self._variants.popitem(last=False)
+
+    def get_or_call(self, system: str, request: str, context: str, call: Callable[[], str]) -> Tuple[str, bool]:
+        """Return (reply, cached). Empty replies are not stored."""
+        cached = self.get(system, request, context)
+        if cached is not None:
+            return cached, True
+        reply = call()
+        if reply and reply.strip():
+            self.set(system, request, context, reply)
+        return reply, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.exact_hits + self.similar_hits + self.misses
+            return {
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.exact_hits + self.similar_hits) / lookups, 3) if lookups else 0.0,
+                "entries": self.store.stats()["entries"],
+                "evictions": self.store.stats()["evictions"],
+            }
+
+
+_cache: Optional[LLMResponseCache] = None
+
+
+def configure_llm_cache(enabled: bool = True, **settings) -> Optional[LLMResponseCache]:
+    """Replace the shared LLM cache. settings: ttl, max_entries, similarity, db_path."""
+    global _cache
+    _cache = LLMResponseCache(**settings) if enabled else None
+    return _cache
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    return _cache
+
+
+if LLM_CACHE["enabled"]:
+    configure_llm_cache(
+        ttl=LLM_CACHE["ttl"],
+        max_entries=LLM_CACHE["max_entries"],
+        similarity=LLM_CACHE["similarity"],
+        db_path=LLM_CACHE["db_path"],
+    )
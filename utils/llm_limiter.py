@@ -0,0 +1,241 @@
+import copy
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from config.app_config import LLM_RATE_LIMIT
+from utils.tracing import span
+
+"""
+One rate limiter for every LLM call of the process.
+
+AutoGen applies api_rate_limit per client, so each agent (and each batch or
+server worker) throttles on its own and 429s are only retried by the SDK.
+SharedLLMLimiter is installed on the agents' clients by pipeline.build_agents:
+
+- token bucket: `rate` requests/second with bursts of up to `burst` calls,
+  shared by all agents and threads. The rate is only set by an explicit
+  LLM_RATE_LIMIT, which then replaces the per-client api_rate_limit; the
+  api_rate_limit of config/llm_config.py is a per-client value, and applying
+  it process-wide would throttle all agents and workers to one client's rate;
+- adaptive backoff: a rate-limit error (429 / resource exhausted) halves the
+  current rate and the call is retried after an exponential, jittered pause;
+  every success gives back 10% of the configured rate;
+- single-flight: concurrent calls with the same messages and config share
+  one in-flight request (not for streaming clients, whose tokens go to the
+  caller's console);
+- queueing delay per call is recorded as an "llm.wait" trace span and in stats().
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status == 429:
+        return True
+    text = str(error).lower()
+    return "429" in text or "resource exhausted" in text or "rate limit" in text or "quota" in text
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() reserves a token and sleeps until it is due."""
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, waiting if needed. Returns the seconds waited."""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1  # reserve; a negative balance queues the caller
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SharedLLMLimiter:
+    """Token bucket + adaptive backoff + single-flight for LLM client calls."""
+
+    def __init__(self, rate: Optional[float], burst: int = 3, max_retries: int = 3,
+                 backoff: float = 2.0, coalesce: bool = True, min_rate_factor: float = 0.1):
+        self.base_rate = rate
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.coalesce = coalesce
+        self.min_rate = rate * min_rate_factor if rate else None
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Flight] = {}
+        self._waits: deque = deque(maxlen=1000)
+        self.calls = 0
+        self.coalesced = 0
+        self.rate_limited = 0
+
+    # --- rate adaptation --------------------------------------------------------------
+
+    def _slow_down(self) -> None:
+        with self._lock:
+            self.rate_limited += 1
+            if self.bucket.rate:
+                self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+
+    def _speed_up(self) -> None:
+        if self.base_rate and self.bucket.rate < self.base_rate:
+            with self._lock:
+                self.bucket.rate = min(self.base_rate, self.bucket.rate + self.base_rate * 0.1)
+
+    # --- calls ----------------------------------------------------------------------
+
+    def _call_with_retries(self, fn: Callable[[], Any]) -> Any:
+        attempt = 0
+        while True:
+            with span("llm.wait") as s:
+                waited = self.bucket.acquire()
+                s["rate"] = self.bucket.rate
+            with self._lock:
+                self.calls += 1
+                self._waits.append(waited)
+            try:
+                result = fn()
+            except Exception as e:
+                if not _is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                self._slow_down()
+                pause = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                logger.warning("LLM rate limited (%s); retrying in %.1fs at %.3f req/s",
+                               type(e).__name__, pause, self.bucket.rate or 0)
+                time.sleep(pause)
+                attempt += 1
+                continue
+            self._speed_up()
+            return result
+
+    def call(self, fn: Callable[[], Any], key: Optional[str] = None) -> Any:
+        """Run fn under the limiter; calls with the same key made concurrently share one result."""
+        if key is None or not self.coalesce:
+            return self._call_with_retries(fn)
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            with self._lock:
+                self.coalesced += 1
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = self._call_with_retries(fn)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def govern(self, agent) -> None:
+        """Route an agent's LLM client calls through this limiter (idempotent)."""
+        client = getattr(agent, "client", None)
+        if client is None or getattr(client, "_shared_limiter", None) is self:
+            return
+        config_list = getattr(client, "_config_list", None) or []
+        streaming = any(entry.get("stream") for entry in config_list)
+        config_key = json.dumps(config_list, sort_keys=True, default=str)
+        create = client.create
+
+        def limited_create(**params):
+            key = None
+            if not streaming:
+                # agent/cache objects are per caller and do not change the reply
+                request = {k: v for k, v in params.items() if k not in ("agent", "cache")}
+                payload = config_key + json.dumps(request, sort_keys=True, default=str)
+                key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+            return self.call(lambda: create(**params), key)
+
+        client.create = limited_create
+        client._shared_limiter = self
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "rate_limited": self.rate_limited,
+                "rate": self.bucket.rate,
+                "wait_p50_s": round(waits[len(waits) // 2], 3) if waits else 0.0,
+                "wait_p95_s": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else 0.0,
+                "wait_max_s": round(waits[-1], 3) if waits else 0.0,
+            }
+
+
+_limiter: Optional[SharedLLMLimiter] = None
+_configured = False
+_limiter_lock = threading.Lock()
+
+
+def configure_llm_limiter(enabled: bool = True, **settings) -> Optional[SharedLLMLimiter]:
+    """Replace the shared limiter. settings: rate, burst, max_retries, backoff, coalesce."""
+    global _limiter, _configured
+    with _limiter_lock:
+        _limiter = SharedLLMLimiter(**settings) if enabled else None
+        _configured = True
+    return _limiter
+
+
+def get_llm_limiter() -> Optional[SharedLLMLimiter]:
+    """
+    The shared limiter, created from LLM_RATE_LIMIT on first use. Without an
+    explicit LLM_RATE_LIMIT rate it does not throttle and only backs off on
+    429s and coalesces calls; the clients then keep their own api_rate_limit
+    (a per-client value, never used as the shared rate).
+    """
+    global _limiter, _configured
+    if not _configured:
+        with _limiter_lock:
+            if not _configured and LLM_RATE_LIMIT["enabled"]:
+                _limiter = SharedLLMLimiter(
+                    rate=LLM_RATE_LIMIT["rate"],
+                    burst=LLM_RATE_LIMIT["burst"],
+                    max_retries=LLM_RATE_LIMIT["max_retries"],
+                    backoff=LLM_RATE_LIMIT["backoff"],
+                    coalesce=LLM_RATE_LIMIT["coalesce"],
+                )
+            _configured = True
+    return _limiter
+
+
+def without_client_rate_limit(llm_config: dict) -> dict:
+    """Copy of llm_config without api_rate_limit (the shared limiter replaces AutoGen's per-client one)."""
+    config = copy.deepcopy(llm_config)
+    for entry in config.get("config_list", []):
+        entry.pop("api_rate_limit", None)
+    return config
@@ -1,6 +1,50 @@
 import json
 import re
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fix_busted_json import repair_json
+
+from tools.product_record import Product
+
+# Opening fence, with the "json" tag captured when present.
+_FENCE_RE = re.compile(r"```(json)?", re.IGNORECASE)
+# Start of the products array, also in Python-literal style ('products': [).
+_PRODUCTS_RE = re.compile(r"""["']products["']\s*:\s*\[""")
+# Whitespace and commas between array items.
+_SEPARATOR_RE = re.compile(r"[\s,]*")
+# Strings (skipped whole) and brackets, to find where a malformed item ends.
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|[\[\]{}]')
+
+_decoder = json.JSONDecoder()
+
+
+def find_json_block(text: str) -> Tuple[int, int]:
+    """
+    Locate the JSON payload in a single pass over the fences and return its
+    (start, end) offsets, so callers can parse it in place without copying.
+
+    Same priority as extract_json_block: the first ```json block, else the
+    first ``` block, else the whole text. A block whose closing fence is
+    missing (a cut-off reply) runs to the end of the text.
+    """
+    if not text:
+        return 0, 0
+    first_plain = None
+    pos = 0
+    while True:
+        fence = _FENCE_RE.search(text, pos)
+        if not fence:
+            break
+        close = text.find("```", fence.end())
+        end = close if close != -1 else len(text)
+        if fence.group(1):
+            return fence.end(), end
+        if first_plain is None:
+            first_plain = (fence.end(), end)
+        if close == -1:
+            break
+        pos = close + 3  # continue after this block's closing fence
+    return first_plain or (0, len(text))
 
 
 def extract_json_block(text: str) -> str:
@@ -12,23 +56,68 @@ def extract_json_block(text: str) -> str:
     2. If not found, look for any ``` ... ``` block.
     3. If still nothing, just return the raw text stripped.
     """
-    if not text:
-        return "" # Return empty string if no content
-    
-    # First, specifically look for a fenced block annotated with "json"
-    # [\s\S]*? means "any characters including newlines, non-greedy"
-    fence = re.search(r"```json\s*([\s\S]*?)```", text, re.IGNORECASE)
-    if fence:
-        return fence.group(1).strip()
-    # fallback: any fenced block
-    any_fence = re.search(r"```\s*([\s\S]*?)```", text)
-    if any_fence:
-        return any_fence.group(1).strip()
-    # Final fallback: no fences at all, just return the stripped raw text
-    return text.strip()
-
-
-def parse_products_from_search(text: str) -> List[Dict[str, Any]]:
+    start, end = find_json_block(text)
+    return text[start:end].strip() if text else ""
+
+
+def _item_end(text: str, pos: int, end: int) -> Optional[int]:
+    """End offset of the object/array starting at pos, or None if it is cut off."""
+    depth = 0
+    for token in _TOKEN_RE.finditer(text, pos, end):
+        bracket = token.group()
+        if bracket == "{" or bracket == "[":
+            depth += 1
+        elif bracket == "}" or bracket == "]":
+            depth -= 1
+            if depth == 0:
+                return token.end()
+    return None
+
+
+def iter_products(text: str, fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the product dicts of the SearchOrchestrator's response one at a time.
+
+    - The fenced block is located with find_json_block and the "products"
+      array is decoded item by item in place, so the message is never copied
+      and only one full product record is alive at a time.
+    - Items that are not valid JSON (single quotes, trailing commas, Python
+      True/None, ...) are repaired with fix-busted-json; items that cannot be
+      repaired are skipped.
+    - If the reply was cut off, every complete product before the cut is
+      still returned.
+    - fields: keep only these keys of each product (e.g. product_record.FIELDS);
+      None keeps the whole record.
+    """
+    start, end = find_json_block(text)
+    array = _PRODUCTS_RE.search(text, start, end)
+    if not array:
+        return
+    keep = tuple(fields) if fields is not None else None
+    pos = array.end()
+    while True:
+        pos = _SEPARATOR_RE.match(text, pos, end).end()
+        if pos >= end or text[pos] == "]":
+            return
+        try:
+            item, pos = _decoder.raw_decode(text, pos)
+        except ValueError:
+            # Malformed item: cut it out by its brackets and try to repair it.
+            item_end = _item_end(text, pos, end)
+            if item_end is None:
+                return  # truncated; nothing usable after this point
+            try:
+                item = json.loads(repair_json(text[pos:item_end]))
+            except Exception:
+                item = None
+            pos = item_end
+        if pos > end:
+            return  # the item ran past the closing fence
+        if isinstance(item, dict):
+            yield item if keep is None else {k: item[k] for k in keep if k in item}
+
+
+def parse_products_from_search(text: str, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
     """
     Parse the SearchOrchestrator's response into a list of product dicts.
 
@@ -40,37 +129,139 @@ def parse_products_from_search(text: str) -> List[Dict[str, Any]]:
         ]
     }
 
-    This function:
-    1. Extracts the JSON block from the LLM output.
-    2. Parses it as JSON.
-    3. Returns the "products" list or [] if anything fails.
+    This function collects iter_products(text, fields): products from the
+    fenced JSON block, repaired where possible, limited to `fields` if given.
+    Returns [] if there is no products list.
 
     - perameters:
         - text: The full text response from the SearchOrchestrator agent.
+        - fields: Optional product keys to keep (e.g. product_record.FIELDS).
         - returns: A list of product dictionaries extracted from the response.
     """
+    if not text:
+        return [] # Return empty list if no content
+    return list(iter_products(text, fields))
 
-    # Try to extract just the JSON part from the LLM message
-    raw = extract_json_block(text)
-    if not raw:
-        return [] # Return empty list if no content 
-    try:
-         # Convert JSON string → Python dict
-        data = json.loads(raw)
-    except Exception:
-        # If JSON is invalid, fail gracefully with an empty list
-        return []
-    # Get "products" key, default to [] if missing or falsy
-    products = data.get("products") or []
-    # Ensure it's actually a list; if not, return empty list for safety
-    if not isinstance(products, list):
+
+def parse_product_records(text: str) -> List[Product]:
+    """
+    Like parse_products_from_search, but returns compact Product records
+    (tools/product_record.py): only the record's fields are kept, reviews
+    become a count and brand/category/status strings are interned.
+    """
+    if not text:
         return []
-    return products
+    return [Product.from_dict(item) for item in iter_products(text)]
+
+
+_EMPTY_PRODUCTS_RE = re.compile(r"""["']products["']\s*:\s*\[\s*\]""")
 
 
-def format_products_for_analyzer(products: List[Dict[str, Any]], max_items: int = 15) -> str:
+def parse_search_reply(text: str) -> Optional[List[Product]]:
     """
-    Turn a list of product dicts into a compact text list for the analyzer agent.
+    Validate an orchestrator message as its final answer and parse it once.
+
+    Returns the Product records if the message holds a products list (fenced
+    or not) with at least one usable product or an explicitly empty list, and
+    None otherwise (no JSON, no "products" key, nothing decodable), i.e. the
+    message is not a valid final answer.
+    """
+    if not isinstance(text, str) or "products" not in text:
+        return None
+    products = parse_product_records(text)
+    if products:
+        return products
+    start, end = find_json_block(text)
+    return [] if _EMPTY_PRODUCTS_RE.search(text, start, end) else None
+
+
+# Keys of the orchestrator's ID-only answer, also in Python-literal style.
+_IDS_RE = re.compile(r"""["']ids["']\s*:\s*\[([^\]]*)\]""")
+_CALL_ID_RE = re.compile(r"""["']call_id["']\s*:\s*["']([^"']+)["']""")
+_QUERY_RE = re.compile(r"""["']query["']\s*:\s*["']([^"']*)["']""")
+_ID_RE = re.compile(r"\d+")
+
+
+def parse_search_selection(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the orchestrator's ID-only final answer:
+
+        {"query": "laptop", "call_id": "c1", "ids": [3, 7, 12]}
+
+    Returns {"query", "call_id", "ids"} (missing keys are None) or None if
+    the JSON block has neither "ids" nor "call_id". Only these three keys are
+    read (with regexes), so quoting mistakes elsewhere in the block do not
+    matter and no JSON repair is needed.
+    """
+    if not isinstance(text, str) or ("ids" not in text and "call_id" not in text):
+        return None
+    start, end = find_json_block(text)
+    ids = _IDS_RE.search(text, start, end)
+    call_id = _CALL_ID_RE.search(text, start, end)
+    if ids is None and call_id is None:
+        return None
+    query = _QUERY_RE.search(text, start, end)
+    return {
+        "query": query.group(1) if query else None,
+        "call_id": call_id.group(1) if call_id else None,
+        "ids": [int(i) for i in _ID_RE.findall(ids.group(1))] if ids else None,
+    }
+
+
+# Optional details per candidate line, from least to most verbose. The
+# budgeted formatter uses the richest level that fits the token budget.
+DETAIL_LEVELS = (
+    (),
+    ("discount", "availability"),
+    ("discount", "availability", "description"),
+)
+DESCRIPTION_SNIPPET_CHARS = 120
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for prompt sizing (~4 characters per token)."""
+    return _chars_to_tokens(len(text))
+
+
+def _chars_to_tokens(chars: int) -> int:
+    return (chars + 3) // 4
+
+
+def _snippet(text: str, limit: int = DESCRIPTION_SNIPPET_CHARS) -> str:
+    # First `limit` characters, cut at a word boundary.
+    text = " ".join(str(text).split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def format_product_line(i: int, p: Dict[str, Any], details: Iterable[str] = ()) -> str:
+    """
+    One numbered candidate, e.g.
+    3) Product Name | Brand: X | Price: 100 | Rating: 4.5 | Discount: 12.5% | In Stock (stock 40)
+       Short description snippet…
+    """
+    # Get common fields; fall back to "Unknown" if missing
+    title = p.get("title", "Unknown")
+    brand = p.get("brand", "Unknown")
+    price = p.get("price", "Unknown")
+    rating = p.get("rating", "Unknown")
+    # Build a single-line summary of the product
+    line = f"{i}) {title} | Brand: {brand} | Price: {price} | Rating: {rating}"
+    if "discount" in details and p.get("discountPercentage"):
+        line += f" | Discount: {p.get('discountPercentage')}%"
+    if "availability" in details and p.get("availabilityStatus"):
+        stock = p.get("stock")
+        line += f" | {p.get('availabilityStatus')}" + (f" (stock {stock})" if stock is not None else "")
+    if "description" in details and p.get("description"):
+        line += "\n   " + _snippet(p.get("description"))
+    return line
+
+
+def format_products_for_analyzer(products: List[Dict[str, Any]], max_items: int = 15,
+                                 details: Iterable[str] = ()) -> str:
+    """
+    Turn a list of product dicts (or Product records) into a compact text list for the analyzer agent.
 
     Example output:
     1) Product Name | Brand: X | Price: 100 USD | Rating: 4.5
@@ -78,24 +269,45 @@ def format_products_for_analyzer(products: List[Dict[str, Any]], max_items: int
 
     - We intentionally keep this format simple and consistent so the analyzer can easily read and reason over it.
     - A max_items parameter limits how many products to include (default 15, to avoid overwhelming the analyzer agent).
+    - details adds optional fields to every line (see DETAIL_LEVELS).
     """
-
-    lines = []
+    details = tuple(details)
     # Iterate over at most `max_items` products, numbering them starting from 1
-    for i, p in enumerate(products[:max_items], start=1):
-        # Get common fields; fall back to "Unknown" if missing
-        title = p.get("title", "Unknown")
-        brand = p.get("brand", "Unknown")
-        price = p.get("price", "Unknown")
-        rating = p.get("rating", "Unknown")
-        # Build a single-line summary of the product
-        lines.append(
-            f"{i}) {title} | Brand: {brand} | Price: {price} | Rating: {rating}"
-        )
+    lines = [format_product_line(i, p, details) for i, p in enumerate(products[:max_items], start=1)]
     # Join all product lines into a single string separated by newlines
     return "\n".join(lines)
 
 
+def format_products_within_budget(products: List[Dict[str, Any]], budget_tokens: int,
+                                  max_items: int = 15) -> Tuple[str, Dict[str, Any]]:
+    """
+    Format the (already ranked) candidates so the list fits in budget_tokens.
+
+    All candidates up to max_items are kept if possible, with the richest
+    DETAIL_LEVELS entry that still fits. If even the plain lines do not fit,
+    the list is cut to the best-ranked candidates that do (at least one).
+
+    Returns (text, info); info has the number of items, the details used and
+    the estimated token count of the text.
+    """
+    candidates = list(products[:max_items])
+    for details in reversed(DETAIL_LEVELS):
+        lines = [format_product_line(i, p, details) for i, p in enumerate(candidates, start=1)]
+        text = "\n".join(lines)
+        if estimate_tokens(text) <= budget_tokens:
+            break
+    else:
+        # Plain lines still too long: keep the best-ranked ones that fit.
+        chars = len(lines[0]) if lines else 0
+        count = 1
+        while count < len(lines) and _chars_to_tokens(chars + 1 + len(lines[count])) <= budget_tokens:
+            chars += 1 + len(lines[count])
+            count += 1
+        lines = lines[:count]
+        text = "\n".join(lines)
+    return text, {"items": len(lines), "details": list(details), "est_tokens": estimate_tokens(text)}
+
+
 def create_analyzer_prompt(user_request: str, products_text: str) -> str:
     """
     Build the final prompt that will be sent to the Analyzer agent.
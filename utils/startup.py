@@ -0,0 +1,52 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+"""
+Startup timing for the CLI and the server.
+
+Importing AutoGen pulls in the Gemini / Vertex AI SDKs and is by far the
+slowest part of starting the advisor, so the entry points import it lazily
+and time each startup phase:
+
+    with startup.phase("imports"):
+        import pipeline
+    ...
+    startup.report(budget_s=STARTUP_BUDGET_S)
+
+report() logs the per-phase times and warns when the total exceeds the
+budget. For a per-module breakdown use `python -X importtime main.py --help`.
+"""
+
+logger = logging.getLogger(__name__)
+
+_process_started = time.perf_counter()
+phases: Dict[str, float] = {}
+
+
+@contextmanager
+def phase(name: str):
+    """Time one startup phase (seconds, accumulated under `name`)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - started
+
+
+def elapsed() -> float:
+    """Seconds since this module was first imported (close to process start)."""
+    return time.perf_counter() - _process_started
+
+
+def report(budget_s: Optional[float] = None) -> Dict[str, float]:
+    """Log the startup phases; warn if the total is over budget_s. Returns the timings."""
+    timings = {name: round(seconds, 3) for name, seconds in phases.items()}
+    timings["total"] = round(elapsed(), 3)
+    details = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+    if budget_s and timings["total"] > budget_s:
+        logger.warning("Startup took %.2fs, over the %.1fs budget (%s)", timings["total"], budget_s, details)
+    else:
+        logger.info("Startup: %s", details)
+    return timings
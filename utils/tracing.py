@@ -0,0 +1,150 @@
+import contextvars
+import functools
+import json
+import math
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+"""
+Lightweight per-query tracing for the advisor pipeline.
+
+- start_trace(query) opens a trace for one request; span(name) times a stage
+  inside it (search, analyzer, critic, every product tool call, ...).
+- Spans are plain dicts, so callers can attach sizes/counts to them:
+
+      with span("analyzer") as s:
+          s["prompt_chars"] = len(prompt)
+
+- finish_trace() appends the trace as one JSON line to the trace file (if set)
+  and feeds the session summary (count/p50/p95/max per stage; the percentiles
+  cover the last SUMMARY_WINDOW spans per stage, so a server's memory stays flat).
+
+The current trace lives in a ContextVar: batch workers each get their own,
+and work handed to another thread can join the trace via
+contextvars.copy_context().run(...).
+"""
+
+_current: contextvars.ContextVar = contextvars.ContextVar("advisor_trace", default=None)
+# Durations kept per stage for the summary's percentiles.
+SUMMARY_WINDOW = 10000
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Tracer:
+    """Collects finished traces for the session and optionally writes them as JSON lines."""
+
+    def __init__(self, path: Optional[str] = None, window: int = SUMMARY_WINDOW):
+        self.path = path
+        self.window = window
+        self._lock = threading.Lock()
+        self._durations: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self.traces = 0
+
+    def _add(self, name: str, ms: float) -> None:
+        self._durations.setdefault(name, deque(maxlen=self.window)).append(ms)
+        self._counts[name] = self._counts.get(name, 0) + 1
+
+    def record(self, trace: Dict[str, Any]) -> None:
+        with self._lock:
+            self.traces += 1
+            for s in trace["spans"]:
+                self._add(s["name"], s["ms"])
+            self._add("total", trace["total_ms"])
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(trace, ensure_ascii=False, default=str) + "\n")
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage count, and p50, p95 and max in milliseconds over the last `window` spans."""
+        with self._lock:
+            return {
+                name: {
+                    "count": self._counts[name],
+                    "p50_ms": round(_percentile(values, 50), 1),
+                    "p95_ms": round(_percentile(values, 95), 1),
+                    "max_ms": round(max(values), 1),
+                }
+                for name, values in sorted(self._durations.items())
+            }
+
+    def format_summary(self) -> str:
+        rows = [f"{'stage':<28}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for name, s in self.summary().items():
+            rows.append(f"{name:<28}{s['count']:>7}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['max_ms']:>10}")
+        return "\n".join(rows)
+
+
+tracer = Tracer()
+
+
+def configure_tracing(path: Optional[str]) -> Tracer:
+    """Write finished traces to `path` (JSON lines); None keeps them in memory only."""
+    tracer.path = path
+    return tracer
+
+
+def start_trace(query: str) -> Dict[str, Any]:
+    """Open a trace for one request in the current context."""
+    trace = {
+        "trace_id": uuid.uuid4().hex[:12],
+        "query": query,
+        "started_at": time.time(),
+        "_t0": time.perf_counter(),
+        "spans": [],
+    }
+    _current.set(trace)
+    return trace
+
+
+def finish_trace(**attrs) -> Optional[Dict[str, Any]]:
+    """Close the current trace, record it and return it (None if no trace was open)."""
+    trace = _current.get()
+    if trace is None:
+        return None
+    _current.set(None)
+    trace["total_ms"] = round((time.perf_counter() - trace.pop("_t0")) * 1000, 2)
+    trace.update(attrs)
+    tracer.record(trace)
+    return trace
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time a block as a span of the current trace. Yields the span dict so
+    extra attributes can be added; outside a trace it is a cheap no-op.
+    """
+    record = {"name": name, **attrs}
+    trace = _current.get()
+    started = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        if trace is not None:
+            record["ms"] = round((time.perf_counter() - started) * 1000, 2)
+            trace["spans"].append(record)
+
+
+def traced(name: str) -> Callable:
+    """Decorator version of span(); keeps the wrapped signature (safe for AutoGen tools)."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator